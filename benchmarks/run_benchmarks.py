@@ -0,0 +1,186 @@
+"""
+Offline benchmarks for the request/response hot path.
+
+Builds synthetic events with get_test_proxy_event across a matrix of body/payload sizes and times EventParser
+construction and body decoding, validate_event_auth, make_response and the end to end overhead added by
+lambda_proxy_response_wrapper. Results (best per call time in microseconds) are written as JSON and compared
+against a stored baseline, the run fails if any benchmark is slower than the baseline by more than the threshold.
+
+    python benchmarks/run_benchmarks.py                     # run and compare against benchmarks/baseline.json
+    python benchmarks/run_benchmarks.py --update-baseline   # run and store the results as the new baseline
+"""
+import os
+import sys
+import json
+import timeit
+import argparse
+import platform
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lambda_proxy_helpers_pkg.event_parser import EventParser  # noqa: E402
+from lambda_proxy_helpers_pkg.lambda_proxy_response import LambdaProxyResponse  # noqa: E402
+from lambda_proxy_helpers_pkg.lambda_proxy_response_wrapper import (lambda_proxy_response_wrapper,  # noqa: E402
+                                                                    FunctionResponse)
+from lambda_proxy_helpers_pkg.test_proxy_event import (get_test_proxy_event, generate_events, Route,  # noqa: E402
+                                                       CognitoDetail)
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(BENCHMARK_DIR, 'baseline.json')
+DEFAULT_OUTPUT = os.path.join(BENCHMARK_DIR, 'results.json')
+DEFAULT_THRESHOLD = 0.25
+
+COGNITO_DETAIL = CognitoDetail(user_id='abcdef', email='hello@testme.com', account_id='123456',
+                               account_created=True)
+
+
+def _record(i):
+    return {"id": f"item-{i}", "name": f"Item number {i}", "price": 10.25 + i, "quantity": i, "active": i % 2 == 0,
+            "tags": ["a", "b", "c"]}
+
+
+def _deep(depth):
+    node = {"value": Decimal('1.5'), "count": Decimal(depth)}
+
+    for i in range(depth):
+        node = {"level": Decimal(i), "price": Decimal('9.99'), "child": node}
+
+    return node
+
+
+# name -> (request body, response payload). Request bodies go through json.dumps in get_test_proxy_event so they
+# use plain floats, response payloads use Decimals as a DynamoDB result would.
+def build_size_matrix():
+    return {
+        'tiny': ({"foo": "bar"}, {"foo": "bar"}),
+        'typical': ({"items": [_record(i) for i in range(10)]},
+                    {"items": [{**_record(i), "price": Decimal('10.25') + i} for i in range(10)]}),
+        'multi_mb': ({"items": [_record(i) for i in range(20000)]},
+                     {"items": [{**_record(i), "price": Decimal('10.25') + i} for i in range(20000)]}),
+        'deep': ({"root": json.loads(json.dumps(_deep(50), default=float))}, _deep(50)),
+        'wide': ({f"key_{i}": i * 1.5 for i in range(5000)}, {f"key_{i}": Decimal(i) / 4 for i in range(5000)}),
+    }
+
+
+def time_per_call(func, min_time: float) -> float:
+    """
+    Best per call time in microseconds over 3 repeats of a loop lasting at least min_time seconds
+    """
+    timer = timeit.Timer(func)
+    number, elapsed = timer.autorange()
+
+    if elapsed < min_time:
+        number = max(1, int(number * min_time / max(elapsed, 1e-9)))
+
+    return min(timer.repeat(repeat=3, number=number)) / number * 1e6
+
+
+def run_benchmarks(min_time: float = 0.1) -> dict:
+    results = {}
+
+    auth_event = get_test_proxy_event(http_method='GET', resource='/test', path='/test', cognito_detail=COGNITO_DETAIL)
+
+    def validate_auth():
+        EventParser(auth_event).validate_event_auth(requires_account_id=True)
+
+    results['validate_event_auth'] = time_per_call(validate_auth, min_time)
+
+    # event construction for load tests, this has to stay well below the cost of handling the event
+    events = generate_events([Route('GET', '/items/{itemId}'), Route('POST', '/items', bodies=[{"foo": "bar"}])],
+                             seed=1)
+    results['test_event_factory'] = time_per_call(
+        lambda: get_test_proxy_event(http_method='GET', resource='/test', path='/test', cognito_detail=COGNITO_DETAIL),
+        min_time)
+    results['generate_events'] = time_per_call(lambda: next(events), min_time)
+
+    for size, (body, payload) in build_size_matrix().items():
+        event = get_test_proxy_event(http_method='POST', resource='/test', path='/test', body=body,
+                                     cognito_detail=COGNITO_DETAIL)
+        first_key = next(iter(body))
+
+        results[f'event_parser_construct[{size}]'] = time_per_call(lambda: EventParser(event), min_time)
+        results[f'event_parser_body[{size}]'] = time_per_call(lambda: EventParser(event).event_body, min_time)
+        results[f'event_parser_body_prop[{size}]'] = time_per_call(
+            lambda: EventParser(event).get_body_props(first_key), min_time)
+        results[f'make_response[{size}]'] = time_per_call(
+            lambda: LambdaProxyResponse(status=200, payload=payload).make_response(), min_time)
+
+        def handler(event, context):
+            return FunctionResponse(status_code=200, payload=payload, url=None)
+
+        wrapped = lambda_proxy_response_wrapper()(handler)
+        handler_time = time_per_call(lambda: handler(event, None), min_time)
+        wrapped_time = time_per_call(lambda: wrapped(event, None), min_time)
+        results[f'wrapper_end_to_end[{size}]'] = wrapped_time
+        results[f'wrapper_overhead[{size}]'] = max(wrapped_time - handler_time, 0.0)
+
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """
+    :return: list of (name, baseline us, current us) for benchmarks slower than baseline * (1 + threshold)
+    """
+    regressions = []
+
+    for name, current in results.items():
+        previous = baseline.get(name)
+
+        if previous and current > previous * (1 + threshold):
+            regressions.append((name, previous, current))
+
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help='where to write the results JSON')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='baseline results JSON to compare against')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='allowed slow down as a fraction of the baseline (default %(default)s)')
+    parser.add_argument('--min-time', type=float, default=0.1, help='minimum seconds per timing loop')
+    parser.add_argument('--update-baseline', action='store_true', help='store these results as the baseline')
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.min_time)
+    report = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "unit": "us_per_call",
+        "results": results
+    }
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+
+    for name, value in sorted(results.items()):
+        print(f"{name:45} {value:14.2f} us")
+
+    if args.update_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+
+        print(f"Baseline updated: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline found at {args.baseline}, run with --update-baseline to create one")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)['results']
+
+    regressions = compare(results, baseline, args.threshold)
+
+    for name in sorted(set(results) - set(baseline)):
+        print(f"NO BASELINE {name}: not compared, run with --update-baseline (or add it) to include it")
+
+    for name, previous, current in regressions:
+        print(f"REGRESSION {name}: {previous:.2f}us -> {current:.2f}us (+{(current / previous - 1) * 100:.0f}%)")
+
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
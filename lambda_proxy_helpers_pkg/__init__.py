@@ -0,0 +1,79 @@
+"""
+Flat public API. Names are resolved on first access (PEP 562) so "import lambda_proxy_helpers_pkg" costs nothing
+and only the modules you actually use are imported.
+
+lambda_proxy_response_wrapper isn't exported here as it shares its name with its module, import it from
+lambda_proxy_helpers_pkg.lambda_proxy_response_wrapper as before.
+"""
+from importlib import import_module
+
+# public name -> module it lives in
+_LAZY_EXPORTS = {
+    'HttpStatusCodes': 'constants',
+    'HttpMethods': 'constants',
+    'EventParser': 'event_parser',
+    'find_header': 'event_parser',
+    'detect_format': 'event_formats',
+    'LambdaProxyResponse': 'lambda_proxy_response',
+    'FunctionResponse': 'lambda_proxy_response_wrapper',
+    'handle_exception': 'lambda_proxy_response_wrapper',
+    'get_event_loop': 'lambda_proxy_response_wrapper',
+    'lambda_batch_wrapper': 'batch_wrapper',
+    'Router': 'router',
+    'HeaderPolicy': 'header_policy',
+    'CompressionPolicy': 'compression',
+    'ResponseCache': 'response_cache',
+    'make_etag': 'etag',
+    'Pagination': 'pagination',
+    'Paginated': 'pagination',
+    'compile_schema': 'validation',
+    'Field': 'validation',
+    'Param': 'params',
+    'compile_params': 'params',
+    'set_json_backend': 'json_backend',
+    'get_json_backend': 'json_backend',
+    'register_json_encoder': 'json_encoder',
+    'unregister_json_encoder': 'json_encoder',
+    'LambdaProxyError': 'lambda_errors',
+    'register_error': 'lambda_errors',
+    'unregister_error': 'lambda_errors',
+    'NotFoundError': 'lambda_errors',
+    'MethodNotAllowedError': 'lambda_errors',
+    'MissingParameterError': 'lambda_errors',
+    'InvalidParameterError': 'lambda_errors',
+    'AlreadyExistsError': 'lambda_errors',
+    'RelatedRecordsExistError': 'lambda_errors',
+    'ValidationError': 'lambda_errors',
+    'InvalidFunctionRequestError': 'lambda_errors',
+    'InvalidUserError': 'lambda_errors',
+    'PayloadTooLargeError': 'lambda_errors',
+    'GeneralError': 'lambda_errors',
+    'get_test_proxy_event': 'test_proxy_event',
+    'CognitoDetail': 'test_proxy_event',
+    'EventFactory': 'test_proxy_event',
+    'EventRecorder': 'test_proxy_event',
+    'generate_events': 'test_proxy_event',
+    'replay_events': 'test_proxy_event',
+    'DevServer': 'dev_server',
+    'ErrorNotifier': 'notifications',
+    'StacktracePolicy': 'stacktrace',
+    'set_notifier': 'notifications',
+}
+
+__all__ = sorted(_LAZY_EXPORTS)
+
+
+def __getattr__(name):
+    module_name = _LAZY_EXPORTS.get(name)
+
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(import_module(f"{__name__}.{module_name}"), name)
+    globals()[name] = value
+
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
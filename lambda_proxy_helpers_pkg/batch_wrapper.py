@@ -0,0 +1,174 @@
+from functools import wraps
+
+from .constants import HttpStatusCodes
+from . import json_backend
+from .lambda_errors import InvalidFunctionRequestError
+from .lambda_proxy_response import LambdaProxyResponse
+from .lambda_proxy_response_wrapper import (lambda_proxy_response_wrapper,
+                                            apply_function_response,
+                                            set_error,
+                                            flush_notifications,
+                                            get_event_loop,
+                                            is_coroutine_function)
+
+DEFAULT_MAX_WORKERS = 8
+
+
+def get_item_identifier(record, index: int) -> str:
+    """
+    The identifier Lambda expects in batchItemFailures: the SQS messageId, the Kinesis/DynamoDB stream sequence
+    number or, for a plain list of events, the item's position in the list.
+    """
+    if isinstance(record, dict):
+        if 'messageId' in record:
+            return record['messageId']
+
+        if 'kinesis' in record:
+            return record['kinesis']['sequenceNumber']
+
+        if 'dynamodb' in record:
+            return record['dynamodb']['SequenceNumber']
+
+    return str(index)
+
+
+class MalformedRecord:
+    """
+    Stands in for an SQS record whose body couldn't be decoded, the wrapper reports it as a failed item (error is
+    raised in its place) rather than failing the whole batch
+    """
+    __slots__ = ('record', 'error')
+
+    def __init__(self, record: dict, error: Exception):
+        self.record = record
+        self.error = error
+
+    def __repr__(self):
+        return f"MalformedRecord(messageId={self.record.get('messageId')!r}, error={self.error!r})"
+
+
+def get_batch_items(event, unwrap_sqs_body: bool = True):
+    """
+    Splits a batch event into (identifier, item) pairs. The batch can be an event with a "Records" list (SQS,
+    Kinesis, DynamoDB streams) or a plain list of events. SQS message bodies are JSON decoded when unwrap_sqs_body
+    is set so the handler receives the proxy-style payload the message carries, a body that isn't valid JSON is
+    returned as a MalformedRecord.
+
+    :return: list of (identifier, item)
+    """
+    records = event.get('Records', []) if isinstance(event, dict) else event
+    items = []
+
+    for index, record in enumerate(records):
+        item = record
+
+        if unwrap_sqs_body and isinstance(record, dict) and 'messageId' in record and record.get('body'):
+            try:
+                item = json_backend.decode(record['body'])
+            except ValueError as e:
+                item = MalformedRecord(record, InvalidFunctionRequestError(f"Message body is not valid JSON: {e}"))
+
+        items.append((get_item_identifier(record, index), item))
+
+    return items
+
+
+async def _run_async_item(func, item, context, semaphore):
+    resp = LambdaProxyResponse()
+
+    async with semaphore:
+        try:
+            if isinstance(item, MalformedRecord):
+                raise item.error
+
+            apply_function_response(resp, await func(item, context))
+
+        except Exception as e:
+            set_error(resp, e)
+
+    return resp.make_response(include_stacktrace=resp.stacktrace is not None)
+
+
+async def _run_async_batch(func, items, context, max_workers):
+    import asyncio
+
+    semaphore = asyncio.Semaphore(max_workers)
+    return await asyncio.gather(*(_run_async_item(func, item, context, semaphore) for _, item in items))
+
+
+def lambda_batch_wrapper(max_workers: int = DEFAULT_MAX_WORKERS,
+                         unwrap_sqs_body: bool = True,
+                         failure_status: int = HttpStatusCodes.INTERNAL_SERVER_ERROR):
+    """
+    The batch counterpart to lambda_proxy_response_wrapper. The decorated function handles a single item, taking
+    (item, context) and returning a FunctionResponse or raising one of the lambda_errors exactly as a wrapped proxy
+    handler would. The wrapper runs it over every item in the batch concurrently, on a thread pool for plain
+    functions or on the persistent event loop for async functions, with at most max_workers items in flight.
+
+    The result contains the proxy response for each item and a batchItemFailures list so, with
+    ReportBatchItemFailures enabled on the event source, only the failed items are retried:
+
+        {
+            "batchItemFailures": [{"itemIdentifier": "..."}],
+            "results": [{"itemIdentifier": "...", "statusCode": 200, "headers": {...}, "body": "..."}]
+        }
+
+    :param max_workers: maximum number of items processed at once
+    :param unwrap_sqs_body: pass the JSON decoded SQS message body to the handler rather than the SQS record
+    :param failure_status: items whose response status is at or above this are reported as failures. Client
+                           errors (4xx) aren't retried by default as retrying won't fix them. That includes SQS
+                           messages whose body isn't valid JSON, which get a 400 Invalid Function Request Error result.
+    :return:
+    """
+    def wrapper(func):
+        is_async = is_coroutine_function(func)
+        wrapped_item = None
+
+        if not is_async:
+            @wraps(func)
+            def handle_item(item, context):
+                if isinstance(item, MalformedRecord):
+                    raise item.error
+
+                return func(item, context)
+
+            wrapped_item = lambda_proxy_response_wrapper()(handle_item)
+        executor = None
+
+        @wraps(func)
+        def decorated_batch(event, context=None):
+            nonlocal executor
+
+            items = get_batch_items(event, unwrap_sqs_body)
+
+            if is_async:
+                responses = get_event_loop().run_until_complete(_run_async_batch(func, items, context, max_workers))
+            elif max_workers > 1 and len(items) > 1:
+                if executor is None:
+                    from concurrent.futures import ThreadPoolExecutor
+
+                    # created on first use and kept for the life of the container
+                    executor = ThreadPoolExecutor(max_workers=max_workers)
+
+                responses = list(executor.map(lambda pair: wrapped_item(pair[1], context), items))
+            else:
+                responses = [wrapped_item(item, context) for _, item in items]
+
+            failures = []
+            results = []
+
+            for (identifier, _), resp in zip(items, responses):
+                results.append({"itemIdentifier": identifier, **resp})
+
+                if resp['statusCode'] >= failure_status:
+                    failures.append({"itemIdentifier": identifier})
+
+            if is_async and any(resp['statusCode'] == HttpStatusCodes.INTERNAL_SERVER_ERROR for resp in responses):
+                # sync items are flushed by their wrapper
+                flush_notifications(HttpStatusCodes.INTERNAL_SERVER_ERROR)
+
+            return {"batchItemFailures": failures, "results": results}
+
+        return decorated_batch
+
+    return wrapper
@@ -0,0 +1,135 @@
+import zlib
+
+ENCODING_BROTLI = 'br'
+ENCODING_GZIP = 'gzip'
+ENCODING_DEFLATE = 'deflate'
+
+HEADER_CONTENT_ENCODING = "Content-Encoding"
+
+# zlib window bits for the container format of each encoding
+_GZIP_WBITS = 31
+_DEFLATE_WBITS = 15
+
+
+def parse_accept_encoding(header: str) -> dict:
+    """
+    Parses an Accept-Encoding header into a dict of coding -> quality value, e.g.
+    "gzip, br;q=0.9, *;q=0" -> {"gzip": 1.0, "br": 0.9, "*": 0.0}
+
+    :param header: Accept-Encoding header value (may be None)
+    :return:
+    """
+    codings = {}
+
+    if not header:
+        return codings
+
+    for item in header.split(','):
+        coding, _, params = item.partition(';')
+        coding = coding.strip().lower()
+
+        if not coding:
+            continue
+
+        quality = 1.0
+        params = params.strip()
+
+        if params[:2].lower() == 'q=':
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+
+        codings[coding] = quality
+
+    return codings
+
+
+def _brotli_available():
+    try:
+        import brotli  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class CompressionPolicy:
+    """
+    Opt in compression of response bodies, negotiated against the request's Accept-Encoding header. Compressed
+    bodies are base64 encoded and flagged with isBase64Encoded so API Gateway passes them through as binary.
+
+    Brotli is only offered if the brotli package is installed.
+    """
+    def __init__(self,
+                 min_size: int = 1024,
+                 level: int = 6,
+                 brotli_quality: int = 4,
+                 encodings=(ENCODING_BROTLI, ENCODING_GZIP, ENCODING_DEFLATE)):
+        """
+        :param min_size: bodies shorter than this are sent uncompressed
+        :param level: zlib compression level (1-9) for gzip and deflate
+        :param brotli_quality: brotli quality (0-11)
+        :param encodings: supported encodings in order of preference
+        """
+        self.min_size = min_size
+        self.level = level
+        self.brotli_quality = brotli_quality
+
+        if ENCODING_BROTLI in encodings and not _brotli_available():
+            encodings = tuple(e for e in encodings if e != ENCODING_BROTLI)
+
+        self.encodings = tuple(encodings)
+
+    def __repr__(self):
+        return f"CompressionPolicy(min_size={self.min_size}, level={self.level}, encodings={self.encodings})"
+
+    def choose_encoding(self, accept_encoding: str):
+        """
+        Picks the supported encoding with the highest quality value in the Accept-Encoding header, ties go to
+        the order of self.encodings.
+
+        :param accept_encoding: Accept-Encoding header value
+        :return: the encoding or None if none are acceptable
+        """
+        accepted = parse_accept_encoding(accept_encoding)
+
+        if not accepted:
+            return None
+
+        wildcard = accepted.get('*', 0.0)
+        best, best_quality = None, 0.0
+
+        for encoding in self.encodings:
+            quality = accepted.get(encoding, wildcard)
+
+            if quality > best_quality:
+                best, best_quality = encoding, quality
+
+        return best
+
+    def compress(self, data: bytes, encoding: str) -> bytes:
+        if encoding == ENCODING_BROTLI:
+            import brotli
+            return brotli.compress(data, quality=self.brotli_quality)
+
+        compressor = zlib.compressobj(self.level, zlib.DEFLATED,
+                                      _GZIP_WBITS if encoding == ENCODING_GZIP else _DEFLATE_WBITS)
+        return compressor.compress(data) + compressor.flush()
+
+    def compress_body(self, body: str, accept_encoding: str):
+        """
+        Compresses the body if it's large enough and the client accepts one of our encodings.
+
+        :param body: the serialized response body
+        :param accept_encoding: Accept-Encoding header value
+        :return: (encoding, compressed bytes) or None if the body should be sent as is
+        """
+        if len(body) < self.min_size:
+            return None
+
+        encoding = self.choose_encoding(accept_encoding)
+
+        if encoding is None:
+            return None
+
+        return encoding, self.compress(body.encode('utf-8'), encoding)
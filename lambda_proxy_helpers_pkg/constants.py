@@ -1,8 +1,12 @@
 class HttpStatusCodes:
     OK = 200
     CREATED = 201
+    NO_CONTENT = 204
+    NOT_MODIFIED = 304
     BAD_REQUEST = 400
     NOT_FOUND = 404
+    METHOD_NOT_ALLOWED = 405
+    PAYLOAD_TOO_LARGE = 413
     INTERNAL_SERVER_ERROR = 500
     NOT_IMPLEMENTED = 501
 
@@ -13,3 +17,5 @@ class HttpMethods:
     PUT = 'PUT'
     DELETE = 'DELETE'
     PATCH = 'PATCH'
+    HEAD = 'HEAD'
+    OPTIONS = 'OPTIONS'
@@ -0,0 +1,502 @@
+"""
+Local HTTP server for trying out (and load testing) handlers decorated with lambda_proxy_response_wrapper, or a
+Router, without deploying them. Each request is turned into a proxy event (the same shape get_test_proxy_event builds)
+and the handler's response is mapped back to HTTP.
+
+    python -m lambda_proxy_helpers_pkg.dev_server my_app.handlers:handler --port 8000 --workers 16 \\
+        --resource /items --resource /items/{itemId} --claims '{"sub": "user-1", "custom:account_id": "account-1"}'
+
+Standard library only, this is a development tool and is never imported by the request path.
+"""
+import re
+import sys
+import json
+import time
+import socket
+import binascii
+import argparse
+import threading
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qsl
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from .event_formats import REST_API, HTTP_API, FUNCTION_URL, ALB, HEADER_SET_COOKIE
+from .test_proxy_event import EventFactory, CognitoDetail, cognito_claims
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8000
+DEFAULT_WORKERS = 8
+DEFAULT_TIMEOUT_MS = 30000
+DEFAULT_KEEP_ALIVE_TIMEOUT = 5.0
+
+_PATH_PARAM = re.compile(r'{([^{}+]+)(\+?)}')
+
+
+class DevContext:
+    """
+    Stand in for the Lambda context object
+    """
+    def __init__(self, function_name: str, timeout_ms: int = DEFAULT_TIMEOUT_MS):
+        self.function_name = function_name
+        self.function_version = '$LATEST'
+        self.invoked_function_arn = f"arn:aws:lambda:local:000000000000:function:{function_name}"
+        self.memory_limit_in_mb = 128
+        self.aws_request_id = None
+        self.log_group_name = f"/aws/lambda/{function_name}"
+        self.log_stream_name = 'local'
+        self._deadline = None
+        self._timeout_ms = timeout_ms
+
+    def __repr__(self):
+        return f"DevContext(function_name={self.function_name!r}, aws_request_id={self.aws_request_id!r})"
+
+    def start(self, request_id: str):
+        self.aws_request_id = request_id
+        self._deadline = time.monotonic() + self._timeout_ms / 1000
+
+    def get_remaining_time_in_millis(self) -> int:
+        return max(int((self._deadline - time.monotonic()) * 1000), 0) if self._deadline else self._timeout_ms
+
+
+def _compile_resource(resource: str):
+    def replace(match):
+        # {proxy+} is a greedy path parameter
+        return f"(?P<{match.group(1)}>.+)" if match.group(2) else f"(?P<{match.group(1)}>[^/]+)"
+
+    pattern = ''
+    position = 0
+
+    for match in _PATH_PARAM.finditer(resource):
+        pattern += re.escape(resource[position:match.start()]) + replace(match)
+        position = match.end()
+
+    return re.compile(pattern + re.escape(resource[position:]) + '/?$')
+
+
+class ResourceMatcher:
+    """
+    Finds the resource template a request path was made against, as API Gateway does. Static templates win over ones
+    with path parameters, and greedy ({proxy+}) ones come last.
+    """
+    def __init__(self, resources=()):
+        self.static = {resource: resource for resource in resources if '{' not in resource}
+        templated = sorted((resource for resource in resources if '{' in resource),
+                           key=lambda resource: ('+}' in resource, -resource.count('/'), resource))
+        self.templated = [(resource, _compile_resource(resource)) for resource in templated]
+
+    def __repr__(self):
+        return f"ResourceMatcher(resources={sorted(self.static) + [resource for resource, _ in self.templated]})"
+
+    def match(self, path: str):
+        """
+        :return: (resource, path parameters or None), the path itself if no resource matches
+        """
+        resource = self.static.get(path) or self.static.get(path.rstrip('/'))
+
+        if resource is not None:
+            return resource, None
+
+        for resource, pattern in self.templated:
+            match = pattern.match(path)
+
+            if match:
+                return resource, match.groupdict()
+
+        return path, None
+
+
+_worker_handler = None
+
+
+def _init_worker(handler_name: str):
+    global _worker_handler
+    _worker_handler = load_handler(handler_name)
+
+
+def _invoke(event: dict, context):
+    """
+    Runs the handler in a worker process, each process imports the handler itself
+    """
+    return _worker_handler(event, context)
+
+
+def _handler_name(handler) -> str:
+    """
+    :return: the module:attribute name of the handler, for worker processes to import it by
+    """
+    if isinstance(handler, str):
+        return handler
+
+    module, qualname = getattr(handler, '__module__', None), getattr(handler, '__qualname__', None)
+
+    if not module or not qualname or '<' in qualname:
+        raise ValueError('Give the handler as a module:attribute string to run it in processes')
+
+    return f"{module}:{qualname}"
+
+
+class DevServer:
+    """
+    Serves a handler over HTTP. Requests are handled on a pool of worker threads (workers), and with processes set
+    the handler itself runs in a pool of worker processes, closer to Lambda's one request per container at a time and
+    free of the GIL. Worker processes import the handler themselves, so it has to be a module level function or
+    given as a module:attribute string (do that for a Router). Each process keeps its own module state (caches,
+    clients etc.) as separate containers would.
+
+        server = DevServer(handler, resources=['/items', '/items/{itemId}'],
+                           claims=CognitoDetail('user-1', 'me@example.com', 'account-1', True))
+        server.serve_forever()
+
+    :param handler: the (wrapped) handler or a Router, whose routes are used for resources if none are given. Can
+                    also be a module:attribute string.
+    :param resources: resource templates to match request paths against for REST and HTTP API events
+    :param event_format: REST_API, HTTP_API, FUNCTION_URL or ALB (see event_formats)
+    :param claims: authorizer claims to inject into every event: a dict, a CognitoDetail, or a function taking the
+                   request's headers and returning the claims (or None) for per request users
+    :param workers: number of threads handling requests. A thread serves a connection until it's closed, or idle for
+                    keep_alive_timeout seconds, so use at least as many as the load tool's concurrent connections
+    :param processes: number of processes to run the handler in, 0 to run it in the request threads
+    :param stage_vars: stage variables for REST and HTTP API events
+    :param log_requests: log each request to stderr, off by default as it skews load test numbers
+    :param keep_alive_timeout: seconds a connection can sit idle (or a request take to arrive) before it's closed and
+                               its thread freed for other connections
+    """
+    def __init__(self,
+                 handler,
+                 host: str = DEFAULT_HOST,
+                 port: int = DEFAULT_PORT,
+                 resources=None,
+                 event_format: str = REST_API,
+                 claims=None,
+                 workers: int = DEFAULT_WORKERS,
+                 processes: int = 0,
+                 stage_vars: dict = None,
+                 function_name: str = 'local',
+                 log_requests: bool = False,
+                 keep_alive_timeout: float = DEFAULT_KEEP_ALIVE_TIMEOUT):
+        handler_name = _handler_name(handler) if processes else None
+
+        if isinstance(handler, str):
+            handler = load_handler(handler)
+
+        if resources is None:
+            resources = getattr(handler, 'resources', ())
+
+        if isinstance(claims, CognitoDetail):
+            claims = cognito_claims(claims)
+
+        self.handler = handler
+        self.event_format = event_format
+        self.claims = claims
+        self.stage_vars = stage_vars
+        self.function_name = function_name
+        self.log_requests = log_requests
+        self.keep_alive_timeout = keep_alive_timeout
+        self.matcher = ResourceMatcher(resources)
+        self.factory = EventFactory(event_format)
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='dev-server')
+        self.process_pool = ProcessPoolExecutor(max_workers=processes, initializer=_init_worker,
+                                                initargs=(handler_name,)) if processes else None
+        self.httpd = _PoolHTTPServer((host, port), _make_request_handler(self), self.executor)
+        self._request_count = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def __repr__(self):
+        return f"DevServer(address={self.server_address}, event_format={self.event_format!r})"
+
+    @property
+    def server_address(self):
+        return self.httpd.server_address[:2]
+
+    def next_request_id(self) -> str:
+        with self._lock:
+            self._request_count += 1
+            return f"local-{self._request_count:012d}"
+
+    def get_claims(self, headers: dict):
+        return self.claims(headers) if callable(self.claims) else self.claims
+
+    def make_event(self, method: str, target: str, headers: dict, body: bytes) -> dict:
+        """
+        Turns an HTTP request into a proxy event for the server's event format
+        """
+        url = urlsplit(target)
+        path = url.path or '/'
+        query = {}
+
+        for name, value in parse_qsl(url.query, keep_blank_values=True):
+            if name not in query:
+                query[name] = value
+            elif isinstance(query[name], list):
+                query[name].append(value)
+            else:
+                query[name] = [query[name], value]
+
+        raw_body, is_base64_encoded = _encode_body(body, headers)
+        resource, path_params = self.matcher.match(path)
+        claims = None if self.event_format == ALB else self.get_claims(headers)
+        event = self.factory.make(http_method=method,
+                                  resource=resource,
+                                  path=path,
+                                  path_params=path_params,
+                                  query_string_params=query or None,
+                                  stage_vars=self.stage_vars,
+                                  claims=claims,
+                                  raw_body=raw_body,
+                                  is_base64_encoded=is_base64_encoded)
+        # the real request's headers, not the template's. Only REST APIs pass the header names on as sent
+        if self.event_format != REST_API:
+            headers = {name.lower(): value for name, value in headers.items()}
+
+        if 'multiValueHeaders' in event:
+            event['multiValueHeaders'] = {name: value.split(',') for name, value in headers.items()}
+        else:
+            event['headers'] = headers
+
+        if self.event_format in (HTTP_API, FUNCTION_URL):
+            event['rawQueryString'] = url.query
+            cookie = headers.get('cookie')
+
+            if cookie:
+                event['cookies'] = [part.strip() for part in cookie.split(';') if part.strip()]
+
+        return event
+
+    def invoke(self, event: dict) -> dict:
+        request_id = self.next_request_id()
+
+        if self.process_pool is not None:
+            context = DevContext(self.function_name)
+            context.start(request_id)
+            return self.process_pool.submit(_invoke, event, context).result()
+
+        # one context per thread, as a container reuses its context object
+        context = getattr(self._local, 'context', None)
+
+        if context is None:
+            context = self._local.context = DevContext(self.function_name)
+
+        context.start(request_id)
+        return self.handler(event, context)
+
+    def serve_forever(self):
+        host, port = self.server_address
+        print(f"Serving {self.handler!r} as {self.event_format} events on http://{host}:{port}", file=sys.stderr)
+
+        try:
+            self.httpd.serve_forever()
+        finally:
+            self.shutdown()
+
+    def start(self) -> threading.Thread:
+        """
+        Serves in a background thread, for tests, use shutdown() to stop
+        """
+        thread = threading.Thread(target=self.httpd.serve_forever, name='dev-server', daemon=True)
+        thread.start()
+        return thread
+
+    def shutdown(self):
+        self.httpd.shutdown()
+        # closes the open connections too, so the request threads finish rather than waiting on idle clients
+        self.httpd.server_close()
+        self.executor.shutdown(wait=False)
+
+        if self.process_pool is not None:
+            self.process_pool.shutdown(wait=False)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown()
+
+
+def _encode_body(body: bytes, headers: dict):
+    """
+    Text bodies are passed as is and anything else base64 encoded, as API Gateway does for binary media types.
+
+    :return: (body, is_base64_encoded)
+    """
+    if not body:
+        return None, False
+
+    if not headers.get('content-encoding'):
+        try:
+            return body.decode('utf-8'), False
+        except UnicodeDecodeError:
+            pass
+
+    return binascii.b2a_base64(body, newline=False).decode('ascii'), True
+
+
+def response_to_http(response: dict):
+    """
+    Maps a proxy response (in any of the event formats) to HTTP
+
+    :return: (status code, list of (header name, value), body bytes)
+    """
+    status = response.get('statusCode', 200)
+    headers = []
+
+    for name, value in (response.get('headers') or {}).items():
+        headers.append((name, str(value)))
+
+    for name, values in (response.get('multiValueHeaders') or {}).items():
+        headers.extend((name, str(value)) for value in values)
+
+    for cookie in response.get('cookies') or ():
+        headers.append((HEADER_SET_COOKIE, cookie))
+
+    body = response.get('body')
+
+    if body is None:
+        body = b''
+    elif response.get('isBase64Encoded'):
+        body = binascii.a2b_base64(body)
+    else:
+        body = body.encode('utf-8')
+
+    return status, headers, body
+
+
+def _make_request_handler(server: DevServer):
+    class RequestHandler(BaseHTTPRequestHandler):
+        # keep-alive, load tools reuse their connections. Idle ones are closed after the timeout so they don't hold
+        # on to a pool thread
+        protocol_version = 'HTTP/1.1'
+        server_version = 'LambdaProxyDevServer'
+        timeout = server.keep_alive_timeout
+
+        def handle_request(self):
+            length = int(self.headers.get('Content-Length') or 0)
+            body = self.rfile.read(length) if length else b''
+            headers = {}
+
+            for name, value in self.headers.items():
+                # repeated headers are joined, as API Gateway does in the (single value) headers
+                headers[name] = f"{headers[name]},{value}" if name in headers else value
+
+            try:
+                event = server.make_event(self.command, self.path, headers, body)
+                status, response_headers, response_body = response_to_http(server.invoke(event))
+            except Exception as e:
+                # the wrapper handles the handler's errors, this is a handler that isn't wrapped (or a bug here)
+                self.log_error('Unhandled error: %r', e)
+                status, response_headers = 502, [('Content-Type', 'application/json')]
+                response_body = json.dumps({"message": "Internal server error"}).encode('utf-8')
+
+            self.send_response(status)
+
+            for name, value in response_headers:
+                if name.lower() != 'content-length':
+                    self.send_header(name, value)
+
+            self.send_header('Content-Length', str(len(response_body)))
+            self.end_headers()
+
+            if self.command != 'HEAD':
+                self.wfile.write(response_body)
+
+        do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = do_HEAD = do_OPTIONS = handle_request
+
+        def log_message(self, format, *args):
+            if server.log_requests:
+                super().log_message(format, *args)
+
+    return RequestHandler
+
+
+class _PoolHTTPServer(HTTPServer):
+    """
+    Handles each connection on a thread from a fixed size pool rather than a new thread per connection
+    """
+    def __init__(self, server_address, request_handler, executor):
+        self.executor = executor
+        self._connections = set()
+        self._connections_lock = threading.Lock()
+        super().__init__(server_address, request_handler)
+
+    def process_request(self, request, client_address):
+        with self._connections_lock:
+            self._connections.add(request)
+
+        self.executor.submit(self._process_request, request, client_address)
+
+    def _process_request(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            with self._connections_lock:
+                self._connections.discard(request)
+
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+
+        with self._connections_lock:
+            connections = list(self._connections)
+
+        for connection in connections:
+            try:
+                connection.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+
+def load_handler(name: str):
+    """
+    :param name: module:attribute, e.g. my_app.handlers:handler
+    """
+    from importlib import import_module
+
+    module_name, _, attribute = name.partition(':')
+
+    if not attribute:
+        raise ValueError(f"Handler must be given as module:attribute, not {name!r}")
+
+    handler = import_module(module_name)
+
+    for part in attribute.split('.'):
+        handler = getattr(handler, part)
+
+    return handler
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('handler', help='the handler as module:attribute')
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--format', default=REST_API, choices=(REST_API, HTTP_API, FUNCTION_URL, ALB),
+                        help='event format (default %(default)s)')
+    parser.add_argument('--resource', action='append', dest='resources',
+                        help='resource template to match paths against, repeat for each one (a Router\'s '
+                             'routes are used if not given)')
+    parser.add_argument('--claims', type=json.loads, help='authorizer claims to inject, as JSON')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help='request threads (default %(default)s)')
+    parser.add_argument('--processes', type=int, default=0, help='run the handler in this many processes')
+    parser.add_argument('--keep-alive-timeout', type=float, default=DEFAULT_KEEP_ALIVE_TIMEOUT,
+                        help='seconds before idle connections are closed (default %(default)s)')
+    parser.add_argument('--log-requests', action='store_true')
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, '')
+    server = DevServer(args.handler, host=args.host, port=args.port, resources=args.resources,
+                       event_format=args.format, claims=args.claims, workers=args.workers, processes=args.processes,
+                       function_name=args.handler.rpartition(':')[2], log_requests=args.log_requests,
+                       keep_alive_timeout=args.keep_alive_timeout)
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+from .constants import HttpStatusCodes
+from .compression import ENCODING_BROTLI, ENCODING_GZIP, ENCODING_DEFLATE, HEADER_CONTENT_ENCODING
+
+HEADER_ETAG = "ETag"
+HEADER_IF_NONE_MATCH = "If-None-Match"
+
+WEAK_PREFIX = 'W/'
+
+# suffixes added to the tag of compressed bodies, a strong ETag has to differ between content codings
+_ENCODING_SUFFIXES = tuple(f"-{encoding}" for encoding in (ENCODING_BROTLI, ENCODING_GZIP, ENCODING_DEFLATE))
+
+
+def make_etag(body) -> str:
+    """
+    Strong ETag for a response body: a 128 bit blake2b digest, which is faster than md5/sha1 and more than unique
+    enough for telling versions of a response apart.
+
+    :param body: str or bytes
+    :return: the quoted tag
+    """
+    from hashlib import blake2b
+
+    if isinstance(body, str):
+        body = body.encode('utf-8')
+
+    return f'"{blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def format_etag(value) -> str:
+    """
+    Quotes a handler supplied tag or version (e.g. a row version number) unless it's already a quoted or weak tag
+    """
+    value = str(value)
+
+    if value.startswith('"') or value.startswith(WEAK_PREFIX):
+        return value
+
+    return f'"{value}"'
+
+
+def encoding_etag(etag: str, encoding: str) -> str:
+    """
+    The tag for the body compressed with encoding
+    """
+    return f'{etag[:-1]}-{encoding}"' if etag.endswith('"') else f'{etag}-{encoding}'
+
+
+def _opaque_tag(tag: str) -> str:
+    if tag.startswith(WEAK_PREFIX):
+        tag = tag[len(WEAK_PREFIX):]
+
+    tag = tag.strip('"')
+
+    for suffix in _ENCODING_SUFFIXES:
+        if tag.endswith(suffix):
+            return tag[:-len(suffix)]
+
+    return tag
+
+
+def parse_if_none_match(header: str) -> frozenset:
+    """
+    Parses an If-None-Match header into the set of opaque tags it lists (without quotes, W/ prefixes or content
+    coding suffixes, If-None-Match uses the weak comparison). "*" is kept as is.
+
+    :param header: the header value (may be None)
+    :return:
+    """
+    if not header:
+        return frozenset()
+
+    return frozenset(_opaque_tag(tag.strip()) for tag in header.split(',') if tag.strip())
+
+
+def etag_matches(if_none_match, etag) -> bool:
+    """
+    :param if_none_match: the If-None-Match header value or the set returned by parse_if_none_match
+    :param etag: the response's tag
+    :return: True if the client already has this version of the response
+    """
+    if not if_none_match or not etag:
+        return False
+
+    if isinstance(if_none_match, str):
+        if_none_match = parse_if_none_match(if_none_match)
+
+    return '*' in if_none_match or _opaque_tag(etag) in if_none_match
+
+
+def not_modified_response(response: dict) -> dict:
+    """
+    Turns a 200 proxy response into the body-less 304 for it, keeping the headers (ETag included)
+    """
+    headers = dict(response['headers'])
+    headers.pop(HEADER_CONTENT_ENCODING, None)
+
+    return {"statusCode": HttpStatusCodes.NOT_MODIFIED, "headers": headers}
@@ -0,0 +1,213 @@
+REST_API = 'rest'
+HTTP_API = 'http'
+FUNCTION_URL = 'function_url'
+ALB = 'alb'
+
+HEADER_SET_COOKIE = 'Set-Cookie'
+
+_FUNCTION_URL_DOMAIN = '.lambda-url.'
+
+
+class RestApiFormat:
+    """
+    API Gateway REST API proxy events (payload format 1.0), the shape the rest of the library was written for. Each
+    format exposes the same accessors over the raw event (nothing is copied) and converts the proxy response built by
+    LambdaProxyResponse to the shape the event source expects.
+    """
+    name = REST_API
+
+    def method(self, event: dict) -> str:
+        return event.get('httpMethod')
+
+    def resource(self, event: dict) -> str:
+        """
+        The resource template the request matched, e.g. /items/{itemId}
+        """
+        return event.get('resource')
+
+    def path(self, event: dict) -> str:
+        return event.get('path')
+
+    def headers(self, event: dict) -> dict:
+        return event.get('headers')
+
+    def path_params(self, event: dict) -> dict:
+        return event.get('pathParameters')
+
+    def query_params(self, event: dict) -> dict:
+        return event.get('queryStringParameters')
+
+    def multi_value_query_params(self, event: dict) -> dict:
+        return event.get('multiValueQueryStringParameters')
+
+    def authorizer(self, event: dict) -> dict:
+        request_context = event.get('requestContext')
+        return request_context.get('authorizer') if request_context else None
+
+    def claims(self, authorizer: dict) -> dict:
+        return authorizer.get('claims')
+
+    def format_response(self, response: dict, event: dict) -> dict:
+        return response
+
+    def __repr__(self):
+        return f"{type(self).__name__}()"
+
+
+class HttpApiFormat(RestApiFormat):
+    """
+    API Gateway HTTP API events (payload format 2.0). Repeated query string parameters arrive comma separated and
+    cookies are sent in the response's cookies list rather than Set-Cookie headers.
+    """
+    name = HTTP_API
+
+    def method(self, event: dict) -> str:
+        return event['requestContext']['http']['method']
+
+    def resource(self, event: dict) -> str:
+        # routeKey is "<METHOD> <resource>", or $default for the catch all route (and Function URLs) in which case
+        # the request path is the closest thing there is
+        route_key = event.get('routeKey')
+
+        if not route_key or route_key == '$default':
+            return event.get('rawPath')
+
+        return route_key.partition(' ')[2]
+
+    def path(self, event: dict) -> str:
+        return event.get('rawPath')
+
+    def multi_value_query_params(self, event: dict) -> dict:
+        params = event.get('queryStringParameters')
+        return {name: value.split(',') for name, value in params.items()} if params else None
+
+    def claims(self, authorizer: dict) -> dict:
+        # JWT authorizers put the token's claims under jwt, Lambda authorizers return their context under lambda
+        jwt = authorizer.get('jwt')
+        return jwt.get('claims') if jwt else authorizer.get('lambda')
+
+    def format_response(self, response: dict, event: dict) -> dict:
+        multi_value_headers = response.pop('multiValueHeaders', None)
+
+        if multi_value_headers:
+            for name, values in multi_value_headers.items():
+                if name == HEADER_SET_COOKIE:
+                    response['cookies'] = list(values)
+                else:
+                    response['headers'][name] = ','.join(values)
+
+        return response
+
+
+class FunctionUrlFormat(HttpApiFormat):
+    """
+    Lambda Function URL events, these are payload format 2.0 events without API Gateway
+    """
+    name = FUNCTION_URL
+
+
+class AlbFormat(RestApiFormat):
+    """
+    Application Load Balancer target events. There are no resource templates or path parameters (the path is used as
+    the resource) and query string parameters are passed through URL encoded. Responses need a statusDescription and
+    have to use multiValueHeaders when multi value headers are enabled on the target group.
+    """
+    name = ALB
+
+    def resource(self, event: dict) -> str:
+        return event.get('path')
+
+    def headers(self, event: dict) -> dict:
+        headers = event.get('headers')
+
+        if headers is None and event.get('multiValueHeaders'):
+            return {name: values[-1] for name, values in event['multiValueHeaders'].items() if values}
+
+        return headers
+
+    def path_params(self, event: dict) -> dict:
+        return None
+
+    def query_params(self, event: dict) -> dict:
+        params = event.get('queryStringParameters')
+
+        if params is None:
+            params = self.multi_value_query_params(event)
+            return {name: values[-1] for name, values in params.items()} if params else None
+
+        from urllib.parse import unquote_plus
+
+        return {unquote_plus(name): unquote_plus(value) for name, value in params.items()}
+
+    def multi_value_query_params(self, event: dict) -> dict:
+        params = event.get('multiValueQueryStringParameters')
+
+        if params is None:
+            params = event.get('queryStringParameters')
+            return {name: [value] for name, value in self.query_params(event).items()} if params else None
+
+        from urllib.parse import unquote_plus
+
+        return {unquote_plus(name): [unquote_plus(value) for value in values] for name, values in params.items()}
+
+    def authorizer(self, event: dict) -> dict:
+        return None
+
+    def format_response(self, response: dict, event: dict) -> dict:
+        from http import HTTPStatus
+
+        status_code = response['statusCode']
+
+        try:
+            response['statusDescription'] = f"{status_code} {HTTPStatus(status_code).phrase}"
+        except ValueError:
+            response['statusDescription'] = str(status_code)
+
+        response.setdefault('isBase64Encoded', False)
+        multi_value_headers = dict(response.pop('multiValueHeaders', None) or {})
+
+        if 'multiValueHeaders' in event:
+            # with multi value headers enabled the load balancer ignores headers
+            for name, value in response.pop('headers').items():
+                multi_value_headers.setdefault(name, [str(value)])
+
+            response['multiValueHeaders'] = multi_value_headers
+        else:
+            # the load balancer wants string values, as in multiValueHeaders
+            headers = {name: str(value) for name, value in response['headers'].items()}
+
+            for name, values in multi_value_headers.items():
+                # only one value per header can be sent, the first cookie wins
+                headers[name] = str(values[0])
+
+            response['headers'] = headers
+
+        return response
+
+
+REST_API_FORMAT = RestApiFormat()
+HTTP_API_FORMAT = HttpApiFormat()
+FUNCTION_URL_FORMAT = FunctionUrlFormat()
+ALB_FORMAT = AlbFormat()
+
+
+def detect_format(event: dict):
+    """
+    Works out the event source from a couple of key probes: HTTP API and Function URL events have version 2.0
+    (Function URLs being on a lambda-url domain), ALB events have an elb request context and anything else is treated
+    as a REST API event.
+
+    :return: the format object for the event
+    """
+    request_context = event.get('requestContext')
+
+    if event.get('version') == '2.0':
+        if request_context and _FUNCTION_URL_DOMAIN in request_context.get('domainName', ''):
+            return FUNCTION_URL_FORMAT
+
+        return HTTP_API_FORMAT
+
+    if request_context and 'elb' in request_context:
+        return ALB_FORMAT
+
+    return REST_API_FORMAT
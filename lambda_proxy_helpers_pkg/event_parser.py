@@ -1,34 +1,411 @@
 import os
+import re
 import json
-from .lambda_errors import InvalidUserError, MissingParameterError
+import zlib
+import binascii
+from json.decoder import scanstring
+from . import json_backend
+from .compression import parse_accept_encoding
+from .etag import HEADER_IF_NONE_MATCH, parse_if_none_match
+from .pagination import CURSOR_PARAM, decode_cursor
+from .params import Param, PATH, QUERY, compile_param
+from .event_formats import detect_format
+from .instrumentation import span, SPAN_PARSE, SPAN_AUTH
+from .form_data import FORM_URLENCODED, MULTIPART_FORM_DATA, parse_header_params, parse_form_urlencoded, \
+    parse_multipart, iter_multipart
+from .lambda_errors import InvalidUserError, MissingParameterError, PayloadTooLargeError, ValidationError
 
 CUSTOM_ACCOUNT_ID = "custom:account_id"
 CUSTOM_ACCOUNT_CREATED = "custom:account_created"
 
+MAX_BODY_SIZE_ENV = "MAX_BODY_SIZE"
+
+# request Content-Encodings that are decompressed, wbits 47 accepts both gzip and zlib (HTTP deflate) streams
+_DECOMPRESSED_ENCODINGS = frozenset(('gzip', 'x-gzip', 'deflate'))
+_DECOMPRESS_WBITS = 47
+
+_UNSET = object()
+_DECODER = json.JSONDecoder()
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_STRING = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+_CONTAINER_TOKEN = re.compile(r'["\[\]{}]')
+_SCALAR = re.compile(r'-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][-+]?[0-9]+)?|true|false|null')
+_CLOSING = {'[': ']', '{': '}'}
+
+
+def _skip_value(doc, idx):
+    """
+    Returns the index just past the JSON value starting at idx without building it. Strings are matched with a
+    regex and containers are skipped by tracking their brackets, so nothing is allocated for skipped values.
+
+    Only the outline of the value is checked: strings must be terminated, brackets balanced and a scalar must be a
+    number, true, false or null. What's inside a skipped container (commas, colons, scalars) isn't validated.
+
+    :param doc: JSON document
+    :param idx: index of the first character of the value
+    :return: index of the first character after the value
+    :raises ValueError: if the value is malformed
+    """
+    char = doc[idx]
+
+    if char == '"':
+        match = _STRING.match(doc, idx)
+
+        if match is None:
+            raise ValueError("Unterminated string")
+
+        return match.end()
+
+    if char in '[{':
+        expected = []
+
+        while True:
+            match = _CONTAINER_TOKEN.search(doc, idx)
+
+            if match is None:
+                raise ValueError("Unterminated container")
+
+            char = match.group()
+
+            if char == '"':
+                idx = _skip_value(doc, match.start())
+                continue
+
+            idx = match.end()
+
+            if char in '[{':
+                expected.append(_CLOSING[char])
+            elif char != expected.pop():
+                raise ValueError("Mismatched bracket")
+            elif not expected:
+                return idx
+
+    match = _SCALAR.match(doc, idx)
+
+    if match is None:
+        raise ValueError("Expecting value")
+
+    return match.end()
+
+
+def _scan_top_level(doc, prop_names):
+    """
+    Decodes only the requested top level properties of a JSON object. Values for other keys before the last
+    requested property is found are skipped rather than built (see _skip_value for how much of them is checked).
+    The rest of the object is then decoded in one go by the json module, which is faster than skipping it a key at
+    a time and checks it fully. Either way the whole object is read so, as with json.loads, the last of any
+    duplicate keys wins.
+
+    Raises ValueError/IndexError/AttributeError if the document isn't a well formed JSON object, callers should
+    fall back to a full decode in that case so the usual json error is surfaced.
+
+    :param doc: JSON document
+    :param prop_names: set of top level property names to decode
+    :return: dict of the properties found
+    """
+    found = {}
+    idx = _WHITESPACE.match(doc, 0).end()
+
+    if doc[idx] != '{':
+        raise ValueError("Body is not a JSON object")
+
+    idx = _WHITESPACE.match(doc, idx + 1).end()
+
+    if doc[idx] == '}':
+        return _check_end(doc, idx + 1, found)
+
+    while True:
+        if doc[idx] != '"':
+            raise ValueError("Expected property name")
+
+        key, idx = scanstring(doc, idx + 1)
+        idx = _WHITESPACE.match(doc, idx).end()
+
+        if doc[idx] != ':':
+            raise ValueError("Expected ':' delimiter")
+
+        idx = _WHITESPACE.match(doc, idx + 1).end()
+
+        if key in prop_names:
+            found[key], idx = _DECODER.raw_decode(doc, idx)
+        else:
+            idx = _skip_value(doc, idx)
+
+        idx = _WHITESPACE.match(doc, idx).end()
+
+        if doc[idx] == '}':
+            return _check_end(doc, idx + 1, found)
+
+        if doc[idx] != ',':
+            raise ValueError("Expected ',' delimiter")
+
+        idx = _WHITESPACE.match(doc, idx + 1).end()
+
+        if len(found) == len(prop_names):
+            if doc[idx] != '"':
+                raise ValueError("Expected property name")
+
+            # the remaining properties as an object of their own, only needed for any later duplicates
+            rest = '{' + doc[idx:]
+            remaining, end = _DECODER.raw_decode(rest)
+            _check_end(rest, end, found)
+
+            for name in prop_names:
+                if name in remaining:
+                    found[name] = remaining[name]
+
+            return found
+
+
+def _check_end(doc, idx, found):
+    if _WHITESPACE.match(doc, idx).end() != len(doc):
+        raise ValueError("Extra data")
+
+    return found
+
+
+def find_header(headers: dict, name: str):
+    """
+    Case insensitive header lookup (API Gateway passes headers through with whatever casing the client used).
+
+    :param headers: the event headers dict (may be None)
+    :param name: header name
+    :return: the header value or None
+    """
+    if not headers:
+        return None
+
+    value = headers.get(name)
+
+    if value is None:
+        lower_name = name.lower()
+
+        for key, header_value in headers.items():
+            if key.lower() == lower_name:
+                return header_value
+
+    return value
+
 
 class EventParser:
-    def __init__(self, event: dict):
+    # a view over the event, nothing is copied out of it up front
+    __slots__ = ('event', 'event_format', 'user_id', 'account_id', 'account_created', 'max_body_size',
+                 '_raw_body', '_event_body', '_form', '_headers', '_params')
+
+    def __init__(self, event: dict, max_body_size: int = None):
+        """
+        The request body is not decoded here, it's decoded on first use of event_body/get_body_prop/form so handlers
+        that only need path or query params (or that fail auth) never pay for it.
+
+        REST API (v1), HTTP API (v2), Function URL and ALB events are all supported, event_format is the
+        event_formats adapter for the event's shape.
+
+        :param event: raw Lambda proxy event
+        :param max_body_size: maximum body length (in characters) that will be parsed. Defaults to the
+                              MAX_BODY_SIZE environment variable, if set, otherwise unlimited.
+        """
         self.event = event
+        self.event_format = detect_format(event)
         self.user_id = None
         self.account_id = None
         self.account_created = None
 
-        if self.event['body']:
-            self.event_body = json.loads(self.event['body'])
-        else:
-            self.event_body = None
+        if max_body_size is None and os.environ.get(MAX_BODY_SIZE_ENV):
+            max_body_size = int(os.environ[MAX_BODY_SIZE_ENV])
+
+        self.max_body_size = max_body_size
+        self._raw_body = _UNSET
+        self._event_body = _UNSET
+        self._form = None
+        self._headers = None
+        self._params = {}
+
+    def _get_raw_body(self):
+        if self._raw_body is _UNSET:
+            # HTTP API and Function URL events leave body out altogether when there isn't one
+            body = self.event.get('body')
+
+            if body and self.max_body_size is not None and len(body) > self.max_body_size:
+                raise PayloadTooLargeError(f"Request body exceeds the maximum size of {self.max_body_size}")
+
+            if body and self.event.get('isBase64Encoded'):
+                body = binascii.a2b_base64(body)
+
+                content_encoding = self.get_header('Content-Encoding')
+
+                if content_encoding and content_encoding.strip().lower() in _DECOMPRESSED_ENCODINGS:
+                    body = self._decompress(body)
+
+            self._raw_body = body
+
+        return self._raw_body
+
+    def _decompress(self, body: bytes) -> bytes:
+        # max_length stops a small compressed body expanding to something huge before the size check
+        decompressor = zlib.decompressobj(_DECOMPRESS_WBITS)
+        max_length = self.max_body_size + 1 if self.max_body_size is not None else 0
+
+        try:
+            body = decompressor.decompress(body, max_length)
+        except zlib.error:
+            raise ValidationError('Request body could not be decompressed')
+
+        if self.max_body_size is not None and (len(body) > self.max_body_size or decompressor.unconsumed_tail):
+            raise PayloadTooLargeError(f"Request body exceeds the maximum size of {self.max_body_size}")
+
+        return body
+
+    @property
+    def raw_body(self):
+        """
+        The undecoded request body, bytes if API Gateway base64 encoded it (binary media types) otherwise a str.
+        gzip/deflate bodies (Content-Encoding) are decompressed.
+        """
+        return self._get_raw_body()
+
+    @property
+    def event_body(self):
+        if self._event_body is _UNSET:
+            body = self._get_raw_body()
+
+            with span(SPAN_PARSE):
+                self._event_body = json_backend.decode(body) if body else None
+
+        return self._event_body
+
+    @event_body.setter
+    def event_body(self, value):
+        self._event_body = value
 
     @property
     def method(self):
-        return self.event['httpMethod']
+        return self.event_format.method(self.event)
 
     @property
     def resource_path(self):
-        return self.event['resource']
+        return self.event_format.resource(self.event)
 
-    def get_path_param(self, param_name):
-        if self.event['pathParameters']:
-            path_value = self.event['pathParameters'].get(param_name)
+    @property
+    def path(self):
+        return self.event_format.path(self.event)
+
+    @property
+    def path_params(self) -> dict:
+        return self.event_format.path_params(self.event)
+
+    @property
+    def query_params(self) -> dict:
+        params = self._params.get('query', _UNSET)
+
+        if params is _UNSET:
+            params = self._params['query'] = self.event_format.query_params(self.event)
+
+        return params
+
+    @property
+    def multi_value_query_params(self) -> dict:
+        params = self._params.get('multi_value_query', _UNSET)
+
+        if params is _UNSET:
+            params = self._params['multi_value_query'] = self.event_format.multi_value_query_params(self.event)
+
+        return params
+
+    def get_header(self, header_name):
+        """
+        Case insensitive header lookup. The index of lower cased names is built on first use.
+        """
+        if self._headers is None:
+            headers = self.event_format.headers(self.event)
+            self._headers = {name.lower(): value for name, value in headers.items()} if headers else {}
+
+        return self._headers.get(header_name.lower())
+
+    @property
+    def content_type(self) -> str:
+        """
+        The request's media type, lower cased and without parameters (e.g. multipart/form-data)
+        """
+        return parse_header_params(self.get_header('Content-Type'))[0]
+
+    @property
+    def form(self) -> dict:
+        """
+        The fields of an application/x-www-form-urlencoded or multipart/form-data body, decoded on first use. Values
+        are strings except for multipart file fields, which are form_data.MultipartPart (the file's data is a
+        memoryview over the body, not a copy). Repeated fields are collected into a list.
+
+        :raises ValidationError: if the body is another content type or is malformed
+        """
+        if self._form is None:
+            content_type, params = parse_header_params(self.get_header('Content-Type'))
+            body = self._get_raw_body()
+
+            with span(SPAN_PARSE):
+                if not body:
+                    self._form = {}
+                elif content_type == FORM_URLENCODED:
+                    self._form = parse_form_urlencoded(body)
+                elif content_type == MULTIPART_FORM_DATA:
+                    self._form = parse_multipart(body, params.get('boundary'))
+                else:
+                    raise ValidationError(f"Expected a form body, not {content_type or 'no content type'}")
+
+        return self._form
+
+    def iter_multipart(self):
+        """
+        Yields the parts of a multipart/form-data body (form_data.MultipartPart) one at a time without building the
+        whole form, e.g. to stream large uploads elsewhere
+
+        :raises ValidationError: if the body isn't multipart or is malformed
+        """
+        content_type, params = parse_header_params(self.get_header('Content-Type'))
+
+        if content_type != MULTIPART_FORM_DATA:
+            raise ValidationError(f"Expected a multipart body, not {content_type or 'no content type'}")
+
+        return iter_multipart(self._get_raw_body() or b'', params.get('boundary'))
+
+    @property
+    def accepted_encodings(self) -> dict:
+        """
+        The request's Accept-Encoding header parsed into coding -> quality value
+        """
+        return parse_accept_encoding(self.get_header('Accept-Encoding'))
+
+    @property
+    def if_none_match(self) -> frozenset:
+        """
+        The tags in the request's If-None-Match header (unquoted, see etag.parse_if_none_match), empty if there
+        isn't one
+        """
+        return parse_if_none_match(self.get_header(HEADER_IF_NONE_MATCH))
+
+    def _get_typed_param(self, param_name: str, spec: Param, source: str):
+        key = (source, param_name, spec)
+        value = self._params.get(key, _UNSET)
+
+        if value is _UNSET:
+            value = self._params[key] = compile_param(param_name, spec, source)(self)
+
+        return value
+
+    def get_path_param(self, param_name, spec: Param = None):
+        """
+        :param param_name: path parameter name
+        :param spec: a params.Param to convert the value to its type (and validate it), otherwise the raw string is
+                     returned and a missing value always raises
+        :raises MissingParameterError: if the parameter is missing or empty (and required)
+        :raises InvalidParameterError: if the value can't be converted to the spec's type
+        """
+        if spec is not None:
+            return self._get_typed_param(param_name, spec, PATH)
+
+        path_params = self.path_params
+
+        if path_params:
+            path_value = path_params.get(param_name)
 
             if path_value:
                 return path_value
@@ -41,13 +418,107 @@ class EventParser:
 
         return self.event_body.get(prop_name)
 
-    def get_query_param(self, param_name):
-        if not self.event['queryStringParameters']:
+    def get_body_props(self, *prop_names) -> dict:
+        """
+        Returns a dict of the requested top level body properties (missing properties are None). If the body
+        hasn't been decoded yet the values in front of the last requested property are skipped rather than being
+        built and thrown away. The result matches event_body's, including for duplicate keys, but skipped values
+        are only loosely checked (see _skip_value), use event_body if the whole body must be valid JSON.
+
+        :param prop_names: top level property names to retrieve
+        :return:
+        """
+        if self._event_body is _UNSET:
+            body = self._get_raw_body()
+
+            if not body:
+                return dict.fromkeys(prop_names)
+
+            try:
+                if not isinstance(body, str):
+                    body = body.decode('utf-8')
+
+                found = _scan_top_level(body, set(prop_names))
+                return {name: found.get(name) for name in prop_names}
+            except (ValueError, IndexError, AttributeError):
+                # not a (well formed) object, let the full decode below raise/handle it as usual
+                pass
+
+        if not isinstance(self.event_body, dict):
+            return dict.fromkeys(prop_names)
+
+        return {name: self.event_body.get(name) for name in prop_names}
+
+    def validate_body(self, validator):
+        """
+        Runs a compiled body schema (see validation.compile_schema) over the decoded body
+
+        :param validator: the function returned by compile_schema
+        :return: the body
+        :raises ValidationError: listing every failure
+        """
+        return validator(self.event_body)
+
+    def get_query_param(self, param_name, spec: Param = None):
+        """
+        :param param_name: query string parameter name
+        :param spec: a params.Param to convert the value to its type (and validate it), otherwise the raw string is
+                     returned (or None)
+        :raises MissingParameterError: if the spec is required and the parameter is missing or empty
+        :raises InvalidParameterError: if the value can't be converted to the spec's type
+        """
+        if spec is not None:
+            return self._get_typed_param(param_name, spec, QUERY)
+
+        query_params = self.query_params
+
+        if not query_params:
             return None
 
-        return self.event['queryStringParameters'].get(param_name)
+        return query_params.get(param_name)
 
-    def validate_event_auth(self, requires_account_id: bool = False):
+    def get_query_param_values(self, param_name) -> list:
+        """
+        All the values of a query string parameter that's repeated (?status=a&status=b) from
+        multiValueQueryStringParameters, an empty list if it's not there
+        """
+        params = self.multi_value_query_params
+
+        if params and params.get(param_name) is not None:
+            return params[param_name]
+
+        value = self.get_query_param(param_name)
+        return [value] if value is not None else []
+
+    def get_params(self, params) -> dict:
+        """
+        Extracts and converts a set of parameters compiled with params.compile_params
+
+        :return: dict of parameter name -> converted value
+        """
+        values = self._params.get(params)
+
+        if values is None:
+            values = self._params[params] = params(self)
+
+        return values
+
+    def get_cursor_offset(self, param_name: str = CURSOR_PARAM) -> int:
+        """
+        Decodes the pagination cursor (see pagination.Pagination) sent in the query string
+
+        :param param_name: the query string parameter holding the cursor
+        :return: the offset of the first item of the requested page, 0 if there's no cursor
+        :raises InvalidParameterError: if the cursor is invalid
+        """
+        cursor = self.get_query_param(param_name)
+        return decode_cursor(cursor) if cursor else 0
+
+    @property
+    def cursor_offset(self) -> int:
+        return self.get_cursor_offset()
+
+    def validate_event_auth(self, requires_account_id: bool = False, verifier=None):
         """
         Extracts the user id from the Lambda event dictionary. If the environment variable
         IS_LOCAL_DEBUG is set then it will simply use the values of environment variables TEST_USER_ID,
@@ -56,8 +527,15 @@ class EventParser:
         If it's not local debug but the authorizer and/or claims properties cannot be found then an InvalidUser
         error is raised.
 
+        If a verifier (jwt_auth.JwtVerifier) is given the claims come from verifying the Authorization bearer token
+        in the function rather than from an API Gateway authorizer.
+
         :return:
         """
+        with span(SPAN_AUTH):
+            self._validate_event_auth(requires_account_id, verifier)
+
+    def _validate_event_auth(self, requires_account_id: bool, verifier):
         is_debug = os.environ.get("IS_LOCAL_DEBUG")
 
         if is_debug is not None and is_debug.lower() in ('true', 1, 'y', 't'):
@@ -66,11 +544,15 @@ class EventParser:
             self.account_created = os.environ.get("TEST_ACCOUNT_CREATED") or "N"
             return
 
-        if 'requestContext' not in self.event or not self.event['requestContext'].get('authorizer'):
-            raise InvalidUserError('User invalid or not found (1)')
+        if verifier is not None:
+            claims = verifier.verify_bearer(self.get_header('Authorization'))
+        else:
+            authorizer = self.event_format.authorizer(self.event)
+
+            if not authorizer:
+                raise InvalidUserError('User invalid or not found (1)')
 
-        authorizer = self.event['requestContext'].get('authorizer')
-        claims = authorizer.get('claims')
+            claims = self.event_format.claims(authorizer)
 
         if not claims:
             raise InvalidUserError('User invalid or user not found (2)')
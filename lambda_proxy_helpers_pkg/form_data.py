@@ -0,0 +1,147 @@
+import re
+from collections import namedtuple
+
+from .lambda_errors import ValidationError
+
+FORM_URLENCODED = 'application/x-www-form-urlencoded'
+MULTIPART_FORM_DATA = 'multipart/form-data'
+
+_HEADER_PARAM = re.compile(r';\s*([\w\-]+)\s*=\s*(?:"((?:[^"\\]|\\.)*)"|([^;\s]*))')
+
+
+class MultipartPart(namedtuple('MultipartPart', ['name', 'filename', 'content_type', 'headers', 'data'])):
+    """
+    A part of a multipart/form-data body. data is a memoryview over the request body (no copy is made), use text for
+    the value of a plain field or bytes(part.data) if you need a file's contents as bytes.
+    """
+    __slots__ = ()
+
+    @property
+    def text(self) -> str:
+        return str(self.data, 'utf-8')
+
+
+def parse_header_params(value: str):
+    """
+    Splits a header like Content-Type or Content-Disposition into its value and parameters
+
+        'form-data; name="file"; filename="a.txt"' -> ('form-data', {'name': 'file', 'filename': 'a.txt'})
+
+    :return: (lower case value, dict of lower case parameter name -> value)
+    """
+    if not value:
+        return '', {}
+
+    main, _, rest = value.partition(';')
+    params = {}
+
+    for match in _HEADER_PARAM.finditer(';' + rest):
+        quoted = match.group(2)
+        params[match.group(1).lower()] = quoted.replace('\\"', '"') if quoted is not None else match.group(3)
+
+    return main.strip().lower(), params
+
+
+def parse_form_urlencoded(body) -> dict:
+    """
+    :param body: str or bytes
+    :return: dict of field name -> value, or a list of values for fields that are repeated
+    """
+    from urllib.parse import parse_qsl
+
+    if isinstance(body, (bytes, bytearray, memoryview)):
+        body = str(body, 'latin-1')
+
+    form = {}
+
+    for name, value in parse_qsl(body, keep_blank_values=True):
+        _add_field(form, name, value)
+
+    return form
+
+
+def _add_field(form: dict, name, value):
+    if name not in form:
+        form[name] = value
+    elif isinstance(form[name], list):
+        form[name].append(value)
+    else:
+        form[name] = [form[name], value]
+
+
+def _parse_part_headers(block: memoryview) -> dict:
+    headers = {}
+
+    for line in str(block, 'utf-8', 'replace').split('\r\n'):
+        name, separator, value = line.partition(':')
+
+        if separator:
+            headers[name.strip().lower()] = value.strip()
+
+    return headers
+
+
+def iter_multipart(body, boundary: str):
+    """
+    Yields the parts of a multipart/form-data body one at a time. The body is scanned in place, each part's data is a
+    memoryview slice of it, so multi-MB uploads aren't copied.
+
+    :param body: bytes (a str body is encoded once)
+    :param boundary: the boundary parameter of the Content-Type header
+    :return: generator of MultipartPart
+    :raises ValidationError: if the body isn't well formed
+    """
+    if isinstance(body, str):
+        body = body.encode('utf-8')
+
+    if not boundary:
+        raise ValidationError('Multipart body has no boundary')
+
+    view = memoryview(body)
+    delimiter = b'--' + boundary.encode('latin-1')
+    next_delimiter = b'\r\n' + delimiter
+    position = body.find(delimiter)
+
+    if position < 0:
+        raise ValidationError('Malformed multipart body')
+
+    while True:
+        position += len(delimiter)
+
+        if view[position:position + 2] == b'--':
+            return
+
+        if view[position:position + 2] != b'\r\n':
+            raise ValidationError('Malformed multipart body')
+
+        headers_end = body.find(b'\r\n\r\n', position)
+        data_end = body.find(next_delimiter, position)
+
+        if data_end < 0 or headers_end < 0 or headers_end > data_end:
+            raise ValidationError('Malformed multipart body')
+
+        headers = _parse_part_headers(view[position + 2:headers_end]) if headers_end > position else {}
+        data_start = headers_end + 4
+
+        _, disposition = parse_header_params(headers.get('content-disposition'))
+
+        yield MultipartPart(name=disposition.get('name'),
+                            filename=disposition.get('filename'),
+                            content_type=headers.get('content-type'),
+                            headers=headers,
+                            data=view[data_start:data_end])
+
+        position = data_end + 2
+
+
+def parse_multipart(body, boundary: str) -> dict:
+    """
+    :return: dict of field name -> value, plain fields are decoded to str and file fields (those with a filename)
+             are left as MultipartPart. Repeated fields are collected into a list.
+    """
+    form = {}
+
+    for part in iter_multipart(body, boundary):
+        _add_field(form, part.name, part if part.filename is not None else part.text)
+
+    return form
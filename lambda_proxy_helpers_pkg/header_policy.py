@@ -0,0 +1,108 @@
+HEADER_CONTENT_TYPE = "Content-Type"
+HEADER_ALLOW_ORIGIN = "Access-Control-Allow-Origin"
+HEADER_ALLOW_METHODS = "Access-Control-Allow-Methods"
+HEADER_ALLOW_HEADERS = "Access-Control-Allow-Headers"
+HEADER_ALLOW_CREDENTIALS = "Access-Control-Allow-Credentials"
+HEADER_MAX_AGE = "Access-Control-Max-Age"
+HEADER_CACHE_CONTROL = "Cache-Control"
+HEADER_VARY = "Vary"
+HEADER_LOCATION = "Location"
+
+WILDCARD = '*'
+
+
+def _join(values):
+    if values is None or values == WILDCARD:
+        return WILDCARD
+
+    # a single value, not a list of characters
+    if isinstance(values, str):
+        return values
+
+    return ', '.join(values)
+
+
+class HeaderPolicy:
+    """
+    The set of headers sent with every response. All the static headers are built once when the policy is
+    created so each response only needs a copy of the prebuilt dict plus any request specific values (the
+    allowed origin echo, Location etc.).
+
+    Create your policy at module level (i.e. once per container) and hand it to the wrapper or LambdaProxyResponse.
+    """
+    def __init__(self,
+                 allowed_origins=WILDCARD,
+                 allowed_methods=WILDCARD,
+                 allowed_headers=WILDCARD,
+                 allow_credentials: bool = True,
+                 max_age: int = None,
+                 cache_control: str = None,
+                 extra_headers: dict = None,
+                 content_type: str = 'application/json'):
+        """
+        :param allowed_origins: '*', an origin or a list of origins. With specific origins, the request Origin is
+                                echoed back in Access-Control-Allow-Origin when it's one of them (and omitted
+                                otherwise).
+        :param allowed_methods: '*', an HTTP method or a list of them
+        :param allowed_headers: '*', a header name or a list of them
+        :param allow_credentials: include Access-Control-Allow-Credentials
+        :param max_age: Access-Control-Max-Age in seconds
+        :param cache_control: Cache-Control header value
+        :param extra_headers: any other headers to include (e.g. security headers), these take precedence
+        :param content_type: default Content-Type
+        """
+        headers = {HEADER_CONTENT_TYPE: content_type}
+
+        if allowed_origins is None or allowed_origins == WILDCARD:
+            self.allowed_origins = None
+            headers[HEADER_ALLOW_ORIGIN] = WILDCARD
+        else:
+            if isinstance(allowed_origins, str):
+                allowed_origins = (allowed_origins,)
+
+            self.allowed_origins = frozenset(allowed_origins)
+            headers[HEADER_VARY] = 'Origin'
+
+        headers[HEADER_ALLOW_METHODS] = _join(allowed_methods)
+        headers[HEADER_ALLOW_HEADERS] = _join(allowed_headers)
+
+        if allow_credentials:
+            headers[HEADER_ALLOW_CREDENTIALS] = True
+
+        if max_age is not None:
+            headers[HEADER_MAX_AGE] = str(max_age)
+
+        if cache_control:
+            headers[HEADER_CACHE_CONTROL] = cache_control
+
+        if extra_headers:
+            headers.update(extra_headers)
+
+        self.headers = headers
+
+    def __repr__(self):
+        return f"HeaderPolicy(headers={self.headers}, allowed_origins={self.allowed_origins})"
+
+    @property
+    def echoes_origin(self) -> bool:
+        """
+        True when the response depends on the request Origin header
+        """
+        return self.allowed_origins is not None
+
+    def build_headers(self, origin: str = None) -> dict:
+        """
+        Returns a new headers dict for a single response.
+
+        :param origin: the request Origin header, only used when specific origins are allowed
+        :return:
+        """
+        headers = self.headers.copy()
+
+        if origin is not None and self.allowed_origins is not None and origin in self.allowed_origins:
+            headers[HEADER_ALLOW_ORIGIN] = origin
+
+        return headers
+
+
+DEFAULT_HEADER_POLICY = HeaderPolicy()
@@ -0,0 +1,161 @@
+import sys
+import json
+import time
+from collections import namedtuple
+from contextvars import ContextVar
+
+SPAN_PARSE = 'parse'
+SPAN_AUTH = 'auth'
+SPAN_HANDLER = 'handler'
+SPAN_CONVERT = 'convert'
+SPAN_SERIALIZE = 'serialize'
+
+Span = namedtuple('Span', ['name', 'duration_ms'])
+
+# the timer for the invocation being handled, None when it isn't being sampled
+_current_timer = ContextVar('lambda_proxy_invocation_timer', default=None)
+
+
+class _NoopSpan:
+    def __enter__(self):
+        return None
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class _TimedSpan:
+    __slots__ = ('timer', 'name', 'start')
+
+    def __init__(self, timer, name):
+        self.timer = timer
+        self.name = name
+        self.start = 0
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.timer.spans.append(Span(self.name, (time.perf_counter_ns() - self.start) / 1e6))
+        return False
+
+
+class InvocationTimer:
+    """
+    Collects the spans recorded during a single sampled invocation
+    """
+    __slots__ = ('spans',)
+
+    def __init__(self):
+        self.spans = []
+
+    def span(self, name: str):
+        return _TimedSpan(self, name)
+
+
+def span(name: str):
+    """
+    Context manager timing a phase of the current invocation. When the invocation isn't being sampled (or there's
+    no tracer) it's a shared no-op, so instrumented code costs next to nothing with tracing off:
+
+        with span('db_query'):
+            ...
+
+    :param name: span name
+    :return:
+    """
+    timer = _current_timer.get()
+    return _NOOP_SPAN if timer is None else timer.span(name)
+
+
+class InMemoryExporter:
+    """
+    Keeps every exported invocation as (spans, tags), for tests
+    """
+    def __init__(self):
+        self.invocations = []
+
+    def export(self, spans: list, tags: dict):
+        self.invocations.append((spans, tags))
+
+    def clear(self):
+        self.invocations.clear()
+
+
+class EmfExporter:
+    """
+    Writes each invocation's spans to stdout in CloudWatch Embedded Metric Format, CloudWatch Logs turns these into
+    metrics (one per span, in milliseconds) dimensioned by method, resource and status code without any API calls.
+    """
+    def __init__(self, namespace: str = 'LambdaProxy', stream=None):
+        self.namespace = namespace
+        self.stream = stream
+
+    def export(self, spans: list, tags: dict):
+        durations = {}
+
+        for recorded in spans:
+            durations[recorded.name] = durations.get(recorded.name, 0.0) + recorded.duration_ms
+
+        record = {
+            "_aws": {
+                "Timestamp": int(time.time() * 1000),
+                "CloudWatchMetrics": [{
+                    "Namespace": self.namespace,
+                    "Dimensions": [list(tags)],
+                    "Metrics": [{"Name": name, "Unit": "Milliseconds"} for name in durations]
+                }]
+            },
+            **{key: str(value) for key, value in tags.items()},
+            **durations
+        }
+
+        print(json.dumps(record), file=self.stream or sys.stdout)
+
+
+class Tracer:
+    """
+    Times the phases of sampled invocations and hands them to an exporter. Pass one to
+    lambda_proxy_response_wrapper to record:
+
+        - parse: decoding the request body (EventParser)
+        - auth: validate_event_auth
+        - handler: the wrapped handler (parse and auth happen inside it)
+        - convert: building the response from the handler result, serialize included
+        - serialize: JSON encoding the response body
+
+    Each invocation is tagged with Method, Resource and StatusCode. Handlers can add their own spans with span().
+    """
+    def __init__(self, exporter, sample_rate: float = 1.0):
+        """
+        :param exporter: object with an export(spans, tags) method, e.g. EmfExporter or InMemoryExporter
+        :param sample_rate: fraction of invocations to time, 0 disables tracing
+        """
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+        self._random = None
+
+        if 0.0 < sample_rate < 1.0:
+            import random
+            self._random = random.random
+
+    def start(self):
+        """
+        Starts timing an invocation if it's sampled.
+
+        :return: (timer, context token) to pass to finish, or None if the invocation isn't sampled
+        """
+        if self.sample_rate <= 0.0 or (self._random is not None and self._random() >= self.sample_rate):
+            return None
+
+        timer = InvocationTimer()
+        return timer, _current_timer.set(timer)
+
+    def finish(self, started, tags: dict):
+        timer, token = started
+        _current_timer.reset(token)
+        self.exporter.export(timer.spans, tags)
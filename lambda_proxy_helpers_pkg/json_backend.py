@@ -0,0 +1,114 @@
+import os
+import json
+from collections import namedtuple
+
+from .json_encoder import json_default
+
+JSON_BACKEND_ENV = "JSON_BACKEND"
+DEFAULT_JSON_BACKEND = "json"
+
+JsonBackend = namedtuple('JsonBackend', ['name', 'loads', 'dumps'])
+
+
+def _json_backend():
+    # a single encoder instance avoids json.dumps building a new JSONEncoder on every call
+    encode = json.JSONEncoder(default=json_default, separators=(',', ':')).encode
+
+    return JsonBackend(name='json', loads=json.loads, dumps=encode)
+
+
+def _orjson_backend():
+    import orjson
+
+    # datetime/date/time and dataclasses are passed through to json_default so they serialize exactly as they
+    # do with the stdlib backend
+    options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+    fallback = _json_backend().dumps
+
+    def dumps(obj):
+        try:
+            return orjson.dumps(obj, default=json_default, option=options).decode('utf-8')
+        except orjson.JSONEncodeError:
+            # orjson only handles 64 bit integers (DynamoDB numbers can have 38 digits), the stdlib encoder
+            # handles any size and raises the usual TypeError for anything that really can't be serialized
+            return fallback(obj)
+
+    return JsonBackend(name='orjson', loads=orjson.loads, dumps=dumps)
+
+
+def _ujson_backend():
+    import ujson
+
+    # ujson converts Decimal to float natively (Decimal('10') -> 10.0) and that can't be overridden, so it's only
+    # used for decoding. Encoding stays on the stdlib encoder to keep Decimal output identical across backends.
+    return JsonBackend(name='ujson', loads=ujson.loads, dumps=_json_backend().dumps)
+
+
+JSON_BACKENDS = {
+    'json': _json_backend,
+    'orjson': _orjson_backend,
+    'ujson': _ujson_backend
+}
+
+
+def get_backend(name: str) -> JsonBackend:
+    """
+    Builds the named backend. If the library behind it isn't installed the stdlib json backend is returned instead,
+    check the name of the returned backend if you need to know which one is in use.
+
+    :param name: one of JSON_BACKENDS (json, orjson, ujson)
+    :return:
+    """
+    try:
+        factory = JSON_BACKENDS[name.lower()]
+    except KeyError:
+        raise ValueError(f"Unknown JSON backend '{name}', expected one of {', '.join(JSON_BACKENDS)}")
+
+    try:
+        return factory()
+    except ImportError:
+        return _json_backend()
+
+
+def set_json_backend(backend=None, loads=None, dumps=None) -> JsonBackend:
+    """
+    Sets the JSON engine used to decode request bodies (EventParser) and encode response bodies
+    (LambdaProxyResponse).
+
+    backend can be the name of a built in backend or a JsonBackend. Alternatively pass your own loads and/or dumps
+    callables, anything not provided is taken from the stdlib backend. A custom dumps must handle the types in
+    json_encoder.JSON_TYPE_ENCODERS itself (json_encoder.json_default can be used for that) and return a str.
+
+    With no arguments the JSON_BACKEND environment variable is used, falling back to the stdlib json module.
+
+    :param backend: backend name or JsonBackend
+    :param loads: custom decode callable
+    :param dumps: custom encode callable
+    :return: the backend now in use
+    """
+    global _active, decode, encode
+
+    if isinstance(backend, JsonBackend):
+        selected = backend
+    elif loads or dumps:
+        default = _json_backend()
+        selected = JsonBackend(name='custom', loads=loads or default.loads, dumps=dumps or default.dumps)
+    else:
+        selected = get_backend(backend or os.environ.get(JSON_BACKEND_ENV) or DEFAULT_JSON_BACKEND)
+
+    _active = selected
+    decode = selected.loads
+    encode = selected.dumps
+
+    return selected
+
+
+def get_json_backend() -> JsonBackend:
+    return _active
+
+
+_active = None
+decode = None
+encode = None
+
+set_json_backend()
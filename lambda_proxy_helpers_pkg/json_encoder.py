@@ -0,0 +1,118 @@
+import json
+import binascii
+
+
+def _encode_decimal(obj):
+    if obj.is_finite() and obj == obj.to_integral_value():
+        return int(obj)
+
+    return float(obj)
+
+
+def _encode_datetime(obj):
+    return obj.isoformat()
+
+
+def _encode_bytes(obj):
+    return binascii.b2a_base64(obj, newline=False).decode('ascii')
+
+
+# type -> callable returning a json serializable replacement. Only consulted for types json can't serialize
+# natively so str/int/float/list/tuple/dict etc. never hit this table.
+JSON_TYPE_ENCODERS = {
+    set: list,
+    frozenset: list,
+    bytes: _encode_bytes,
+    bytearray: _encode_bytes,
+    memoryview: _encode_bytes
+}
+
+_standard_encoders_loaded = False
+
+
+def _load_standard_encoders():
+    """
+    Adds the Decimal, datetime, date and UUID encoders. Importing decimal, datetime and uuid adds several
+    milliseconds to a cold start, so this only happens the first time an unknown type is serialized (if one of
+    these types is in a payload its module has already been imported anyway).
+    """
+    global _standard_encoders_loaded
+
+    from uuid import UUID
+    from decimal import Decimal
+    from datetime import datetime, date
+
+    for obj_type, encoder in ((Decimal, _encode_decimal),
+                              (datetime, _encode_datetime),
+                              (date, _encode_datetime),
+                              (UUID, str)):
+        JSON_TYPE_ENCODERS.setdefault(obj_type, encoder)
+
+    _standard_encoders_loaded = True
+
+
+# resolved encoders for subclasses of registered types, populated on first use
+_encoder_cache = {}
+
+
+def register_json_encoder(obj_type: type, encoder):
+    """
+    Adds (or replaces) the encoder used for obj_type when serializing response payloads. The encoder is called
+    with the object and must return something json can serialize (it may contain other registered types).
+
+    Subclasses of obj_type are handled too unless they have an encoder of their own.
+
+    :param obj_type: the type to encode
+    :param encoder: callable taking the object and returning a json serializable value
+    :return:
+    """
+    JSON_TYPE_ENCODERS[obj_type] = encoder
+    _encoder_cache.clear()
+
+
+def unregister_json_encoder(obj_type: type):
+    """
+    Removes an encoder added with register_json_encoder
+    """
+    JSON_TYPE_ENCODERS.pop(obj_type, None)
+    _encoder_cache.clear()
+
+
+def json_default(obj):
+    """
+    Hook for the "default" argument of json.dumps. The serializer calls this only for objects it doesn't know how
+    to handle, so the payload is converted during the one serialization pass and the caller's objects are never
+    modified.
+
+    :param obj:
+    :return:
+    """
+    obj_type = type(obj)
+    encoder = JSON_TYPE_ENCODERS.get(obj_type) or _encoder_cache.get(obj_type)
+
+    if encoder is None and not _standard_encoders_loaded:
+        _load_standard_encoders()
+        encoder = JSON_TYPE_ENCODERS.get(obj_type)
+
+    if encoder is None:
+        for cls in obj_type.__mro__[1:]:
+            encoder = JSON_TYPE_ENCODERS.get(cls)
+
+            if encoder is not None:
+                _encoder_cache[obj_type] = encoder
+                break
+        else:
+            raise TypeError(f"Object of type {obj_type.__name__} is not JSON serializable")
+
+    return encoder(obj)
+
+
+def dumps(obj) -> str:
+    """
+    Serializes obj to a JSON string, converting Decimal, datetime, date, set, tuple, bytes, UUID and any types
+    added with register_json_encoder.
+
+    :param obj:
+    :return:
+    """
+    return json.dumps(obj, default=json_default)
@@ -0,0 +1,304 @@
+import hmac
+import json
+import time
+import hashlib
+import binascii
+import threading
+from collections import OrderedDict
+
+from .lambda_errors import InvalidUserError
+
+DEFAULT_CACHE_SIZE = 1024
+DEFAULT_JWKS_REFRESH_INTERVAL = 300
+
+# ASN.1 DigestInfo prefixes for EMSA-PKCS1-v1_5 (RFC 8017 section 9.2)
+_DIGEST_INFO_PREFIXES = {
+    'sha256': bytes.fromhex('3031300d060960864801650304020105000420'),
+    'sha384': bytes.fromhex('3041300d060960864801650304020205000430'),
+    'sha512': bytes.fromhex('3051300d060960864801650304020305000440'),
+}
+
+# alg -> (key type, hash name)
+_ALGORITHMS = {
+    'RS256': ('RSA', 'sha256'),
+    'RS384': ('RSA', 'sha384'),
+    'RS512': ('RSA', 'sha512'),
+    'HS256': ('oct', 'sha256'),
+    'HS384': ('oct', 'sha384'),
+    'HS512': ('oct', 'sha512'),
+}
+
+
+def base64url_decode(value) -> bytes:
+    if isinstance(value, str):
+        value = value.encode('ascii')
+
+    value = value.replace(b'-', b'+').replace(b'_', b'/')
+    return binascii.a2b_base64(value + b'=' * (-len(value) % 4))
+
+
+def _base64url_int(value: str) -> int:
+    return int.from_bytes(base64url_decode(value), 'big')
+
+
+def _parse_jwk(jwk: dict):
+    """
+    :return: (key type, key) where key is (modulus, exponent) for RSA or the secret bytes for oct keys
+    """
+    key_type = jwk.get('kty')
+
+    if key_type == 'RSA':
+        return key_type, (_base64url_int(jwk['n']), _base64url_int(jwk['e']))
+
+    if key_type == 'oct':
+        return key_type, base64url_decode(jwk['k'])
+
+    return None
+
+
+def _verify_rsa(key, hash_name: str, signing_input: bytes, signature: bytes) -> bool:
+    """
+    RSASSA-PKCS1-v1_5 verification (RFC 8017 section 8.2.2), i.e. RS256/384/512. Only the public key operation
+    is needed so this is a single modular exponentiation, no crypto library required.
+    """
+    modulus, exponent = key
+    key_length = (modulus.bit_length() + 7) // 8
+
+    if len(signature) != key_length:
+        return False
+
+    encoded = pow(int.from_bytes(signature, 'big'), exponent, modulus).to_bytes(key_length, 'big')
+    digest_info = _DIGEST_INFO_PREFIXES[hash_name] + hashlib.new(hash_name, signing_input).digest()
+    expected = b'\x00\x01' + b'\xff' * (key_length - len(digest_info) - 3) + b'\x00' + digest_info
+
+    return hmac.compare_digest(encoded, expected)
+
+
+def _verify_hmac(key: bytes, hash_name: str, signing_input: bytes, signature: bytes) -> bool:
+    return hmac.compare_digest(hmac.new(key, signing_input, hash_name).digest(), signature)
+
+
+class JwtVerifier:
+    """
+    Verifies bearer tokens (e.g. Cognito id/access tokens) inside the function, as an alternative to an API Gateway
+    authorizer. The JWKS is loaded from a file, URL or dict on first use and kept for the life of the container,
+    keys are held in a dict by kid so finding the signing key is a single lookup. Verified claims are cached in a
+    bounded LRU keyed by token until the token expires, so repeat requests with the same token skip verification.
+
+    Supports RS256/384/512 and HS256/384/512. Create the verifier at module level:
+
+        VERIFIER = JwtVerifier(jwks_url='https://cognito-idp.<region>.amazonaws.com/<pool id>/.well-known/jwks.json',
+                               issuer='https://cognito-idp.<region>.amazonaws.com/<pool id>',
+                               audience='<app client id>')
+
+        ep.validate_event_auth(requires_account_id=True, verifier=VERIFIER)
+    """
+    def __init__(self,
+                 jwks: dict = None,
+                 jwks_path: str = None,
+                 jwks_url: str = None,
+                 issuer: str = None,
+                 audience=None,
+                 algorithms=('RS256',),
+                 leeway: int = 0,
+                 cache_size: int = DEFAULT_CACHE_SIZE,
+                 jwks_refresh_interval: int = DEFAULT_JWKS_REFRESH_INTERVAL):
+        """
+        :param jwks: the JWKS document itself
+        :param jwks_path: path of a file containing the JWKS
+        :param jwks_url: URL to fetch the JWKS from, it's refetched (at most every jwks_refresh_interval seconds)
+                         when a token has an unknown kid so key rotation is picked up
+        :param issuer: required iss claim
+        :param audience: required aud (or client_id for Cognito access tokens) claim, a string or list of strings
+        :param algorithms: allowed signing algorithms
+        :param leeway: seconds of clock skew allowed when checking exp/nbf
+        :param cache_size: maximum number of verified tokens to keep
+        :param jwks_refresh_interval: minimum seconds between JWKS fetches
+        """
+        if not (jwks or jwks_path or jwks_url):
+            raise ValueError("One of jwks, jwks_path or jwks_url is required")
+
+        unknown = set(algorithms) - set(_ALGORITHMS)
+
+        if unknown:
+            raise ValueError(f"Unsupported algorithm(s): {', '.join(sorted(unknown))}")
+
+        self.jwks = jwks
+        self.jwks_path = jwks_path
+        self.jwks_url = jwks_url
+        self.issuer = issuer
+        self.audience = {audience} if isinstance(audience, str) else set(audience or ())
+        self.algorithms = frozenset(algorithms)
+        self.leeway = leeway
+        self.cache_size = cache_size
+        self.jwks_refresh_interval = jwks_refresh_interval
+
+        self._keys = None
+        self._keys_loaded_at = 0.0
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f"JwtVerifier(issuer={self.issuer}, audience={self.audience}, algorithms={sorted(self.algorithms)})"
+
+    def _fetch_jwks(self) -> dict:
+        if self.jwks is not None:
+            return self.jwks
+
+        if self.jwks_path:
+            with open(self.jwks_path) as f:
+                return json.load(f)
+
+        from urllib.request import urlopen
+
+        with urlopen(self.jwks_url, timeout=5) as resp:
+            return json.loads(resp.read())
+
+    def load_keys(self) -> dict:
+        """
+        (Re)loads the JWKS
+
+        :return: dict of kid -> (key type, key)
+        """
+        keys = {}
+
+        for jwk in self._fetch_jwks().get('keys', []):
+            parsed = _parse_jwk(jwk)
+
+            if parsed is not None:
+                keys[jwk.get('kid')] = parsed
+
+        self._keys = keys
+        self._keys_loaded_at = time.monotonic()
+
+        return keys
+
+    def _get_key(self, kid):
+        keys = self._keys if self._keys is not None else self.load_keys()
+        key = keys.get(kid)
+
+        if key is None and self.jwks_url and time.monotonic() - self._keys_loaded_at >= self.jwks_refresh_interval:
+            key = self.load_keys().get(kid)
+
+        return key
+
+    def _get_cached(self, token: str):
+        with self._lock:
+            cached = self._cache.get(token)
+
+            if cached is None:
+                return None
+
+            claims, expires = cached
+
+            if expires is not None and time.time() > expires + self.leeway:
+                del self._cache[token]
+                return None
+
+            self._cache.move_to_end(token)
+            return claims
+
+    def _set_cached(self, token: str, claims: dict):
+        with self._lock:
+            self._cache[token] = (claims, claims.get('exp'))
+
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def verify(self, token: str) -> dict:
+        """
+        Verifies the token's signature and claims.
+
+        :param token: the encoded JWT
+        :return: the token's claims
+        :raises InvalidUserError: if the token is malformed, the signature is invalid or a claim check fails
+        """
+        claims = self._get_cached(token)
+
+        if claims is not None:
+            return claims
+
+        try:
+            encoded_header, encoded_claims, encoded_signature = token.split('.')
+            header = json.loads(base64url_decode(encoded_header))
+            claims = json.loads(base64url_decode(encoded_claims))
+            signature = base64url_decode(encoded_signature)
+        except (ValueError, TypeError, AttributeError, binascii.Error):
+            raise InvalidUserError('User invalid or not found (token malformed)')
+
+        if not isinstance(header, dict) or not isinstance(claims, dict):
+            raise InvalidUserError('User invalid or not found (token malformed)')
+
+        algorithm = header.get('alg')
+
+        if algorithm not in self.algorithms:
+            raise InvalidUserError('User invalid or not found (token algorithm not allowed)')
+
+        key_type, hash_name = _ALGORITHMS[algorithm]
+        key = self._get_key(header.get('kid'))
+
+        if key is None or key[0] != key_type:
+            raise InvalidUserError('User invalid or not found (token signing key not found)')
+
+        signing_input = f"{encoded_header}.{encoded_claims}".encode('ascii')
+        verify_signature = _verify_rsa if key_type == 'RSA' else _verify_hmac
+
+        if not verify_signature(key[1], hash_name, signing_input, signature):
+            raise InvalidUserError('User invalid or not found (token signature invalid)')
+
+        self._check_claims(claims)
+        self._set_cached(token, claims)
+
+        return claims
+
+    def verify_bearer(self, authorization: str) -> dict:
+        """
+        Verifies the token in an Authorization header value
+
+        :param authorization: "Bearer <token>" (or the bare token)
+        :return: the token's claims
+        """
+        token = get_bearer_token(authorization)
+
+        if not token:
+            raise InvalidUserError('User invalid or not found (no bearer token)')
+
+        return self.verify(token)
+
+    def _check_claims(self, claims: dict):
+        now = time.time()
+        expires = claims.get('exp')
+
+        if expires is not None and now > expires + self.leeway:
+            raise InvalidUserError('User invalid or not found (token expired)')
+
+        not_before = claims.get('nbf')
+
+        if not_before is not None and now + self.leeway < not_before:
+            raise InvalidUserError('User invalid or not found (token not yet valid)')
+
+        if self.issuer and claims.get('iss') != self.issuer:
+            raise InvalidUserError('User invalid or not found (token issuer invalid)')
+
+        if self.audience:
+            audience = claims.get('aud', claims.get('client_id'))
+            audience = {audience} if isinstance(audience, str) else set(audience or ())
+
+            if not audience & self.audience:
+                raise InvalidUserError('User invalid or not found (token audience invalid)')
+
+
+def get_bearer_token(authorization: str):
+    """
+    Extracts the token from an "Authorization: Bearer <token>" header value (a bare token is accepted too, as
+    Cognito authorizers expect)
+    """
+    if not authorization:
+        return None
+
+    scheme, _, token = authorization.strip().partition(' ')
+
+    if not token:
+        return scheme
+
+    return token.strip() if scheme.lower() == 'bearer' else None
@@ -1,135 +1,181 @@
-class NotFoundError(Exception):
+# exception class -> (status_code, error_type) for every error the wrapper maps to a response
+ERROR_REGISTRY = {}
+
+# exception class -> registry entry for its closest registered ancestor (or None), filled in on first lookup
+_resolved_errors = {}
+
+
+def register_error(error_class: type, status_code: int, error_type: str = None):
     """
-    Raised when the item being requested cannot be found
+    Maps an exception class (and its subclasses) to a response status code and errorType. Use this for exceptions
+    you don't control, e.g. a library's "conflict" error -> 409. Subclasses of LambdaProxyError are registered
+    automatically using their status_code and error_type class attributes.
+
+    :param error_class: the exception class
+    :param status_code: HTTP status code of the response
+    :param error_type: errorType value in the response body, defaults to the class name
+    :return:
     """
-    def __init__(self, message):
-        self.message = message
-        self.status_code = 404
+    ERROR_REGISTRY[error_class] = (status_code, error_type or error_class.__name__)
+    _resolved_errors.clear()
 
-    def __str__(self):
-        return self.message
 
-    def __repr__(self):
-        return 'Not Found Error'
+def unregister_error(error_class: type):
+    """
+    Removes an error registered with register_error
+    """
+    ERROR_REGISTRY.pop(error_class, None)
+    _resolved_errors.clear()
 
 
-class MissingParameterError(Exception):
+def lookup_error(error_class: type):
     """
-    Raised when the endpoint is expecting a parameter but was not provided.
+    Finds the registry entry for error_class, walking its MRO so subclasses of registered errors are matched.
+    The result is cached per class so repeat lookups are a single dict access.
+
+    :param error_class: the exception class
+    :return: (status_code, error_type) or None if it isn't a known error
     """
-    def __init__(self, message):
-        self.message = message
-        self.status_code = 400
+    try:
+        return _resolved_errors[error_class]
+    except KeyError:
+        pass
 
-    def __str__(self):
-        return self.message
+    entry = None
 
-    def __repr__(self):
-        return 'Missing Parameter Error'
+    for cls in error_class.__mro__:
+        entry = ERROR_REGISTRY.get(cls)
+
+        if entry is not None:
+            break
 
+    _resolved_errors[error_class] = entry
+    return entry
 
-class InvalidParameterError(Exception):
+
+class LambdaProxyError(Exception):
     """
-    Raised when the endpoint is expecting a parameter that's provided but is invalid.
+    Base class for the errors handlers raise to produce an error response. Subclasses only need to set the
+    status_code and error_type class attributes (and optionally a default_message) and are registered with the
+    wrapper when they're defined.
     """
-    def __init__(self, message):
+    status_code = 500
+    error_type = 'Lambda Proxy Error'
+    default_message = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        register_error(cls, cls.status_code, cls.error_type)
+
+    def __init__(self, message=None):
+        if message is None:
+            message = self.default_message
+
+        super().__init__(message)
         self.message = message
-        self.status_code = 400
 
     def __str__(self):
-        return self.message
+        return self.message or ''
 
     def __repr__(self):
-        return 'Invalid Parameter Error'
+        return self.error_type
+
 
+register_error(LambdaProxyError, LambdaProxyError.status_code, LambdaProxyError.error_type)
 
-class AlreadyExistsError(Exception):
+
+class NotFoundError(LambdaProxyError):
     """
-    Raised when an object is trying to be created but one already exists
+    Raised when the item being requested cannot be found
     """
-    def __init__(self, message):
-        self.message = message
-        self.status_code = 400
+    status_code = 404
+    error_type = 'Not Found Error'
 
-    def __str__(self):
-        return self.message
 
-    def __repr__(self):
-        return 'Object Already Exists Error'
+class MethodNotAllowedError(LambdaProxyError):
+    """
+    Raised when the resource exists but doesn't support the requested HTTP method
+    """
+    status_code = 405
+    error_type = 'Method Not Allowed Error'
 
 
-class RelatedRecordsExistError(Exception):
+class MissingParameterError(LambdaProxyError):
     """
-    Raised when a delete operation is attempted but related records exist and will break foreign key constraint(s)
+    Raised when the endpoint is expecting a parameter but was not provided.
     """
-    def __init__(self, message):
-        self.message = message
-        self.status_code = 400
+    status_code = 400
+    error_type = 'Missing Parameter Error'
 
-    def __str__(self):
-        return self.message
 
-    def __repr__(self):
-        return 'Related Records Exist Error'
+class InvalidParameterError(LambdaProxyError):
+    """
+    Raised when the endpoint is expecting a parameter that's provided but is invalid.
+    """
+    status_code = 400
+    error_type = 'Invalid Parameter Error'
 
 
-class ValidationError(Exception):
+class AlreadyExistsError(LambdaProxyError):
     """
-    Raised when validation of a request fails
+    Raised when an object is trying to be created but one already exists
     """
-    def __init__(self, message):
-        self.message = message
-        self.status_code = 400
+    status_code = 400
+    error_type = 'Object Already Exists Error'
 
-    def __str__(self):
-        return self.message
 
-    def __repr__(self):
-        return 'Validation Error'
+class RelatedRecordsExistError(LambdaProxyError):
+    """
+    Raised when a delete operation is attempted but related records exist and will break foreign key constraint(s)
+    """
+    status_code = 400
+    error_type = 'Related Records Exist Error'
 
 
-class InvalidFunctionRequestError(Exception):
+class ValidationError(LambdaProxyError):
     """
-    Raised when the handler method is unable to determine the correct function call
+    Raised when validation of a request fails. errors lists the individual failures (see validation.compile_schema)
     """
-    def __init__(self, message):
-        self.message = message
-        self.status_code = 400
+    status_code = 400
+    error_type = 'Validation Error'
 
-    def __str__(self):
-        return self.message
+    def __init__(self, message=None, errors=None):
+        super().__init__(message)
+        self.errors = errors or []
 
-    def __repr__(self):
-        return 'Invalid Function Request Error'
+
+class InvalidFunctionRequestError(LambdaProxyError):
+    """
+    Raised when the handler method is unable to determine the correct function call
+    """
+    status_code = 400
+    error_type = 'Invalid Function Request Error'
 
 
-class InvalidUserError(Exception):
+class InvalidUserError(LambdaProxyError):
     """
     Raised when the handler method is unable to determine the user from the request
     """
-    def __init__(self, message):
-        self.message = message
-        self.status_code = 400
+    status_code = 400
+    error_type = 'Invalid User Error'
 
-    def __str__(self):
-        return self.message
 
-    def __repr__(self):
-        return 'Invalid User Error'
+class PayloadTooLargeError(LambdaProxyError):
+    """
+    Raised when the request body exceeds the maximum size the endpoint is willing to parse
+    """
+    status_code = 413
+    error_type = 'Payload Too Large Error'
 
 
-class GeneralError(Exception):
+class GeneralError(LambdaProxyError):
     """
     Raised when we don't know the type of error being thrown or just want to throw a general exception along
     with the request event object.
     """
-    def __init__(self, message):
-        self.message = message
-        self.status_code = 500
-        self.event = None
+    status_code = 500
+    error_type = 'General Error'
 
-    def __str__(self):
-        return self.message
-
-    def __repr__(self):
-        return 'General Error'
+    def __init__(self, message=None):
+        super().__init__(message)
+        self.event = None
@@ -1,14 +1,29 @@
-import json
-from datetime import datetime
-from decimal import Decimal
+import binascii
+from functools import lru_cache
+
+from . import json_backend
+from .constants import HttpStatusCodes
+from .header_policy import DEFAULT_HEADER_POLICY, HeaderPolicy, HEADER_LOCATION, HEADER_VARY, HEADER_CONTENT_TYPE
+from .compression import CompressionPolicy, HEADER_CONTENT_ENCODING
+from .instrumentation import span, SPAN_SERIALIZE
+from .pagination import Pagination, HEADER_NEXT_CURSOR, is_paginatable
+from .event_formats import HEADER_SET_COOKIE
+from .stacktrace import CapturedTrace
+from .etag import HEADER_ETAG, make_etag, format_etag, encoding_etag, etag_matches, not_modified_response
 
 
 def do_json_compatible_replacements(obj):
     """
     Solution from a discussion of the "decimal issue" here: https://github.com/boto/boto3/issues/369
+
+    NOTE: no longer used by make_response (see json_encoder/json_backend) and kept for existing callers only. This
+    modifies lists and dicts in place.
     :param obj:
     :return:
     """
+    from datetime import datetime
+    from decimal import Decimal
+
     if isinstance(obj, list):
         for i in range(len(obj)):
             obj[i] = do_json_compatible_replacements(obj[i])
@@ -36,23 +51,101 @@ def do_json_compatible_replacements(obj):
         return obj
 
 
+BINARY_CONTENT_TYPE = 'application/octet-stream'
+
+# payloads serialized as JSON, sets and tuples become JSON arrays
+_JSON_PAYLOAD_TYPES = (dict, list, tuple, set, frozenset)
+
+
+@lru_cache(maxsize=256)
+def encode_error_body(error: str, error_type: str) -> str:
+    """
+    Error bodies are cached by (message, type) so errors with constant messages (e.g. validation failures
+    repeated by bot traffic) are only serialized once per container.
+    """
+    return json_backend.encode({"error": error, "errorType": error_type})
+
+
+def is_binary_payload(payload) -> bool:
+    """
+    True for bytes-like payloads and file-like objects (anything with a read method)
+    """
+    return isinstance(payload, (bytes, bytearray, memoryview)) or hasattr(payload, 'read')
+
+
+def encode_binary_payload(payload) -> str:
+    """
+    Base64 encodes a bytes-like or file-like payload. Buffers are encoded in place via a memoryview and
+    BytesIO objects via their underlying buffer so the data isn't copied before it's encoded.
+
+    :param payload: bytes, bytearray, memoryview or file-like object
+    :return: base64 string for the response body
+    """
+    if hasattr(payload, 'getbuffer'):
+        with payload.getbuffer() as buffer:
+            return binascii.b2a_base64(buffer[payload.tell():], newline=False).decode('ascii')
+
+    if hasattr(payload, 'read'):
+        payload = payload.read()
+
+    return binascii.b2a_base64(payload, newline=False).decode('ascii')
+
+
 class LambdaProxyResponse:
     def __init__(self,
                  status: int = 200,
                  payload: dict = None,
                  location: str = None,
                  error=None,
-                 error_type=None):
+                 error_type=None,
+                 header_policy: HeaderPolicy = None,
+                 origin: str = None,
+                 compression: CompressionPolicy = None,
+                 accept_encoding: str = None,
+                 content_type: str = None,
+                 etag=None,
+                 generate_etag: bool = False,
+                 if_none_match: str = None,
+                 pagination: Pagination = None,
+                 cursor_offset: int = 0,
+                 cookies: list = None,
+                 stacktrace: CapturedTrace = None):
+        """
+        :param etag: precomputed ETag or version of the payload, the payload can then be a callable that's only
+                     called if the client doesn't already have this version
+        :param generate_etag: compute a strong ETag from the body of 200 responses (when etag isn't given)
+        :param if_none_match: the request's If-None-Match header, matching 200 responses become a body-less 304
+        :param pagination: split list/generator payloads into pages, see pagination.Pagination
+        :param cursor_offset: offset of the first item of the page, from the request's cursor
+        :param cookies: Set-Cookie header values, sent as multiValueHeaders (or the cookies list of an HTTP API
+                        response, see event_formats)
+        :param stacktrace: the error's captured stack trace (see stacktrace.StacktracePolicy), added to the error
+                           body by make_response(include_stacktrace=True)
+        """
         self.payload = payload
         self.status = status
         self.error = error
         self.error_type = error_type
         self.location = location
+        self.header_policy = header_policy or DEFAULT_HEADER_POLICY
+        self.origin = origin
+        self.compression = compression
+        self.accept_encoding = accept_encoding
+        self.content_type = content_type
+        self.etag = etag
+        self.generate_etag = generate_etag
+        self.if_none_match = if_none_match
+        self.pagination = pagination
+        self.cursor_offset = cursor_offset
+        self.cookies = cookies
+        self.stacktrace = stacktrace
 
     def __repr__(self):
         return f"LambdaProxyResponse(status={self.status}," \
                f"payload={self.payload}, " \
                f"location={self.location}, " \
+               f"content_type={self.content_type}, " \
+               f"etag={self.etag}, " \
                f"error={self.error}, " \
                f"error_type={self.error_type})"
 
@@ -66,38 +159,109 @@ class LambdaProxyResponse:
             - the payload provided by the caller
             - details of the error generated
 
-        NOTE: this doesn't (yet) include isBase64Encoded so won't work with files, images etc.
+        Binary payloads (bytes, bytearray, memoryview or file-like objects) are base64 encoded and flagged with
+        isBase64Encoded. Set content_type for these, it defaults to application/octet-stream.
+
+        200 responses get an ETag header when etag or generate_etag is set and become a body-less 304 if it matches
+        if_none_match. A callable payload is only called once it's known the body is needed.
+
+        :param include_stacktrace: add the captured stack trace (or just its signature if the full trace wasn't
+                                   sampled) to error bodies as stackTrace. Don't do this in production.
         """
         resp = {
             "statusCode": self.status,
-            "headers": {
-                "Content-Type": 'application/json',
-                "Access-Control-Allow-Origin": '*',
-                'Access-Control-Allow-Methods': '*',
-                'Access-Control-Allow-Headers': '*',
-                "Access-Control-Allow-Credentials": True
-            }
+            "headers": self.header_policy.build_headers(self.origin)
         }
 
         tmp_payload = None
+        etag = format_etag(self.etag) if self.etag is not None and not self.error else None
+
+        if etag is not None and self.status == HttpStatusCodes.OK and etag_matches(self.if_none_match, etag):
+            resp['headers'][HEADER_ETAG] = etag
+            return not_modified_response(resp)
 
         if self.error:
-            tmp_payload = {
-                "error": self.error,
-                "errorType": self.error_type
-            }
+            if include_stacktrace and self.stacktrace is not None:
+                tmp_payload = {
+                    "error": self.error,
+                    "errorType": self.error_type,
+                    "stackTrace": self.stacktrace.trace or self.stacktrace.signature
+                }
+            elif isinstance(self.error, str) and isinstance(self.error_type, str):
+                resp["body"] = encode_error_body(self.error, self.error_type)
+            else:
+                tmp_payload = {
+                    "error": self.error,
+                    "errorType": self.error_type
+                }
 
         else:
-            if self.payload:
+            if callable(self.payload):
+                tmp_payload = self.payload()
+            elif self.payload:
                 tmp_payload = self.payload
 
             if self.location:
-                resp['headers']['Location'] = self.location
+                resp['headers'][HEADER_LOCATION] = self.location
+
+            if self.cookies:
+                resp['multiValueHeaders'] = {HEADER_SET_COOKIE: list(self.cookies)}
 
-        if tmp_payload:
-            if isinstance(tmp_payload, dict) or isinstance(tmp_payload, list):
-                resp["body"] = json.dumps(do_json_compatible_replacements(tmp_payload))
+        if self.content_type and not self.error:
+            resp['headers'][HEADER_CONTENT_TYPE] = self.content_type
+
+        if self.pagination is not None and not self.error and is_paginatable(tmp_payload):
+            with span(SPAN_SERIALIZE):
+                resp["body"], next_cursor = self.pagination.paginate(tmp_payload, self.cursor_offset)
+
+            if next_cursor and self.pagination.cursor_in_header:
+                resp['headers'][HEADER_NEXT_CURSOR] = next_cursor
+
+        elif tmp_payload:
+            if isinstance(tmp_payload, _JSON_PAYLOAD_TYPES):
+                with span(SPAN_SERIALIZE):
+                    resp["body"] = json_backend.encode(tmp_payload)
+            elif is_binary_payload(tmp_payload):
+                resp["body"] = encode_binary_payload(tmp_payload)
+                resp["isBase64Encoded"] = True
+
+                if not self.content_type:
+                    resp['headers'][HEADER_CONTENT_TYPE] = BINARY_CONTENT_TYPE
             else:
                 resp["body"] = tmp_payload
 
+        if etag is None and self.generate_etag and self.status == HttpStatusCodes.OK and not self.error:
+            etag = make_etag(resp.get("body") or '')
+
+        if etag is not None:
+            resp['headers'][HEADER_ETAG] = etag
+
+            if self.status == HttpStatusCodes.OK and etag_matches(self.if_none_match, etag):
+                return not_modified_response(resp)
+
+        if self.compression:
+            self._compress_body(resp)
+
         return resp
+
+    def _compress_body(self, resp):
+        headers = resp['headers']
+        vary = headers.get(HEADER_VARY)
+        headers[HEADER_VARY] = f"{vary}, Accept-Encoding" if vary else 'Accept-Encoding'
+
+        body = resp.get("body")
+
+        if not isinstance(body, str) or resp.get("isBase64Encoded") or not self.accept_encoding:
+            return
+
+        compressed = self.compression.compress_body(body, self.accept_encoding)
+
+        if compressed:
+            encoding, data = compressed
+            headers[HEADER_CONTENT_ENCODING] = encoding
+
+            if HEADER_ETAG in headers:
+                headers[HEADER_ETAG] = encoding_etag(headers[HEADER_ETAG], encoding)
+
+            resp["body"] = binascii.b2a_base64(data, newline=False).decode('ascii')
+            resp["isBase64Encoded"] = True
@@ -1,37 +1,170 @@
-import traceback
-from functools import wraps
+import threading
+from functools import wraps, partial
 from collections import namedtuple
 
-from .constants import HttpStatusCodes
+from .constants import HttpStatusCodes, HttpMethods
 from . import lambda_errors
 from .lambda_proxy_response import LambdaProxyResponse
+from .header_policy import HeaderPolicy
+from .compression import CompressionPolicy
+from .event_parser import find_header
+from .event_formats import detect_format, REST_API_FORMAT
+from .instrumentation import Tracer, SPAN_HANDLER, SPAN_CONVERT
+from .response_cache import ResponseCache
+from .pagination import Pagination
+from .stacktrace import StacktracePolicy, get_default_policy
+from .etag import HEADER_ETAG, HEADER_IF_NONE_MATCH, etag_matches, not_modified_response
 
 
-KNOWN_ERRORS = [lambda_errors.AlreadyExistsError,
-                lambda_errors.NotFoundError,
-                lambda_errors.ValidationError,
-                lambda_errors.MissingParameterError,
-                lambda_errors.InvalidParameterError,
-                lambda_errors.InvalidFunctionRequestError,
-                lambda_errors.InvalidUserError,
-                lambda_errors.RelatedRecordsExistError,
-                lambda_errors.GeneralError]
+# kept for backwards compatibility, use lambda_errors.register_error to add your own errors
+KNOWN_ERRORS = lambda_errors.ERROR_REGISTRY
 
 
-FunctionResponse = namedtuple('FunctionResponse', ['status_code', 'payload', 'url'])
+# etag: a precomputed ETag or version for the payload, with it the payload can be a callable that builds the
+# payload and the wrapper answers 304 Not Modified without calling it when the client already has that version
+# cookies: list of Set-Cookie values
+FunctionResponse = namedtuple('FunctionResponse', ['status_code', 'payload', 'url', 'content_type', 'etag', 'cookies'],
+                              defaults=(None, None, None))
 
 
-def handle_exception(e):
-    if type(e) in KNOWN_ERRORS:
-        return e.status_code, e.message, repr(e)
+def _map_exception(e, stacktrace: StacktracePolicy = None):
+    """
+    :return: (status code, error message, error type, CapturedTrace or None)
+    """
+    known_error = lambda_errors.lookup_error(type(e))
+
+    if known_error is not None:
+        status_code, error_type = known_error
+        return status_code, getattr(e, 'message', None) or str(e), error_type, None
+    else:
+        # queued for the notifier's background thread (see notifications), nothing is sent from here
+        from . import notifications
+
+        captured = (stacktrace or get_default_policy()).capture(e)
+        notifications.notify_exception(e, captured.signature)
+
+        return HttpStatusCodes.INTERNAL_SERVER_ERROR, f"An unhandled exception was raised: {e}", repr(e), captured
+
+
+def handle_exception(e, stacktrace: StacktracePolicy = None):
+    """
+    Maps an exception to (status code, error message, error type) using the error registry. Subclasses of
+    registered errors are matched too, anything else is an unhandled 500: its stack trace is captured according to
+    the stacktrace policy (the default one if not given) and it's queued for notification (see
+    notifications.get_notifier).
+    """
+    return _map_exception(e, stacktrace)[:3]
+
+
+def set_error(resp: LambdaProxyResponse, e, stacktrace: StacktracePolicy = None):
+    """
+    handle_exception, setting the status and error of the response. The captured stack trace is kept on the response
+    if the policy puts traces in responses.
+    """
+    resp.status, resp.error, resp.error_type, captured = _map_exception(e, stacktrace)
+
+    if captured is not None and (stacktrace or get_default_policy()).in_response:
+        resp.stacktrace = captured
+
+
+def flush_notifications(status_code: int):
+    """
+    Lambda freezes the container once the handler returns, so error notifications queued during the invocation are
+    flushed (within the notifier's flush_timeout) before an internal server error is returned
+    """
+    if status_code == HttpStatusCodes.INTERNAL_SERVER_ERROR:
+        from . import notifications
+
+        notifications.flush()
+
+
+def apply_function_response(resp: LambdaProxyResponse, result):
+    """
+    Copies the values returned by a wrapped handler (a FunctionResponse or a plain
+    (status_code, payload, url) tuple) onto the response.
+    """
+    if isinstance(result, FunctionResponse):
+        resp.status, resp.payload, resp.location, resp.content_type, resp.etag, resp.cookies = result
     else:
-        # TODO: check for SNS notification environment vars and dispatch accordingly
-        # TODO: include traceback information in the notification
-        # traceback_info = traceback.format_exc().splitlines()
-        return HttpStatusCodes.INTERNAL_SERVER_ERROR, f"An unhandled exception was raised: {e}", repr(e)
+        resp.status, resp.payload, resp.location = result
 
 
-def lambda_proxy_response_wrapper():
+def build_response(resp: LambdaProxyResponse, stacktrace: StacktracePolicy = None) -> dict:
+    """
+    resp.make_response(), with errors raised while building the body (callable and generator payloads only run
+    then) mapped to an error response like any other handler error
+    """
+    try:
+        return resp.make_response(include_stacktrace=resp.stacktrace is not None)
+    except Exception as e:
+        set_error(resp, e, stacktrace)
+        return resp.make_response(include_stacktrace=resp.stacktrace is not None)
+
+
+# inspect.CO_COROUTINE, inspect itself is too expensive to import just for iscoroutinefunction
+_CO_COROUTINE = 0x0080
+
+# the loop is per thread as a loop can only run one run_until_complete at a time, in Lambda that's just the one
+_event_loops = threading.local()
+
+
+def is_coroutine_function(func) -> bool:
+    """
+    True if func is an async def function (or a method or functools.partial of one)
+    """
+    while isinstance(func, partial):
+        func = func.func
+
+    code = getattr(getattr(func, '__func__', func), '__code__', None)
+    return code is not None and bool(code.co_flags & _CO_COROUTINE)
+
+
+def get_event_loop():
+    """
+    Returns the event loop async handlers run on. It's created on first use and kept for the life of the
+    container so warm invocations don't pay for setting up (and tearing down) a loop the way asyncio.run would.
+    Clients that hold on to loop-bound resources (connection pools etc.) can be created once and reused too.
+
+    Each thread gets its own loop, so wrapped async handlers can be called from several threads at once (e.g. by
+    the dev server's request threads).
+
+    :return:
+    """
+    event_loop = getattr(_event_loops, 'loop', None)
+
+    if event_loop is None or event_loop.is_closed():
+        import asyncio
+
+        event_loop = _event_loops.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(event_loop)
+
+    return event_loop
+
+
+def get_wrapped_event(args, kwargs):
+    """
+    Returns the Lambda event passed to a wrapped handler, i.e. the first positional argument or the "event"
+    keyword argument. None if there isn't one.
+    """
+    event = args[0] if args else kwargs.get('event')
+    return event if isinstance(event, dict) else None
+
+
+def get_trace_tags(event, status_code) -> dict:
+    event = event or {}
+    event_format = detect_format(event)
+    return {"Method": event_format.method(event) if event else None,
+            "Resource": event_format.resource(event),
+            "StatusCode": status_code}
+
+
+def lambda_proxy_response_wrapper(header_policy: HeaderPolicy = None,
+                                  compression: CompressionPolicy = None,
+                                  tracer: Tracer = None,
+                                  cache: ResponseCache = None,
+                                  etag: bool = False,
+                                  pagination: Pagination = None,
+                                  stacktrace: StacktracePolicy = None):
     """
     A service wrapper that handles error handling and correct formatting of our Lambda
     function responses. Lambda function handlers can add this as a wrapper so they
@@ -41,20 +174,100 @@ def lambda_proxy_response_wrapper():
     Status code for errors are contained within the assigned error class itself. Unhandled exceptions
     will always raise a 500 Internal Server Error
 
+    REST API, HTTP API (payload format 2.0), Function URL and ALB events are all accepted and the response is
+    returned in the shape the event source expects (see event_formats).
+
+    Handlers can be coroutine functions (async def), they're run to completion on a persistent event loop (see
+    get_event_loop) and the decorated handler is still a plain function Lambda can call.
+
+    :param header_policy: headers to include in every response, defaults to DEFAULT_HEADER_POLICY
+    :param compression: compress response bodies according to the request's Accept-Encoding header
+    :param tracer: time the phases of (sampled) invocations, see instrumentation.Tracer
+    :param cache: serve repeat GET requests from memory, see response_cache.ResponseCache. Cache hits skip the
+                  handler altogether (and aren't traced)
+    :param etag: add a strong ETag (a hash of the body) to 200 responses. GET and HEAD requests whose If-None-Match
+                 matches the response's ETag (generated or returned by the handler in the FunctionResponse) get a
+                 body-less 304 Not Modified
+    :param pagination: serialize list/generator payloads a page at a time with a cursor for the next page, see
+                       pagination.Pagination
+    :param stacktrace: how much of an unhandled error's stack trace to capture, log and return, see
+                       stacktrace.StacktracePolicy. Defaults to a policy configured from the environment.
     :return:
     """
+    echo_origin = header_policy is not None and header_policy.echoes_origin
+
     def wrapper(func):
-        @wraps(func)
-        def decorated_view(*args, **kwargs):
-            resp = LambdaProxyResponse()
+        is_async = is_coroutine_function(func)
 
+        def run_handler(resp, args, kwargs):
             try:
-                resp.status, resp.payload, resp.location = func(*args, **kwargs)
+                if pagination is not None:
+                    resp.cursor_offset = pagination.get_offset(get_wrapped_event(args, kwargs))
+
+                if is_async:
+                    apply_function_response(resp, get_event_loop().run_until_complete(func(*args, **kwargs)))
+                else:
+                    apply_function_response(resp, func(*args, **kwargs))
 
             except Exception as e:
-                resp.status, resp.error, resp.error_type = handle_exception(e)
+                set_error(resp, e, stacktrace)
+
+        @wraps(func)
+        def decorated_view(*args, **kwargs):
+            resp = LambdaProxyResponse(header_policy=header_policy, compression=compression, generate_etag=etag,
+                                       pagination=pagination)
+            cache_key = None
+            event = get_wrapped_event(args, kwargs)
+            event_format = REST_API_FORMAT
+
+            if event:
+                event_format = detect_format(event)
+                headers = event_format.headers(event)
+
+                if echo_origin:
+                    resp.origin = find_header(headers, 'Origin')
+
+                if compression is not None:
+                    resp.accept_encoding = find_header(headers, 'Accept-Encoding')
+
+                if event_format.method(event) in (HttpMethods.GET, HttpMethods.HEAD):
+                    resp.if_none_match = find_header(headers, HEADER_IF_NONE_MATCH)
+
+                if cache is not None:
+                    cache_key = cache.make_key(event, (resp.origin, resp.accept_encoding))
+
+                    if cache_key is not None:
+                        cached = cache.get(cache_key)
+
+                        if cached is not None:
+                            if etag_matches(resp.if_none_match, cached['headers'].get(HEADER_ETAG)):
+                                cached = not_modified_response(cached)
+
+                            return event_format.format_response(cached, event)
+
+            started = tracer.start() if tracer is not None else None
+
+            if started is None:
+                run_handler(resp, args, kwargs)
+                response = build_response(resp, stacktrace)
+            else:
+                timer = started[0]
+
+                try:
+                    with timer.span(SPAN_HANDLER):
+                        run_handler(resp, args, kwargs)
+
+                    with timer.span(SPAN_CONVERT):
+                        response = build_response(resp, stacktrace)
+                finally:
+                    tracer.finish(started, get_trace_tags(event, resp.status))
+
+            if cache_key is not None:
+                cache.put(cache_key, response)
+
+            flush_notifications(resp.status)
 
-            return resp.make_response()
+            return event_format.format_response(response, event) if event else response
 
         return decorated_view
 
@@ -0,0 +1,400 @@
+import os
+import sys
+import json
+import time
+import threading
+from collections import namedtuple
+
+from .stacktrace import exception_signature, format_trace
+
+# set this to an SNS topic ARN to have unhandled errors published to it
+ERROR_TOPIC_ARN_ENV = 'ERROR_NOTIFICATION_TOPIC_ARN'
+
+DEFAULT_BATCH_SIZE = 20
+DEFAULT_BATCH_INTERVAL = 1.0
+DEFAULT_DEDUPE_WINDOW = 300.0
+DEFAULT_MAX_QUEUE = 500
+DEFAULT_FLUSH_TIMEOUT = 0.5
+DEFAULT_MAX_TRACEBACK = 8 * 1024
+
+# SNS messages can be up to 256KB
+_MAX_SNS_MESSAGE = 250 * 1024
+_MAX_SNS_SUBJECT = 100
+
+# signature: stacktrace.exception_signature, errors with the same signature are reported once per window
+# count: occurrences covered by this notification (including those suppressed since the last one)
+# first_seen/last_seen: epoch seconds
+# source: the function name (AWS_LAMBDA_FUNCTION_NAME)
+Notification = namedtuple('Notification', ['signature', 'error_type', 'message', 'traceback', 'count', 'first_seen',
+                                           'last_seen', 'source'])
+
+
+class _PendingError:
+    __slots__ = ('exception', 'count', 'first_seen', 'last_seen')
+
+    def __init__(self, exception, count, now):
+        self.exception = exception
+        self.count = count
+        self.first_seen = now
+        self.last_seen = now
+
+
+class ErrorNotifier:
+    """
+    Sends notifications of unhandled errors without holding up the response. notify() only records the error (a
+    signature and a reference to the exception) on an in-memory queue, a background thread formats the tracebacks
+    and hands them to the sink in batches.
+
+    Errors are deduplicated by signature: repeats of a queued error just bump its count, and once an error has been
+    sent further occurrences within dedupe_window are counted and reported with the next notification of that error
+    after the window. An error storm costs one notification per distinct error, not one per failed request. If the
+    queue is full new errors are dropped (and counted in dropped).
+
+    Lambda freezes the container as soon as the handler returns, background thread included, so the wrapper calls
+    flush() before returning a 500, waiting at most flush_timeout for the queue to be sent.
+    """
+    def __init__(self,
+                 sink,
+                 batch_size: int = DEFAULT_BATCH_SIZE,
+                 batch_interval: float = DEFAULT_BATCH_INTERVAL,
+                 dedupe_window: float = DEFAULT_DEDUPE_WINDOW,
+                 max_queue: int = DEFAULT_MAX_QUEUE,
+                 flush_timeout: float = DEFAULT_FLUSH_TIMEOUT,
+                 max_traceback: int = DEFAULT_MAX_TRACEBACK,
+                 clock=time.time):
+        """
+        :param sink: object with a send(notifications) method, e.g. SnsSink, FileSink or MemorySink
+        :param batch_size: most notifications sent at once, a full batch is sent straight away
+        :param batch_interval: seconds to wait for more errors before sending a partial batch
+        :param dedupe_window: seconds after an error is sent during which repeats are only counted
+        :param max_queue: most distinct errors waiting to be sent
+        :param flush_timeout: default time limit for flush(), in seconds
+        :param max_traceback: tracebacks are cut to this many characters (keeping the innermost frames)
+        """
+        self.sink = sink
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval
+        self.dedupe_window = dedupe_window
+        self.max_queue = max_queue
+        self.flush_timeout = flush_timeout
+        self.max_traceback = max_traceback
+        self.source = os.environ.get('AWS_LAMBDA_FUNCTION_NAME')
+        self.dropped = 0
+        self.failed = 0
+        self._clock = clock
+        self._pending = {}
+        self._sent = {}
+        self._sending = 0
+        self._flush_requested = False
+        self._condition = threading.Condition()
+        self._worker = None
+
+    def __repr__(self):
+        return f"ErrorNotifier(sink={self.sink!r}, pending={len(self._pending)})"
+
+    @property
+    def pending(self) -> int:
+        """
+        Number of errors waiting to be (or being) sent
+        """
+        return len(self._pending) + self._sending
+
+    def notify(self, e: BaseException, signature: str = None):
+        """
+        Queues a notification for the exception, never blocks on the sink
+
+        :param signature: the exception's signature if it's already been worked out (see stacktrace)
+        """
+        if signature is None:
+            signature = exception_signature(e)
+
+        now = self._clock()
+
+        with self._condition:
+            entry = self._pending.get(signature)
+
+            if entry is not None:
+                entry.count += 1
+                entry.last_seen = now
+                return
+
+            sent = self._sent.get(signature)
+
+            if sent is not None and now - sent[0] < self.dedupe_window:
+                self._sent[signature] = (sent[0], sent[1] + 1)
+                return
+
+            if len(self._pending) >= self.max_queue:
+                self.dropped += 1
+                return
+
+            self._pending[signature] = _PendingError(e, 1 + (sent[1] if sent else 0), now)
+
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name='error-notifier', daemon=True)
+                self._worker.start()
+            else:
+                self._condition.notify_all()
+
+    def flush(self, timeout: float = None) -> bool:
+        """
+        Sends everything that's queued now, waiting at most timeout seconds (flush_timeout by default)
+
+        :return: True if the queue was emptied in time
+        """
+        deadline = time.monotonic() + (self.flush_timeout if timeout is None else timeout)
+
+        with self._condition:
+            if not self._pending and not self._sending:
+                return True
+
+            self._flush_requested = True
+            self._condition.notify_all()
+
+            while self._pending or self._sending:
+                remaining = deadline - time.monotonic()
+
+                if remaining <= 0:
+                    return False
+
+                self._condition.wait(remaining)
+
+            self._flush_requested = False
+            return True
+
+    def _next_batch(self) -> list:
+        """
+        Waits until a batch is due. Called with the condition held.
+        """
+        while True:
+            if self._pending:
+                oldest = next(iter(self._pending.values())).first_seen
+                wait = self.batch_interval - (self._clock() - oldest)
+
+                if self._flush_requested or len(self._pending) >= self.batch_size or wait <= 0:
+                    break
+
+                self._condition.wait(wait)
+            else:
+                self._flush_requested = False
+                self._condition.wait()
+
+        batch = []
+
+        for signature in list(self._pending)[:self.batch_size]:
+            batch.append((signature, self._pending.pop(signature)))
+
+        self._sending = len(batch)
+        return batch
+
+    def _run(self):
+        while True:
+            with self._condition:
+                batch = self._next_batch()
+
+            try:
+                notifications = [self._make_notification(signature, entry) for signature, entry in batch]
+                self.sink.send(notifications)
+            except Exception as e:
+                # nowhere left to report it but the logs
+                self.failed += len(batch)
+                print(f"Error notification failed: {e!r}", file=sys.stderr)
+            finally:
+                # even if something above raised something other than an Exception, flush() mustn't wait forever
+                with self._condition:
+                    now = self._clock()
+
+                    for signature, _ in batch:
+                        self._sent[signature] = (now, 0)
+
+                    self._prune_sent(now)
+                    self._sending = 0
+                    self._condition.notify_all()
+
+    def _prune_sent(self, now):
+        # forget errors whose window has passed with nothing suppressed, keep the rest so their count isn't lost
+        if len(self._sent) > self.max_queue:
+            for signature, (sent_at, suppressed) in list(self._sent.items()):
+                if not suppressed and now - sent_at >= self.dedupe_window:
+                    del self._sent[signature]
+
+    def _make_notification(self, signature: str, entry: _PendingError) -> Notification:
+        e = entry.exception
+
+        # the exception's own __str__ (or a __str__ further down the trace) can raise too, still report the error
+        try:
+            message = str(e)
+        except Exception:
+            message = _safe_repr(e)
+
+        try:
+            trace = format_trace(e, self.max_traceback)
+        except Exception as format_error:
+            trace = f"Stack trace unavailable: {_safe_repr(format_error)}"
+
+        return Notification(signature=signature,
+                            error_type=type(e).__name__,
+                            message=message,
+                            traceback=trace,
+                            count=entry.count,
+                            first_seen=entry.first_seen,
+                            last_seen=entry.last_seen,
+                            source=self.source)
+
+
+def _safe_repr(obj) -> str:
+    try:
+        return repr(obj)
+    except Exception:
+        return f"<{type(obj).__name__}>"
+
+
+def format_notifications(notifications: list) -> str:
+    """
+    Plain text summary of a batch of notifications, for email subscribers
+    """
+    from datetime import datetime, timezone
+
+    def timestamp(seconds):
+        return datetime.fromtimestamp(seconds, timezone.utc).isoformat(timespec='seconds')
+
+    source = next((notification.source for notification in notifications if notification.source), None)
+    lines = [f"{len(notifications)} unhandled error(s){f' in {source}' if source else ''}", '']
+
+    for notification in notifications:
+        lines.append(f"{notification.error_type}: {notification.message}")
+        lines.append(f"Occurrences: {notification.count} between {timestamp(notification.first_seen)} and "
+                     f"{timestamp(notification.last_seen)}")
+        lines.append(f"Signature: {notification.signature}")
+
+        if notification.traceback:
+            lines.extend(['', notification.traceback])
+
+        lines.append('-' * 80)
+
+    return '\n'.join(lines)
+
+
+class SnsSink:
+    """
+    Publishes each batch as a single message to an SNS topic, subscribe an email address to get them in your inbox.
+    boto3 is imported on first use (it's in the Lambda runtime).
+    """
+    def __init__(self, topic_arn: str = None, client=None, subject: str = 'Unhandled errors'):
+        """
+        :param topic_arn: defaults to the ERROR_NOTIFICATION_TOPIC_ARN environment variable
+        :param client: boto3 SNS client, created on first use if not given
+        """
+        self.topic_arn = topic_arn or os.environ.get(ERROR_TOPIC_ARN_ENV)
+        self.subject = subject
+        self._client = client
+
+        if not self.topic_arn:
+            raise ValueError(f"An SNS topic ARN is required, pass topic_arn or set {ERROR_TOPIC_ARN_ENV}")
+
+    def __repr__(self):
+        return f"SnsSink(topic_arn={self.topic_arn!r})"
+
+    @property
+    def client(self):
+        if self._client is None:
+            import boto3
+
+            self._client = boto3.client('sns')
+
+        return self._client
+
+    def send(self, notifications: list):
+        source = next((notification.source for notification in notifications if notification.source), None)
+        subject = f"{self.subject}: {source}" if source else self.subject
+        message = format_notifications(notifications)
+
+        if len(message.encode('utf-8')) > _MAX_SNS_MESSAGE:
+            message = message.encode('utf-8')[:_MAX_SNS_MESSAGE].decode('utf-8', 'ignore') + '\n...'
+
+        self.client.publish(TopicArn=self.topic_arn, Subject=subject[:_MAX_SNS_SUBJECT], Message=message)
+
+
+class FileSink:
+    """
+    Appends notifications to a file as JSON lines, useful locally or with a log shipper
+    """
+    def __init__(self, path: str):
+        self.path = path
+
+    def __repr__(self):
+        return f"FileSink(path={self.path!r})"
+
+    def send(self, notifications: list):
+        with open(self.path, 'a', encoding='utf-8') as file:
+            for notification in notifications:
+                file.write(json.dumps(notification._asdict()) + '\n')
+
+
+class MemorySink:
+    """
+    Keeps the notifications sent, for tests
+    """
+    def __init__(self):
+        self.batches = []
+
+    def __repr__(self):
+        return f"MemorySink(batches={len(self.batches)})"
+
+    @property
+    def notifications(self) -> list:
+        return [notification for batch in self.batches for notification in batch]
+
+    def send(self, notifications: list):
+        self.batches.append(list(notifications))
+
+    def clear(self):
+        self.batches.clear()
+
+
+_UNSET = object()
+_notifier = _UNSET
+_notifier_lock = threading.Lock()
+
+
+def get_notifier():
+    """
+    The notifier unhandled errors are sent to: the one set with set_notifier or, if ERROR_NOTIFICATION_TOPIC_ARN is
+    set, one publishing to that SNS topic. None if neither.
+    """
+    global _notifier
+
+    if _notifier is _UNSET:
+        with _notifier_lock:
+            if _notifier is _UNSET:
+                topic_arn = os.environ.get(ERROR_TOPIC_ARN_ENV)
+                _notifier = ErrorNotifier(SnsSink(topic_arn)) if topic_arn else None
+
+    return _notifier
+
+
+def set_notifier(notifier: ErrorNotifier):
+    """
+    Sets the notifier unhandled errors are sent to, None to turn notifications off
+    """
+    global _notifier
+    _notifier = notifier
+
+
+def notify_exception(e: BaseException, signature: str = None):
+    notifier = get_notifier()
+
+    if notifier is not None:
+        notifier.notify(e, signature)
+
+
+def flush(timeout: float = None) -> bool:
+    """
+    Flushes the notifier's queue, see ErrorNotifier.flush
+    """
+    notifier = _notifier
+
+    if notifier is _UNSET or notifier is None:
+        return True
+
+    return notifier.flush(timeout)
@@ -0,0 +1,154 @@
+import json
+import binascii
+from itertools import islice
+from collections import namedtuple
+
+from . import json_backend
+from .lambda_errors import InvalidParameterError
+from .event_formats import detect_format
+
+# Lambda's response payload limit is 6MB, leave room for the headers and the rest of the proxy response
+DEFAULT_MAX_BYTES = 5 * 1024 * 1024
+
+CURSOR_PARAM = 'cursor'
+HEADER_NEXT_CURSOR = 'X-Next-Cursor'
+
+# a page of items that already starts at offset, for handlers that apply the cursor themselves (e.g. in a query)
+# so the wrapper doesn't skip the items again
+Paginated = namedtuple('Paginated', ['items', 'offset'], defaults=(0,))
+
+
+def encode_cursor(offset: int) -> str:
+    """
+    :return: an opaque (base64url) cursor for the item offset
+    """
+    data = json.dumps({"offset": offset}, separators=(',', ':')).encode('utf-8')
+    return binascii.b2a_base64(data, newline=False).decode('ascii').replace('+', '-').replace('/', '_').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> int:
+    """
+    :param cursor: a cursor returned by encode_cursor
+    :return: the item offset it holds
+    :raises InvalidParameterError: if the cursor wasn't one of ours
+    """
+    try:
+        value = cursor.replace('-', '+').replace('_', '/')
+        offset = json.loads(binascii.a2b_base64(value + '=' * (-len(value) % 4)))['offset']
+    except (ValueError, TypeError, KeyError, AttributeError, binascii.Error):
+        raise InvalidParameterError('Invalid pagination cursor')
+
+    if not isinstance(offset, int) or isinstance(offset, bool) or offset < 0:
+        raise InvalidParameterError('Invalid pagination cursor')
+
+    return offset
+
+
+def is_paginatable(payload) -> bool:
+    """
+    True for payloads that are split into pages: lists, tuples, generators and other iterators, and Paginated
+    """
+    return isinstance(payload, (list, tuple)) or (hasattr(payload, '__next__') and not hasattr(payload, 'read'))
+
+
+class Pagination:
+    """
+    Splits list payloads into pages. Items are serialized one at a time and serialization stops as soon as max_items
+    or max_bytes is reached, so a huge list (or a generator streaming from a query) never has to be encoded in full
+    just to find out it won't fit in a response. When there are more items an opaque cursor is included in the
+    response, the client sends it back in the cursor query string parameter to get the next page.
+
+    The body is {"items": [...], "nextCursor": "..."} or, with cursor_in_header, the plain list with the cursor in
+    the X-Next-Cursor header.
+
+    The cursor holds the offset of the next item. The wrapper skips that many items of the payload, so handlers can
+    simply return the whole list/generator each time. Handlers that can start from the offset themselves (see
+    EventParser.cursor_offset) should return Paginated(items, offset) instead.
+    """
+    def __init__(self,
+                 max_items: int = None,
+                 max_bytes: int = DEFAULT_MAX_BYTES,
+                 cursor_param: str = CURSOR_PARAM,
+                 items_key: str = 'items',
+                 cursor_key: str = 'nextCursor',
+                 cursor_in_header: bool = False):
+        """
+        :param max_items: maximum number of items per page, None for no limit
+        :param max_bytes: maximum size of the serialized page
+        :param cursor_param: query string parameter the cursor is sent back in
+        :param items_key: body property holding the items
+        :param cursor_key: body property holding the cursor
+        :param cursor_in_header: return the plain list and put the cursor in the X-Next-Cursor header
+        """
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.cursor_param = cursor_param
+        self.items_key = items_key
+        self.cursor_key = cursor_key
+        self.cursor_in_header = cursor_in_header
+
+        # the fixed parts of the body, {"items":[ ... ],"nextCursor":"..."}
+        self._prefix = '[' if cursor_in_header else f'{{{json.dumps(items_key)}:['
+        self._overhead = len(self._prefix) + len(json.dumps(cursor_key)) + 64
+
+    def __repr__(self):
+        return f"Pagination(max_items={self.max_items}, max_bytes={self.max_bytes})"
+
+    def get_offset(self, event: dict) -> int:
+        """
+        :return: the offset in the request's cursor, 0 if there isn't one
+        """
+        params = detect_format(event).query_params(event) if event else None
+        cursor = params.get(self.cursor_param) if params else None
+
+        return decode_cursor(cursor) if cursor else 0
+
+    def paginate(self, payload, offset: int = 0):
+        """
+        Serializes the page of payload starting at offset.
+
+        :param payload: list, tuple, iterator or Paginated
+        :param offset: offset of the first item to include
+        :return: (body, next cursor or None)
+        """
+        start = 0
+
+        if isinstance(payload, Paginated):
+            payload, start = payload
+
+        items = iter(payload)
+
+        if offset > start:
+            items = islice(items, offset - start, None)
+        else:
+            offset = start
+
+        encode = json_backend.encode
+        budget = self.max_bytes - self._overhead
+        parts = []
+        size = 0
+        has_more = False
+
+        for item in items:
+            if self.max_items is not None and len(parts) >= self.max_items:
+                has_more = True
+                break
+
+            encoded = encode(item)
+            size += len(encoded) + 1
+
+            # sizes are in characters, close enough given the headroom under the 6MB limit. An item that's over the
+            # budget on its own is still sent, as the only item on its page
+            if size > budget and parts:
+                has_more = True
+                break
+
+            parts.append(encoded)
+
+        next_cursor = encode_cursor(offset + len(parts)) if has_more else None
+        body = self._prefix + ','.join(parts) + ']'
+
+        if not self.cursor_in_header:
+            body += f',{json.dumps(self.cursor_key)}:{json.dumps(next_cursor)}}}'
+
+        return body, next_cursor
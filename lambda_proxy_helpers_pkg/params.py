@@ -0,0 +1,198 @@
+from functools import lru_cache
+from collections import namedtuple
+
+from .lambda_errors import InvalidParameterError, MissingParameterError
+
+PATH = 'path'
+QUERY = 'query'
+
+_SOURCE_NAMES = {PATH: 'path parameters', QUERY: 'query string parameters'}
+
+_TRUE_VALUES = frozenset(('true', 't', 'yes', 'y', '1'))
+_FALSE_VALUES = frozenset(('false', 'f', 'no', 'n', '0'))
+
+# type: str, int, float, bool, uuid.UUID, datetime.date, datetime.datetime or an Enum (matched on its values)
+# required: raise a MissingParameterError if the parameter is missing or empty, otherwise default is returned
+# many: return a list, taken from multiValueQueryStringParameters and/or split on separator (None to not split)
+# choices: the allowed (raw) values
+# specs are cached by value so they must be hashable, use tuples for choices and list defaults
+Param = namedtuple('Param', ['type', 'required', 'default', 'many', 'separator', 'choices'],
+                   defaults=(str, False, None, False, ',', None))
+
+
+def _parse_bool(value: str) -> bool:
+    lower = value.lower()
+
+    if lower in _TRUE_VALUES:
+        return True
+
+    if lower in _FALSE_VALUES:
+        return False
+
+    raise ValueError(value)
+
+
+def _enum_converter(enum_type):
+    """
+    Query strings are always strings, so members are matched on the string form of their value (e.g. '1' for 1) or,
+    failing that, the raw value converted to the type of the members' values (e.g. '01' for 1)
+    """
+    members = {str(member.value): member for member in enum_type}
+    # bool('no') is True, so bool values are only matched on their string form
+    value_types = {type(member.value) for member in enum_type} - {str, bool}
+
+    def convert(value):
+        member = members.get(value)
+
+        if member is not None:
+            return member
+
+        for value_type in value_types:
+            try:
+                return enum_type(value_type(value))
+            except (ValueError, TypeError, ArithmeticError):
+                pass
+
+        raise ValueError(value)
+
+    return convert
+
+
+def _value_converter(spec: Param):
+    """
+    :return: (function converting a single raw value, description of the expected value for error messages)
+    """
+    param_type = spec.type
+
+    if param_type is str:
+        converter, expected = None, 'a string'
+    elif param_type is int:
+        converter, expected = int, 'an integer'
+    elif param_type is float:
+        converter, expected = float, 'a number'
+    elif param_type is bool:
+        converter, expected = _parse_bool, 'true or false'
+    else:
+        # only pay for these imports when a spec needs them
+        from enum import Enum
+        from uuid import UUID
+        from datetime import date, datetime
+
+        if param_type is UUID:
+            converter, expected = UUID, 'a UUID'
+        elif param_type is datetime:
+            converter, expected = datetime.fromisoformat, 'an ISO 8601 date and time'
+        elif param_type is date:
+            converter, expected = date.fromisoformat, 'an ISO 8601 date (YYYY-MM-DD)'
+        elif isinstance(param_type, type) and issubclass(param_type, Enum):
+            converter = _enum_converter(param_type)
+            expected = f"one of {', '.join(str(member.value) for member in param_type)}"
+        else:
+            raise TypeError(f"Unsupported parameter type {param_type!r}")
+
+    if spec.choices is not None:
+        choices = frozenset(spec.choices)
+        expected = f"one of {', '.join(sorted(choices))}"
+        convert = converter
+
+        def converter(value):
+            if value not in choices:
+                raise ValueError(value)
+
+            return value if convert is None else convert(value)
+
+    return converter, expected
+
+
+@lru_cache(maxsize=1024)
+def compile_param(name: str, spec: Param = Param(), source: str = QUERY):
+    """
+    Compiles a parameter spec into a function that extracts and converts the parameter from an EventParser. Compiled
+    functions are cached by (name, spec, source) so a spec declared inline is only compiled once per container.
+
+    :param name: parameter name
+    :param spec: the Param
+    :param source: PATH or QUERY
+    :return: function(event_parser) -> value
+    """
+    if source not in _SOURCE_NAMES:
+        raise ValueError(f"source must be '{PATH}' or '{QUERY}'")
+
+    convert, expected = _value_converter(spec)
+    missing_message = f"{name} not found in {_SOURCE_NAMES[source]} or value is empty"
+    invalid_message = f"{name} must be {expected}"
+    multi_value = spec.many and source == QUERY
+    separator = spec.separator
+
+    def missing():
+        if spec.required:
+            raise MissingParameterError(missing_message)
+
+        return spec.default
+
+    def extract(event_parser):
+        params = event_parser.path_params if source == PATH else event_parser.query_params
+        value = params.get(name) if params else None
+
+        if spec.many:
+            values = None
+
+            if multi_value:
+                multi_params = event_parser.multi_value_query_params
+                values = multi_params.get(name) if multi_params else None
+
+            if values is None:
+                values = [value] if value else []
+
+            if separator:
+                values = [part for value in values for part in value.split(separator) if part]
+            else:
+                values = [value for value in values if value]
+
+            if not values:
+                return missing()
+
+            if convert is None:
+                return values
+
+            try:
+                return [convert(value) for value in values]
+            except ValueError:
+                raise InvalidParameterError(invalid_message)
+
+        if not value:
+            return missing()
+
+        if convert is None:
+            return value
+
+        try:
+            return convert(value)
+        except ValueError:
+            raise InvalidParameterError(invalid_message)
+
+    return extract
+
+
+def compile_params(path: dict = None, query: dict = None):
+    """
+    Compiles a set of parameter specs, declare these once at module level:
+
+        LIST_ITEMS = compile_params(path={'accountId': Param(UUID, required=True)},
+                                    query={'limit': Param(int, default=20),
+                                           'status': Param(Status, many=True),
+                                           'since': Param(date)})
+
+        params = ep.get_params(LIST_ITEMS)  # {'accountId': UUID(...), 'limit': 20, 'status': [Status.LIVE], ...}
+
+    :param path: dict of path parameter name -> Param
+    :param query: dict of query string parameter name -> Param
+    :return: function(event_parser) -> dict of name -> converted value
+    """
+    extractors = tuple((name, compile_param(name, spec, PATH)) for name, spec in (path or {}).items()) + \
+        tuple((name, compile_param(name, spec, QUERY)) for name, spec in (query or {}).items())
+
+    def extract_all(event_parser) -> dict:
+        return {name: extract(event_parser) for name, extract in extractors}
+
+    return extract_all
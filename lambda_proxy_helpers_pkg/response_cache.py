@@ -0,0 +1,203 @@
+import time
+import threading
+from collections import OrderedDict
+
+from .constants import HttpMethods, HttpStatusCodes
+from .lambda_errors import LambdaProxyError
+from .event_formats import detect_format, HEADER_SET_COOKIE
+
+VARY_ON_USER_ID = 'user_id'
+VARY_ON_ACCOUNT_ID = 'account_id'
+
+DEFAULT_TTL = 60
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+
+# rough per entry overhead (key, headers, bookkeeping) added to the body length when tracking memory use
+_ENTRY_OVERHEAD = 512
+
+
+def _freeze(params):
+    return tuple(sorted(params.items())) if params else ()
+
+
+def _freeze_multi(params):
+    return tuple(sorted((name, tuple(values or ())) for name, values in params.items())) if params else ()
+
+
+class ResponseCache:
+    """
+    In-container cache of fully serialized responses for idempotent GET handlers. Hand one to
+    lambda_proxy_response_wrapper and repeat requests are answered from memory without running the handler or
+    serializing the payload again.
+
+    Entries are keyed on the resource, path parameters and query string parameters and, when vary_on is set, the
+    authenticated user_id or account_id (as found by EventParser.validate_event_auth). Only 200 responses are
+    cached. Entries expire after ttl seconds and the least recently used entries are evicted once max_entries or
+    max_bytes is exceeded.
+
+    Cache hits are returned before the handler runs, so any auth the handler does itself is skipped for them. Give
+    the cache the handler's verifier and every request is authenticated before the cache is looked at (requests
+    that fail are passed to the handler to reject), whatever vary_on is. Without a verifier or vary_on, only cache
+    responses that are the same for everyone, including callers the handler would turn away.
+
+    The cache lives as long as the container, call invalidate() from the handlers that modify the data.
+    """
+    def __init__(self,
+                 ttl: float = DEFAULT_TTL,
+                 max_entries: int = DEFAULT_MAX_ENTRIES,
+                 max_bytes: int = DEFAULT_MAX_BYTES,
+                 vary_on: str = None,
+                 verifier=None,
+                 clock=time.monotonic):
+        """
+        :param ttl: seconds an entry is served for
+        :param max_entries: maximum number of cached responses
+        :param max_bytes: approximate memory cap, based on the size of the cached bodies
+        :param vary_on: None to share entries between users, VARY_ON_USER_ID or VARY_ON_ACCOUNT_ID to cache per
+                        user/account
+        :param verifier: JwtVerifier passed to validate_event_auth, with one set requests are always authenticated
+                         before the cache is used (even with vary_on None)
+        :param clock: time source, for tests
+        """
+        if vary_on not in (None, VARY_ON_USER_ID, VARY_ON_ACCOUNT_ID):
+            raise ValueError(f"vary_on must be None, '{VARY_ON_USER_ID}' or '{VARY_ON_ACCOUNT_ID}'")
+
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.vary_on = vary_on
+        self.verifier = verifier
+        self.clock = clock
+
+        self.size = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f"ResponseCache(ttl={self.ttl}, entries={len(self._entries)}, size={self.size})"
+
+    def __len__(self):
+        return len(self._entries)
+
+    def make_key(self, event: dict, vary=()):
+        """
+        Builds the cache key for a request.
+
+        :param event: the Lambda proxy event
+        :param vary: any other request values the response depends on (e.g. Origin, Accept-Encoding)
+        :return: the key, or None if the request can't be cached (not a GET or the user can't be determined or
+                 authenticated)
+        """
+        if not event:
+            return None
+
+        event_format = detect_format(event)
+
+        if event_format.method(event) != HttpMethods.GET:
+            return None
+
+        scope = None
+
+        if self.vary_on is not None or self.verifier is not None:
+            from .event_parser import EventParser
+
+            event_parser = EventParser(event)
+
+            try:
+                event_parser.validate_event_auth(requires_account_id=self.vary_on == VARY_ON_ACCOUNT_ID,
+                                                 verifier=self.verifier)
+            except LambdaProxyError:
+                # leave it to the handler to reject the request
+                return None
+
+            if self.vary_on is not None:
+                scope = getattr(event_parser, self.vary_on)
+
+        return (event_format.resource(event),
+                _freeze(event_format.path_params(event)),
+                _freeze(event_format.query_params(event)),
+                _freeze_multi(event_format.multi_value_query_params(event)),
+                scope,
+                tuple(vary))
+
+    def get(self, key):
+        """
+        :return: a copy of the cached response or None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None:
+                return None
+
+            expires, size, response = entry
+
+            if self.clock() >= expires:
+                self._remove(key)
+                return None
+
+            self._entries.move_to_end(key)
+
+        # the wrapper's callers may modify the response (headers especially) so never hand out the cached dict
+        return {**response, "headers": dict(response["headers"])}
+
+    def put(self, key, response: dict):
+        """
+        Caches a copy of the response if it's a 200 that doesn't set cookies
+        """
+        if response.get("statusCode") != HttpStatusCodes.OK:
+            return
+
+        if HEADER_SET_COOKIE in (response.get("multiValueHeaders") or ()):
+            return
+
+        size = len(response.get("body") or '') + _ENTRY_OVERHEAD
+
+        if size > self.max_bytes:
+            return
+
+        entry = (self.clock() + self.ttl, size, {**response, "headers": dict(response["headers"])})
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            self._entries[key] = entry
+            self.size += size
+
+            while len(self._entries) > self.max_entries or self.size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, key):
+        _, size, _ = self._entries.pop(key)
+        self.size -= size
+
+    def invalidate(self, resource: str = None, path_params: dict = None):
+        """
+        Removes cached responses. With no arguments everything is removed, otherwise only the entries for the
+        resource (and, if given, path parameters).
+
+        :param resource: API Gateway resource template, e.g. /items/{itemId}
+        :param path_params: only remove entries for these path parameters
+        :return: number of entries removed
+        """
+        frozen_params = _freeze(path_params) if path_params is not None else None
+
+        with self._lock:
+            if resource is None:
+                removed = len(self._entries)
+                self._entries.clear()
+                self.size = 0
+                return removed
+
+            keys = [key for key in self._entries
+                    if key[0] == resource and (frozen_params is None or key[1] == frozen_params)]
+
+            for key in keys:
+                self._remove(key)
+
+            return len(keys)
+
+    def clear(self):
+        self.invalidate()
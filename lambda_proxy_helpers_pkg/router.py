@@ -0,0 +1,145 @@
+from types import CoroutineType
+
+from .constants import HttpMethods, HttpStatusCodes
+from .event_parser import EventParser
+from .lambda_errors import NotFoundError, MethodNotAllowedError
+from .lambda_proxy_response_wrapper import lambda_proxy_response_wrapper, FunctionResponse, get_event_loop
+
+HEADER_ALLOW = "Allow"
+
+
+class Router:
+    """
+    Dispatches a request to the handler registered for its (HTTP method, resource) pair, where resource is the API
+    Gateway resource template (e.g. "/items/{itemId}") rather than the request path. Routes are held in a dict so
+    finding the handler is a single lookup however many routes the function serves.
+
+    Register routes at module level so the table is built once per container:
+
+        router = Router()
+
+        @router.route(HttpMethods.GET, '/items/{itemId}')
+        def get_item(event, context):
+            return FunctionResponse(status_code=200, payload={...}, url=None)
+
+        handler = router  # the Lambda handler
+
+    Requests for an unknown resource get a 404 and unsupported methods a 405 with an Allow header. HEAD is answered
+    by the GET handler (without the body) and OPTIONS with a 204 listing the allowed methods, unless handlers are
+    registered for them explicitly.
+
+    With HTTP APIs the resource is the route's path (from the routeKey), Function URLs and ALBs don't have resource
+    templates so their routes are matched on the request path.
+
+    Handlers can be async functions. Any keyword arguments are passed to lambda_proxy_response_wrapper.
+    """
+    def __init__(self, **wrapper_options):
+        self._routes = {}
+        self._methods = {}
+        self._allow = {}
+        self._wrapped_dispatch = lambda_proxy_response_wrapper(**wrapper_options)(self._dispatch)
+
+    def __repr__(self):
+        return f"Router(routes={sorted(self._routes)})"
+
+    @property
+    def resources(self) -> tuple:
+        """
+        The resource templates routes are registered for
+        """
+        return tuple(self._methods)
+
+    def add_route(self, method: str, resource: str, handler):
+        """
+        Registers handler for the method and resource template. The handler is called with (event, context) and
+        should return a FunctionResponse or raise one of the lambda_errors, as with lambda_proxy_response_wrapper.
+
+        :param method: one of HttpMethods
+        :param resource: API Gateway resource template, e.g. /items/{itemId}
+        :param handler: the handler function
+        :return:
+        """
+        method = method.upper()
+        key = (method, resource)
+
+        if key in self._routes:
+            raise ValueError(f"A handler is already registered for {method} {resource}")
+
+        self._routes[key] = handler
+        methods = self._methods.setdefault(resource, set())
+        methods.add(method)
+
+        if HttpMethods.GET in methods:
+            methods.add(HttpMethods.HEAD)
+
+        methods.add(HttpMethods.OPTIONS)
+        self._allow[resource] = ', '.join(sorted(methods))
+
+    def route(self, method: str, resource: str):
+        """
+        Decorator version of add_route
+        """
+        def decorator(func):
+            self.add_route(method, resource, func)
+            return func
+
+        return decorator
+
+    def resolve(self, method: str, resource: str):
+        """
+        Returns the handler for the method/resource. HEAD falls back to the GET handler and OPTIONS to a handler
+        returning 204.
+
+        :return: the handler function
+        """
+        handler = self._routes.get((method, resource))
+
+        if handler is not None:
+            return handler
+
+        if resource not in self._allow:
+            raise NotFoundError(f"Resource {resource} not found")
+
+        if method == HttpMethods.HEAD:
+            handler = self._routes.get((HttpMethods.GET, resource))
+
+            if handler is not None:
+                return handler
+
+        if method == HttpMethods.OPTIONS:
+            return _options_handler
+
+        raise MethodNotAllowedError(f"Method {method} is not allowed for {resource}")
+
+    def _dispatch(self, event, context, method, resource):
+        result = self.resolve(method, resource)(event, context)
+
+        if isinstance(result, CoroutineType):
+            result = get_event_loop().run_until_complete(result)
+
+        return result
+
+    def __call__(self, event, context):
+        event_parser = EventParser(event)
+        method, resource = event_parser.method, event_parser.resource_path
+
+        resp = self._wrapped_dispatch(event, context, method=method, resource=resource)
+
+        if method == HttpMethods.HEAD:
+            resp.pop('body', None)
+            resp.pop('isBase64Encoded', None)
+
+        allow = self._allow.get(resource)
+
+        if allow and (method == HttpMethods.OPTIONS or resp['statusCode'] == HttpStatusCodes.METHOD_NOT_ALLOWED):
+            if 'headers' in resp:
+                resp['headers'][HEADER_ALLOW] = allow
+            else:
+                # ALB responses with multi value headers enabled
+                resp['multiValueHeaders'][HEADER_ALLOW] = [allow]
+
+        return resp
+
+
+def _options_handler(event, context):
+    return FunctionResponse(status_code=HttpStatusCodes.NO_CONTENT, payload=None, url=None)
@@ -0,0 +1,185 @@
+import os
+import sys
+import json
+import time
+import threading
+from collections import namedtuple
+
+# set to 1/true/yes to capture (and return) the full stack trace of every unhandled error
+DEBUG_ENV = 'LAMBDA_PROXY_DEBUG'
+# fraction of unhandled errors to capture the full stack trace of, when not set by the policy
+SAMPLE_RATE_ENV = 'STACKTRACE_SAMPLE_RATE'
+
+DEFAULT_SAMPLE_RATE = 0.05
+DEFAULT_MAX_SIZE = 8 * 1024
+DEFAULT_MAX_FRAMES = 30
+DEFAULT_MAX_PER_MINUTE = 30
+DEFAULT_SIGNATURE_FRAMES = 3
+
+_TRUE_VALUES = frozenset(('1', 'true', 'yes', 'on'))
+
+# signature: exception type and the innermost frames, always captured
+# trace: the formatted stack trace, None unless the error was sampled (or in debug mode)
+CapturedTrace = namedtuple('CapturedTrace', ['error_type', 'signature', 'trace'])
+
+
+def is_debug() -> bool:
+    return os.environ.get(DEBUG_ENV, '').lower() in _TRUE_VALUES
+
+
+def exception_signature(e: BaseException, frames: int = DEFAULT_SIGNATURE_FRAMES) -> str:
+    """
+    A cheap, stable signature for an exception: its type and where it was raised (file, function and line of the
+    innermost frames), e.g. "KeyError@handlers.py:get_item:42<service.py:load:17". The traceback isn't formatted.
+    """
+    locations = []
+    tb = e.__traceback__
+
+    while tb is not None:
+        code = tb.tb_frame.f_code
+        locations.append(f"{os.path.basename(code.co_filename)}:{code.co_name}:{tb.tb_lineno}")
+        tb = tb.tb_next
+
+    error_type = type(e)
+    name = error_type.__qualname__ if error_type.__module__ == 'builtins' else \
+        f"{error_type.__module__}.{error_type.__qualname__}"
+
+    return f"{name}@{'<'.join(reversed(locations[-frames:]))}" if locations else name
+
+
+def format_trace(e: BaseException, max_size: int = DEFAULT_MAX_SIZE, max_frames: int = DEFAULT_MAX_FRAMES) -> str:
+    """
+    Formats the exception's stack trace, keeping the innermost max_frames frames and at most max_size characters
+    (the end of the trace, where the error was raised, is kept)
+    """
+    import traceback
+
+    formatted = ''.join(traceback.format_exception(type(e), e, e.__traceback__, limit=-max_frames))
+
+    if len(formatted) > max_size:
+        formatted = '...\n' + formatted[-max_size:]
+
+    return formatted
+
+
+class StacktracePolicy:
+    """
+    Decides how much of an unhandled error's stack trace to capture. Formatting a full trace (and importing traceback
+    to do it) is expensive, and during an incident every request can fail, so by default only a sample of errors get
+    the full trace, capped in size and at max_per_minute per container. Every other error gets its signature (type
+    and innermost frames), which is enough to group and count them.
+
+    In debug mode (debug=True or the LAMBDA_PROXY_DEBUG environment variable) every error gets the full trace.
+
+    Captured traces are logged as a single JSON line and, with in_response set, added to the error response as
+    stackTrace. Only do that in non-production stages, e.g. in_response=os.environ['STAGE'] != 'prod'.
+    """
+    def __init__(self,
+                 sample_rate: float = None,
+                 debug: bool = None,
+                 max_size: int = DEFAULT_MAX_SIZE,
+                 max_frames: int = DEFAULT_MAX_FRAMES,
+                 max_per_minute: int = DEFAULT_MAX_PER_MINUTE,
+                 log: bool = True,
+                 in_response: bool = None,
+                 stream=None,
+                 clock=time.monotonic):
+        """
+        :param sample_rate: fraction of errors to capture the full trace of, defaults to STACKTRACE_SAMPLE_RATE or 5%
+        :param debug: capture every trace, defaults to the LAMBDA_PROXY_DEBUG environment variable
+        :param max_size: most characters of a trace kept
+        :param max_frames: most (innermost) frames of a trace kept
+        :param max_per_minute: most full traces captured a minute, None for no limit (debug mode has no limit)
+        :param log: write captured traces to stream (stdout by default)
+        :param in_response: add the trace to the error response body, defaults to debug
+        """
+        if sample_rate is None:
+            sample_rate = float(os.environ.get(SAMPLE_RATE_ENV, DEFAULT_SAMPLE_RATE))
+
+        if debug is None:
+            debug = is_debug()
+
+        self.sample_rate = sample_rate
+        self.debug = debug
+        self.max_size = max_size
+        self.max_frames = max_frames
+        self.max_per_minute = max_per_minute
+        self.log = log
+        self.in_response = debug if in_response is None else in_response
+        self.stream = stream
+        self._clock = clock
+        self._window_start = None
+        self._window_count = 0
+        self._lock = threading.Lock()
+        self._random = None
+
+        if 0.0 < sample_rate < 1.0:
+            import random
+            self._random = random.random
+
+    def __repr__(self):
+        return f"StacktracePolicy(sample_rate={self.sample_rate}, debug={self.debug}, in_response={self.in_response})"
+
+    def is_sampled(self) -> bool:
+        if self.debug:
+            return True
+
+        if self.sample_rate <= 0.0 or (self._random is not None and self._random() >= self.sample_rate):
+            return False
+
+        if self.max_per_minute is None:
+            return True
+
+        with self._lock:
+            now = self._clock()
+
+            if self._window_start is None or now - self._window_start >= 60:
+                self._window_start = now
+                self._window_count = 0
+
+            if self._window_count >= self.max_per_minute:
+                return False
+
+            self._window_count += 1
+            return True
+
+    def capture(self, e: BaseException) -> CapturedTrace:
+        """
+        Captures the error's signature, and its full trace if it's sampled, logging it if log is set
+        """
+        captured = CapturedTrace(error_type=type(e).__name__,
+                                 signature=exception_signature(e),
+                                 trace=format_trace(e, self.max_size, self.max_frames) if self.is_sampled() else None)
+
+        if self.log:
+            self.write(captured)
+
+        return captured
+
+    def write(self, captured: CapturedTrace):
+        record = {"level": "ERROR", "errorType": captured.error_type, "signature": captured.signature}
+
+        if captured.trace is not None:
+            record["stackTrace"] = captured.trace
+
+        print(json.dumps(record), file=self.stream or sys.stdout)
+
+
+_default_policy = None
+
+
+def get_default_policy() -> StacktracePolicy:
+    """
+    The policy used by wrappers that aren't given one, configured from the environment
+    """
+    global _default_policy
+
+    if _default_policy is None:
+        _default_policy = StacktracePolicy()
+
+    return _default_policy
+
+
+def set_default_policy(policy: StacktracePolicy):
+    global _default_policy
+    _default_policy = policy
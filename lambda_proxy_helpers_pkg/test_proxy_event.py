@@ -1,8 +1,335 @@
+import re
 import json
+import random
+import threading
 from collections import namedtuple
 
+from .event_formats import REST_API, HTTP_API, FUNCTION_URL, ALB
+
 CognitoDetail = namedtuple('CognitoDetail', ['user_id', 'email', 'account_id', 'account_created'])
 
+# http_method and resource (template) of a route for generate_events, bodies and queries are lists to pick from
+Route = namedtuple('Route', ['http_method', 'resource', 'bodies', 'queries'], defaults=(None, None))
+
+_PATH_PARAM = re.compile(r'{([^{}+]+)\+?}')
+
+# The parts of an event that are the same for every request. Events are stamped out from these: anything a caller
+# might vary or modify (the top level, headers and query params) is new per event, the rest is shared, not copied.
+_REST_HEADERS = {
+    "Accept": "*/*",
+    "Accept-Encoding": "gzip, deflate, br",
+    "Authorization": "Bearer <TOKEN>",
+    "Cache-Control": "no-cache",
+    "CloudFront-Forwarded-Proto": "https",
+    "CloudFront-Is-Desktop-Viewer": "true",
+    "CloudFront-Is-Mobile-Viewer": "false",
+    "CloudFront-Is-SmartTV-Viewer": "false",
+    "CloudFront-Is-Tablet-Viewer": "false",
+    "CloudFront-Viewer-Country": "US",
+    "Host": "1234567890.execute-api.us-east-1.amazonaws.com",
+    "User-Agent": "Custom User Agent",
+    "Via": "1.1 08f323deadbeefa7af34d5feb414ce27.cloudfront.net (CloudFront)",
+    "X-Amz-Cf-Id": "cDehVQoZnx43VYQb9j2-nvCh-9z396Uhbp027Y2JvkCPNLmGJHqlaA==",
+    "X-Forwarded-For": "127.0.0.1, 127.0.0.2",
+    "X-Forwarded-Port": "443",
+    "X-Forwarded-Proto": "https"
+}
+
+_REST_IDENTITY = {
+    "cognitoIdentityPoolId": None,
+    "accountId": None,
+    "cognitoIdentityId": None,
+    "caller": None,
+    "sourceIp": "127.0.0.1",
+    "principalOrgId": None,
+    "accessKey": None,
+    "cognitoAuthenticationType": None,
+    "cognitoAuthenticationProvider": None,
+    "userArn": None,
+    "userAgent": "Custom User Agent",
+    "user": None
+}
+
+_REST_REQUEST_CONTEXT = {
+    "resourceId": "abcdefghijk",
+    "extendedRequestId": "abcdefghijk=",
+    "requestTime": "06/Nov/2020:22:21:39 +0000",
+    "path": "/Development/test",
+    "accountId": "123456789",
+    "protocol": "HTTP/1.1",
+    "stage": "Development",
+    "domainPrefix": "abcdefghi",
+    "requestTimeEpoch": 1604701299694,
+    "requestId": "d0550a66-2c2d-11eb-8a9f-6b193de7ce54",
+    "identity": _REST_IDENTITY,
+    "domainName": "1234567890.execute-api.us-east-1.amazonaws.com",
+    "apiId": "abcdefghijk"
+}
+
+_V2_HEADERS = {name.lower(): value for name, value in _REST_HEADERS.items()}
+
+_V2_REQUEST_CONTEXT = {
+    "accountId": "123456789",
+    "apiId": "abcdefghijk",
+    "domainName": "abcdefghijk.execute-api.us-east-1.amazonaws.com",
+    "domainPrefix": "abcdefghijk",
+    "requestId": "d0550a66-2c2d-11eb-8a9f-6b193de7ce54",
+    "stage": "$default",
+    "time": "06/Nov/2020:22:21:39 +0000",
+    "timeEpoch": 1604701299694
+}
+
+_FUNCTION_URL_REQUEST_CONTEXT = dict(_V2_REQUEST_CONTEXT,
+                                     domainName="abcdefghijk.lambda-url.us-east-1.on.aws",
+                                     apiId="abcdefghijk")
+
+_ALB_HEADERS = {
+    "accept": "*/*",
+    "accept-encoding": "gzip, deflate, br",
+    "host": "my-alb-1234567890.us-east-1.elb.amazonaws.com",
+    "user-agent": "Custom User Agent",
+    "x-amzn-trace-id": "Root=1-5fa5cc33-4f1b8fa1c1c0e2b52a5f1d4e",
+    "x-forwarded-for": "127.0.0.1",
+    "x-forwarded-port": "443",
+    "x-forwarded-proto": "https"
+}
+
+_ALB_REQUEST_CONTEXT = {
+    "elb": {"targetGroupArn": "arn:aws:elasticloadbalancing:us-east-1:123456789:targetgroup/test/abcdefghijk"}
+}
+
+_FORMATS = (REST_API, HTTP_API, FUNCTION_URL, ALB)
+
+
+def cognito_claims(cognito_detail: CognitoDetail) -> dict:
+    """
+    :return: the claims of a Cognito user pool id token, as an API Gateway Cognito authorizer passes them on
+    """
+    return {
+        "sub": cognito_detail.user_id,
+        "aud": "1g31q8lvpfs0uqkqpravprhth5",
+        "email_verified": "true",
+        "event_id": "ac602ff9-b2fe-45f7-a06f-ced94764b043",
+        "token_use": "id",
+        "auth_time": "1604701288",
+        "iss": "https://cognito-idp.us-west-2.amazonaws.com/us-west-2_abcdef",
+        "cognito:username": cognito_detail.user_id,
+        "exp": "Fri Nov 06 23:21:28 UTC 2020",
+        "iat": "Fri Nov 06 22:21:28 UTC 2020",
+        "email": cognito_detail.email,
+        "custom:account_id": cognito_detail.account_id,
+        "custom:account_created": "Y" if cognito_detail.account_created else "N"
+    }
+
+
+def _path_formatter(resource: str):
+    """
+    :return: (path parameter names, format string taking their values in order)
+    """
+    return tuple(_PATH_PARAM.findall(resource)), _PATH_PARAM.sub('{}', resource)
+
+
+class EventFactory:
+    """
+    Stamps out test events for one event format (REST API, HTTP API, Function URL or ALB) from templates. Only the
+    parts of an event that vary per request are built per call: the top level dict, headers and query string params.
+    The request context's unchanging parts (identity, elb) and the claims dict you pass in are shared between events,
+    treat those as read only.
+
+        factory = EventFactory(HTTP_API)
+        event = factory.make('GET', '/items/{itemId}', path_params={'itemId': 'abc'}, claims=cognito_claims(user))
+    """
+    def __init__(self, event_format: str = REST_API, headers: dict = None, multi_value_headers: bool = False):
+        """
+        :param event_format: REST_API, HTTP_API, FUNCTION_URL or ALB (see event_formats)
+        :param headers: headers to add to (or replace in) the template's headers for every event
+        :param multi_value_headers: ALB only, build events for a target group with multi value headers enabled
+        """
+        if event_format not in _FORMATS:
+            raise ValueError(f"Unknown event format {event_format!r}")
+
+        if event_format == REST_API:
+            template_headers = _REST_HEADERS
+        elif event_format == ALB:
+            template_headers = _ALB_HEADERS
+        else:
+            template_headers = _V2_HEADERS
+
+        self.event_format = event_format
+        self.headers = dict(template_headers, **headers) if headers else template_headers
+        self.multi_value_headers = multi_value_headers
+        self._paths = {}
+
+    def __repr__(self):
+        return f"EventFactory(event_format={self.event_format!r})"
+
+    def format_path(self, resource: str, path_params: dict) -> str:
+        """
+        Fills a resource template's path parameters in, e.g. /items/{itemId} -> /items/abc
+        """
+        formatter = self._paths.get(resource)
+
+        if formatter is None:
+            formatter = self._paths[resource] = _path_formatter(resource)
+
+        names, template = formatter
+
+        if not names:
+            return resource
+
+        return template.format(*(path_params[name] for name in names))
+
+    def make(self,
+             http_method: str = 'GET',
+             resource: str = '/',
+             body=None,
+             path: str = None,
+             path_params: dict = None,
+             query_string_params: dict = None,
+             stage_vars: dict = None,
+             claims: dict = None,
+             headers: dict = None,
+             raw_body: str = None,
+             is_base64_encoded: bool = False) -> dict:
+        """
+        :param resource: the resource template, e.g. /items/{itemId}
+        :param body: JSON serializable request body
+        :param path: the request path, by default the resource with path_params filled in
+        :param query_string_params: dict of name -> value, or a list of values for a repeated parameter
+        :param claims: authorizer claims (see cognito_claims), not supported by ALB events
+        :param headers: headers to add to (or replace in) the factory's headers
+        :param raw_body: the body as it's sent, use this instead of body for pre-serialized or base64 encoded bodies
+        :return: the event
+        """
+        if path is None:
+            path = self.format_path(resource, path_params) if path_params else resource
+
+        if raw_body is None and body is not None:
+            raw_body = json.dumps(body)
+
+        event_headers = dict(self.headers, **headers) if headers else dict(self.headers)
+
+        if self.event_format == REST_API:
+            return self._make_rest_event(http_method, resource, raw_body, path, path_params, query_string_params,
+                                         stage_vars, claims, event_headers, is_base64_encoded)
+
+        if self.event_format == ALB:
+            if claims is not None:
+                raise ValueError('ALB events have no authorizer claims')
+
+            return self._make_alb_event(http_method, raw_body, path, query_string_params, event_headers,
+                                        is_base64_encoded)
+
+        return self._make_v2_event(http_method, resource, raw_body, path, path_params, query_string_params,
+                                   stage_vars, claims, event_headers, is_base64_encoded)
+
+    def _make_rest_event(self, http_method, resource, raw_body, path, path_params, query_string_params, stage_vars,
+                         claims, headers, is_base64_encoded) -> dict:
+        query, multi_value_query = _split_query(query_string_params)
+        request_context = dict(_REST_REQUEST_CONTEXT, resourcePath=path, httpMethod=http_method)
+
+        if claims is not None:
+            request_context['authorizer'] = {"claims": claims}
+
+        return {
+            "resource": resource,
+            "path": path,
+            "httpMethod": http_method,
+            "headers": headers,
+            "queryStringParameters": query,
+            "multiValueQueryStringParameters": multi_value_query,
+            "pathParameters": path_params,
+            "stageVariables": stage_vars,
+            "requestContext": request_context,
+            "body": raw_body,
+            "isBase64Encoded": is_base64_encoded
+        }
+
+    def _make_v2_event(self, http_method, resource, raw_body, path, path_params, query_string_params, stage_vars,
+                       claims, headers, is_base64_encoded) -> dict:
+        function_url = self.event_format == FUNCTION_URL
+        route_key = '$default' if function_url else f"{http_method} {resource}"
+        query = None
+        raw_query = ''
+
+        if query_string_params:
+            from urllib.parse import urlencode
+
+            query = {name: ','.join(value) if isinstance(value, (list, tuple)) else value
+                     for name, value in query_string_params.items()}
+            raw_query = urlencode(query_string_params, doseq=True)
+
+        request_context = dict(_FUNCTION_URL_REQUEST_CONTEXT if function_url else _V2_REQUEST_CONTEXT,
+                               routeKey=route_key,
+                               http={"method": http_method, "path": path, "protocol": "HTTP/1.1",
+                                     "sourceIp": "127.0.0.1", "userAgent": "Custom User Agent"})
+
+        if claims is not None:
+            request_context['authorizer'] = {"jwt": {"claims": claims, "scopes": None}}
+
+        event = {
+            "version": "2.0",
+            "routeKey": route_key,
+            "rawPath": path,
+            "rawQueryString": raw_query,
+            "headers": headers,
+            "queryStringParameters": query,
+            "requestContext": request_context,
+            "isBase64Encoded": is_base64_encoded
+        }
+
+        # as with the real thing, body is left out of requests without one
+        if raw_body is not None:
+            event["body"] = raw_body
+
+        if not function_url:
+            event["pathParameters"] = path_params
+            event["stageVariables"] = stage_vars
+
+        return event
+
+    def _make_alb_event(self, http_method, raw_body, path, query_string_params, headers, is_base64_encoded) -> dict:
+        # the load balancer passes query string parameters on URL encoded
+        from urllib.parse import quote_plus
+
+        multi_value_query = {quote_plus(name): [quote_plus(item) for item in _as_list(value)]
+                             for name, value in (query_string_params or {}).items()}
+        event = {
+            "requestContext": _ALB_REQUEST_CONTEXT,
+            "httpMethod": http_method,
+            "path": path,
+            "body": raw_body or '',
+            "isBase64Encoded": is_base64_encoded
+        }
+
+        if self.multi_value_headers:
+            event["multiValueHeaders"] = {name: [value] for name, value in headers.items()}
+            event["multiValueQueryStringParameters"] = multi_value_query
+        else:
+            event["headers"] = headers
+            event["queryStringParameters"] = {name: values[-1] for name, values in multi_value_query.items()}
+
+        return event
+
+
+def _as_list(value) -> list:
+    return list(value) if isinstance(value, (list, tuple)) else [value]
+
+
+def _split_query(query_string_params: dict):
+    """
+    :return: (queryStringParameters, multiValueQueryStringParameters), the latter is only set if a parameter has a
+             list of values
+    """
+    if not query_string_params or not any(isinstance(value, (list, tuple)) for value in query_string_params.values()):
+        return query_string_params, None
+
+    multi_value = {name: _as_list(value) for name, value in query_string_params.items()}
+    return {name: values[-1] for name, values in multi_value.items()}, multi_value
+
+
+_REST_API_FACTORY = EventFactory()
+
 
 def get_test_proxy_event(http_method: str = 'POST',
                          resource: str = '/',
@@ -12,84 +339,300 @@ def get_test_proxy_event(http_method: str = 'POST',
                          query_string_params: dict = None,
                          stage_vars: dict = None,
                          cognito_detail: CognitoDetail = None) -> dict:
-    event = {
-        "resource": resource,
-        "path": path,
-        "httpMethod": http_method,
-        "headers": {
-            "Accept": "*/*",
-            "Accept-Encoding": "gzip, deflate, br",
-            "Authorization": "Bearer <TOKEN>",
-            "Cache-Control": "no-cache",
-            "CloudFront-Forwarded-Proto": "https",
-            "CloudFront-Is-Desktop-Viewer": "true",
-            "CloudFront-Is-Mobile-Viewer": "false",
-            "CloudFront-Is-SmartTV-Viewer": "false",
-            "CloudFront-Is-Tablet-Viewer": "false",
-            "CloudFront-Viewer-Country": "US",
-            "Host": "1234567890.execute-api.us-east-1.amazonaws.com",
-            "User-Agent": "Custom User Agent",
-            "Via": "1.1 08f323deadbeefa7af34d5feb414ce27.cloudfront.net (CloudFront)",
-            "X-Amz-Cf-Id": "cDehVQoZnx43VYQb9j2-nvCh-9z396Uhbp027Y2JvkCPNLmGJHqlaA==",
-            "X-Forwarded-For": "127.0.0.1, 127.0.0.2",
-            "X-Forwarded-Port": "443",
-            "X-Forwarded-Proto": "https"
-        },
-        "queryStringParameters": query_string_params,
-        "multiValueQueryStringParameters": None,
-        "pathParameters": path_params,
-        "stageVariables": stage_vars,
-        "requestContext": {
-            "resourceId": "abcdefghijk",
-            "resourcePath": path,
-            "httpMethod": http_method,
-            "extendedRequestId": "abcdefghijk=",
-            "requestTime": "06/Nov/2020:22:21:39 +0000",
-            "path": "/Development/test",
-            "accountId": "123456789",
-            "protocol": "HTTP/1.1",
-            "stage": "Development",
-            "domainPrefix": "abcdefghi",
-            "requestTimeEpoch": 1604701299694,
-            "requestId": "d0550a66-2c2d-11eb-8a9f-6b193de7ce54",
-            "identity": {
-                "cognitoIdentityPoolId": None,
-                "accountId": None,
-                "cognitoIdentityId": None,
-                "caller": None,
-                "sourceIp": "127.0.0.1",
-                "principalOrgId": None,
-                "accessKey": None,
-                "cognitoAuthenticationType": None,
-                "cognitoAuthenticationProvider": None,
-                "userArn": None,
-                "userAgent": "Custom User Agent",
-                "user": None
-            },
-            "domainName": "1234567890.execute-api.us-east-1.amazonaws.com",
-            "apiId": "abcdefghijk"
-        },
-        "body": json.dumps(body) if body else None,
-        "isBase64Encoded": False
-    }
+    return _REST_API_FACTORY.make(http_method=http_method,
+                                  resource=resource,
+                                  body=body if body else None,
+                                  path=path,
+                                  path_params=path_params,
+                                  query_string_params=query_string_params,
+                                  stage_vars=stage_vars,
+                                  claims=cognito_claims(cognito_detail) if cognito_detail else None)
 
-    if cognito_detail:
-        event['requestContext']['authorizer'] = {
-            "claims": {
-                "sub": cognito_detail.user_id,
-                "aud": "1g31q8lvpfs0uqkqpravprhth5",
-                "email_verified": "true",
-                "event_id": "ac602ff9-b2fe-45f7-a06f-ced94764b043",
-                "token_use": "id",
-                "auth_time": "1604701288",
-                "iss": "https://cognito-idp.us-west-2.amazonaws.com/us-west-2_abcdef",
-                "cognito:username": cognito_detail.user_id,
-                "exp": "Fri Nov 06 23:21:28 UTC 2020",
-                "iat": "Fri Nov 06 22:21:28 UTC 2020",
-                "email": cognito_detail.email,
-                "custom:account_id": cognito_detail.account_id,
-                "custom:account_created": "Y" if cognito_detail.account_created else "N"
-            }
-        }
 
-    return event
+def generate_events(routes, count: int = None, factory: EventFactory = None, users: int = 100, ids: int = 1000,
+                    seed=None):
+    """
+    Yields varied events for load tests, cheaply enough that building them doesn't dominate the numbers. Everything
+    that can be is worked out up front: request bodies are serialized once, path templates parsed once and the
+    claims of each user built once (and shared between that user's events).
+
+        for event in generate_events([Route('GET', '/items/{itemId}'),
+                                      Route('POST', '/items', bodies=[{"name": "a"}, {"name": "b"}])],
+                                     count=1_000_000, seed=1):
+            handler(event, None)
+
+    :param routes: Routes (or (http_method, resource) tuples) to pick from at random
+    :param count: number of events, None for an endless stream
+    :param factory: EventFactory to build the events with, REST API events by default
+    :param users: number of distinct users (10 per account) to spread requests over, 0 for no claims
+    :param ids: number of distinct path parameter values
+    :param seed: random seed, for a repeatable stream
+    :return: generator of events
+    """
+    factory = factory or _REST_API_FACTORY
+    rng = random.Random(seed)
+    choice = rng.choice
+    prepared = []
+
+    for route in routes:
+        route = Route(*route)
+        names, template = _path_formatter(route.resource)
+        bodies = [json.dumps(body) for body in route.bodies] if route.bodies else None
+        prepared.append((route.http_method, route.resource, names, template, bodies, route.queries))
+
+    id_pool = [f"{rng.getrandbits(64):016x}" for _ in range(ids)]
+    claims_pool = [cognito_claims(CognitoDetail(user_id=f"user-{n}", email=f"user-{n}@example.com",
+                                                account_id=f"account-{n // 10}", account_created=True))
+                   for n in range(users)] or [None]
+    make = factory.make
+    produced = 0
+
+    while count is None or produced < count:
+        http_method, resource, names, template, bodies, queries = choice(prepared)
+
+        if names:
+            values = [choice(id_pool) for _ in names]
+            path_params = dict(zip(names, values))
+            path = template.format(*values)
+        else:
+            path_params, path = None, resource
+
+        yield make(http_method=http_method,
+                   resource=resource,
+                   path=path,
+                   path_params=path_params,
+                   query_string_params=dict(choice(queries)) if queries else None,
+                   claims=choice(claims_pool),
+                   raw_body=choice(bodies) if bodies else None)
+
+        produced += 1
+
+
+# headers, identity fields and claims that identify a user or carry credentials
+_SECRET_HEADERS = frozenset(('authorization', 'cookie', 'x-api-key', 'x-amz-security-token'))
+_IP_HEADERS = frozenset(('x-forwarded-for', 'x-real-ip'))
+_IDENTITY_FIELDS = frozenset(('accessKey', 'apiKey', 'apiKeyId', 'caller', 'cognitoIdentityId',
+                              'cognitoAuthenticationProvider', 'principalOrgId', 'user', 'userArn'))
+_PII_CLAIMS = frozenset(('sub', 'cognito:username', 'username', 'email', 'phone_number', 'name', 'given_name',
+                         'family_name', 'nickname', 'preferred_username', 'address', 'birthdate', 'custom:account_id',
+                         'event_id', 'jti', 'origin_jti', 'principalId'))
+
+
+class _Anonymizer:
+    """
+    Replaces identifying values with stable pseudonyms: the same input always maps to the same output (for a given
+    salt) so per user behaviour such as caching and rate limits still replays realistically.
+    """
+    def __init__(self, salt: str = ''):
+        from hashlib import blake2b
+
+        self.salt = salt.encode('utf-8')
+        self.blake2b = blake2b
+
+    def digest(self, value) -> bytes:
+        return self.blake2b(str(value).encode('utf-8'), digest_size=8, key=self.salt[:64]).digest()
+
+    def pseudonym(self, value):
+        if not isinstance(value, str) or not value:
+            return value
+
+        name = f"anon-{self.digest(value).hex()}"
+        return f"{name}@example.com" if '@' in value else name
+
+    def ip(self, value):
+        if not isinstance(value, str) or not value:
+            return value
+
+        return ', '.join('10.{}.{}.{}'.format(*self.digest(address.strip())[:3]) for address in value.split(','))
+
+    def header(self, name: str, value):
+        lower = name.lower()
+
+        if lower == 'authorization' and isinstance(value, str):
+            scheme, _, credentials = value.partition(' ')
+            return f"{scheme} {self.pseudonym(credentials)}" if credentials else self.pseudonym(value)
+
+        if lower in _SECRET_HEADERS:
+            return self.pseudonym(value)
+
+        if lower in _IP_HEADERS:
+            return self.ip(value)
+
+        return value
+
+    def cookie(self, cookie: str) -> str:
+        name, separator, value = cookie.partition('=')
+        return f"{name}={self.pseudonym(value)}" if separator else self.pseudonym(cookie)
+
+    def claims(self, claims: dict) -> dict:
+        return {name: self.pseudonym(value) if name in _PII_CLAIMS else value for name, value in claims.items()}
+
+    def authorizer(self, authorizer: dict) -> dict:
+        authorizer = dict(authorizer)
+
+        if isinstance(authorizer.get('claims'), dict):
+            authorizer['claims'] = self.claims(authorizer['claims'])
+
+        if isinstance(authorizer.get('jwt'), dict) and isinstance(authorizer['jwt'].get('claims'), dict):
+            authorizer['jwt'] = dict(authorizer['jwt'], claims=self.claims(authorizer['jwt']['claims']))
+
+        if isinstance(authorizer.get('lambda'), dict):
+            # a Lambda authorizer's context can hold anything
+            authorizer['lambda'] = {name: self.pseudonym(value) for name, value in authorizer['lambda'].items()}
+
+        if 'principalId' in authorizer:
+            authorizer['principalId'] = self.pseudonym(authorizer['principalId'])
+
+        return authorizer
+
+    def event(self, event: dict, redact_body: bool = False) -> dict:
+        event = dict(event)
+
+        if event.get('headers'):
+            event['headers'] = {name: self.header(name, value) for name, value in event['headers'].items()}
+
+        if event.get('multiValueHeaders'):
+            event['multiValueHeaders'] = {name: [self.header(name, value) for value in values]
+                                          for name, values in event['multiValueHeaders'].items()}
+
+        if event.get('cookies'):
+            event['cookies'] = [self.cookie(cookie) for cookie in event['cookies']]
+
+        request_context = event.get('requestContext')
+
+        if request_context:
+            request_context = event['requestContext'] = dict(request_context)
+
+            if request_context.get('identity'):
+                identity = dict(request_context['identity'])
+
+                for name in _IDENTITY_FIELDS.intersection(identity):
+                    identity[name] = self.pseudonym(identity[name])
+
+                identity['sourceIp'] = self.ip(identity.get('sourceIp'))
+                request_context['identity'] = identity
+
+            if request_context.get('http'):
+                request_context['http'] = dict(request_context['http'],
+                                               sourceIp=self.ip(request_context['http'].get('sourceIp')))
+
+            if request_context.get('authorizer'):
+                request_context['authorizer'] = self.authorizer(request_context['authorizer'])
+
+        if redact_body:
+            event['body'] = None
+            event['isBase64Encoded'] = False
+
+        return event
+
+
+def anonymize_event(event: dict, salt: str = '', redact_body: bool = False) -> dict:
+    """
+    Returns a copy of the event with credentials (Authorization, cookies, API keys), IP addresses, caller identity
+    and identifying claims replaced by stable pseudonyms. Only the parts that change are copied, the event passed in
+    isn't modified.
+
+    :param salt: keys the pseudonyms so they can't be reversed by hashing guesses, keep it secret and stable between
+                 recordings you want to correlate
+    :param redact_body: drop the request body as well
+    """
+    return _Anonymizer(salt).event(event, redact_body)
+
+
+class EventRecorder:
+    """
+    Records events to a JSON Lines file, one event per line, for replaying later with replay_events. Use it on a
+    handler (in a test or staging environment, or with a low sample_rate in production) to capture real traffic:
+
+        recorder = EventRecorder('/tmp/events.jsonl', salt=os.environ['RECORDING_SALT'], sample_rate=0.01)
+
+        @recorder
+        @lambda_proxy_response_wrapper()
+        def handler(event, context):
+            ...
+
+    Events are anonymized (see anonymize_event) before they're written unless anonymize=False.
+    """
+    def __init__(self, path: str, anonymize: bool = True, salt: str = '', redact_body: bool = False,
+                 sample_rate: float = 1.0):
+        self.path = path
+        self.redact_body = redact_body
+        self.sample_rate = sample_rate
+        self._anonymizer = _Anonymizer(salt) if anonymize else None
+        self._file = None
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f"EventRecorder(path={self.path!r}, sample_rate={self.sample_rate})"
+
+    def record(self, event: dict):
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return
+
+        if self._anonymizer is not None:
+            event = self._anonymizer.event(event, self.redact_body)
+        elif self.redact_body:
+            event = dict(event, body=None, isBase64Encoded=False)
+
+        line = json.dumps(event, separators=(',', ':'), default=str) + '\n'
+
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, 'a', encoding='utf-8')
+
+            # flushed every time, a Lambda container can be frozen (or never thawed) after any invocation
+            self._file.write(line)
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __call__(self, handler):
+        from functools import wraps
+
+        @wraps(handler)
+        def recording_handler(event, context):
+            self.record(event)
+            return handler(event, context)
+
+        return recording_handler
+
+
+def load_events(path: str) -> list:
+    """
+    :return: list of the events recorded in a JSON Lines file
+    """
+    with open(path, encoding='utf-8') as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+
+def replay_events(path: str, repeat: int = 1):
+    """
+    Yields recorded events in order, repeat times over (None to loop forever). The file is read and parsed once,
+    each event yielded is a copy of the recorded one (top level and headers, the rest is shared) so handlers that
+    modify them don't affect later repeats.
+
+    :return: generator of events
+    """
+    events = load_events(path)
+    replayed = 0
+
+    while events and (repeat is None or replayed < repeat):
+        for event in events:
+            copy = dict(event)
+
+            if event.get('headers'):
+                copy['headers'] = dict(event['headers'])
+
+            yield copy
+
+        replayed += 1
@@ -0,0 +1,186 @@
+from collections import namedtuple
+
+from .lambda_errors import ValidationError
+
+# type: str, int, float, bool, dict or list
+# items: Field for the items of a list
+# schema: dict of name -> Field for the properties of a nested object
+# choices: the allowed values
+Field = namedtuple('Field', ['type', 'required', 'minimum', 'maximum', 'min_length', 'max_length', 'items', 'schema',
+                             'choices'],
+                   defaults=(True, None, None, None, None, None, None, None))
+
+# type -> (expression that's true if the value is the wrong type, name used in error messages). Exact type checks
+# are faster than isinstance and keep bools (a subclass of int) out of the numeric types
+_TYPE_CHECKS = {
+    str: ("type({v}) is not str", 'a string'),
+    int: ("type({v}) is not int", 'an integer'),
+    float: ("type({v}) is not float and type({v}) is not int", 'a number'),
+    bool: ("type({v}) is not bool", 'a boolean'),
+    dict: ("type({v}) is not dict", 'an object'),
+    list: ("type({v}) is not list", 'a list'),
+}
+
+
+class _SchemaCompiler:
+    """
+    Generates the source of a single flat validation function for a schema, nested objects and lists included.
+    Constants (limits, choices) are bound as globals of the generated function.
+
+    Paths of values (for error messages) are f-string templates, e.g. "tags[{v4}]", so they're only formatted when
+    there's an error to report.
+    """
+    def __init__(self):
+        self.namespace = {}
+        self.lines = []
+        self.counter = 0
+
+    def constant(self, value) -> str:
+        name = f"_c{len(self.namespace)}"
+        self.namespace[name] = value
+        return name
+
+    def variable(self) -> str:
+        self.counter += 1
+        return f"v{self.counter}"
+
+    def emit(self, indent: int, line: str):
+        self.lines.append('    ' * indent + line)
+
+    def error(self, indent: int, path: str, message: str):
+        """
+        :param path: f-string template of the path of the value
+        """
+        self.emit(indent, f"errors.append(f{path + ': ' + _escape(message)!r})")
+
+    def compile_object(self, schema: dict, var: str, path, indent: int, allow_extra: bool):
+        """
+        :param path: template of the object's path, None for the body itself
+        """
+        for name, field in schema.items():
+            if not isinstance(field, Field):
+                raise TypeError(f"Schema property '{name}' must be a Field")
+
+            value = self.variable()
+            field_path = _escape(name) if path is None else f"{path}.{_escape(name)}"
+
+            self.emit(indent, f"{value} = {var}.get({name!r})")
+            self.emit(indent, f"if {value} is None:")
+
+            if field.required:
+                self.error(indent + 1, field_path, "is required")
+            else:
+                self.emit(indent + 1, "pass")
+
+            self.emit(indent, "else:")
+            self.compile_field(field, value, field_path, indent + 1, allow_extra)
+
+        if not allow_extra:
+            known = self.constant(frozenset(schema))
+            key = self.variable()
+            key_path = f"{{{key}}}" if path is None else f"{path}.{{{key}}}"
+
+            self.emit(indent, f"for {key} in {var}:")
+            self.emit(indent + 1, f"if {key} not in {known}:")
+            self.error(indent + 2, key_path, "is not allowed")
+
+    def compile_field(self, field: Field, var: str, path: str, indent: int, allow_extra: bool):
+        if field.type not in _TYPE_CHECKS:
+            raise TypeError(f"Unsupported field type {field.type!r}")
+
+        check, type_name = _TYPE_CHECKS[field.type]
+
+        self.emit(indent, f"if {check.format(v=var)}:")
+        self.error(indent + 1, path, f"must be {type_name}")
+        self.emit(indent, "else:")
+
+        start = len(self.lines)
+        indent += 1
+
+        if field.choices is not None:
+            choices = self.constant(frozenset(field.choices))
+            self.emit(indent, f"if {var} not in {choices}:")
+            self.error(indent + 1, path, f"must be one of {', '.join(sorted(map(str, field.choices)))}")
+
+        if field.minimum is not None:
+            self.emit(indent, f"if {var} < {self.constant(field.minimum)}:")
+            self.error(indent + 1, path, f"must be at least {field.minimum}")
+
+        if field.maximum is not None:
+            self.emit(indent, f"if {var} > {self.constant(field.maximum)}:")
+            self.error(indent + 1, path, f"must be at most {field.maximum}")
+
+        if field.min_length is not None:
+            self.emit(indent, f"if len({var}) < {self.constant(field.min_length)}:")
+            self.error(indent + 1, path, f"must have a length of at least {field.min_length}")
+
+        if field.max_length is not None:
+            self.emit(indent, f"if len({var}) > {self.constant(field.max_length)}:")
+            self.error(indent + 1, path, f"must have a length of at most {field.max_length}")
+
+        if field.type is dict and field.schema is not None:
+            self.compile_object(field.schema, var, path, indent, allow_extra)
+
+        if field.type is list and field.items is not None:
+            index = self.variable()
+            item = self.variable()
+            item_path = f"{path}[{{{index}}}]"
+
+            self.emit(indent, f"for {index}, {item} in enumerate({var}):")
+            self.emit(indent + 1, f"if {item} is None:")
+            self.error(indent + 2, item_path, "is required")
+            self.emit(indent + 1, "else:")
+            self.compile_field(field.items, item, item_path, indent + 2, allow_extra)
+
+        if len(self.lines) == start:
+            self.emit(indent, "pass")
+
+
+def _escape(text) -> str:
+    """
+    Escapes text for use in the literal part of an f-string
+    """
+    return str(text).replace('{', '{{').replace('}', '}}')
+
+
+def compile_schema(schema: dict, allow_extra: bool = True):
+    """
+    Compiles a body schema into a validation function. Do this once, at module level, the generated function is a
+    straight run of checks with no schema interpretation left to do per request:
+
+        CREATE_ITEM = compile_schema({
+            'name': Field(str, min_length=1, max_length=100),
+            'price': Field(float, minimum=0),
+            'tags': Field(list, required=False, max_length=10, items=Field(str, max_length=20)),
+            'dimensions': Field(dict, required=False, schema={'width': Field(int), 'height': Field(int)}),
+        })
+
+        body = CREATE_ITEM(ep.event_body)  # or ep.validate_body(CREATE_ITEM)
+
+    Fields are required unless required=False, a null value counts as missing. minimum/maximum apply to numbers
+    (and anything comparable), min_length/max_length to strings and lists.
+
+    :param schema: dict of property name -> Field
+    :param allow_extra: allow properties that aren't in the schema
+    :return: function that takes the decoded body and returns it, raising a ValidationError listing every failure
+    """
+    compiler = _SchemaCompiler()
+
+    compiler.emit(0, "def validate(body):")
+    compiler.emit(1, "errors = []")
+    compiler.emit(1, "if type(body) is not dict:")
+    compiler.emit(2, "raise ValidationError('Validation failed: body must be an object', ['body: must be an object'])")
+    compiler.compile_object(schema, 'body', None, 1, allow_extra)
+    compiler.emit(1, "if errors:")
+    compiler.emit(2, "raise ValidationError('Validation failed: ' + '; '.join(errors), errors)")
+    compiler.emit(1, "return body")
+
+    namespace = dict(compiler.namespace, ValidationError=ValidationError)
+    source = '\n'.join(compiler.lines)
+
+    exec(compile(source, '<body schema>', 'exec'), namespace)
+
+    validate = namespace['validate']
+    validate.source = source
+
+    return validate
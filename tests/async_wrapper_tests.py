@@ -0,0 +1,53 @@
+import json
+import asyncio
+
+from lambda_proxy_helpers_pkg.constants import HttpStatusCodes
+from lambda_proxy_helpers_pkg.lambda_errors import NotFoundError
+from lambda_proxy_helpers_pkg.lambda_proxy_response_wrapper import (lambda_proxy_response_wrapper,
+                                                                    FunctionResponse,
+                                                                    get_event_loop)
+
+
+def test_async_handler():
+    @lambda_proxy_response_wrapper()
+    async def handler(event, context):
+        results = await asyncio.gather(asyncio.sleep(0, result='db'), asyncio.sleep(0, result='cache'))
+        return FunctionResponse(status_code=HttpStatusCodes.OK, payload={"results": results}, url=None)
+
+    resp = handler({}, None)
+
+    assert resp['statusCode'] == HttpStatusCodes.OK
+    assert json.loads(resp['body']) == {"results": ["db", "cache"]}
+
+
+def test_event_loop_persists():
+    loops = []
+
+    @lambda_proxy_response_wrapper()
+    async def handler(event, context):
+        loops.append(asyncio.get_running_loop())
+        return FunctionResponse(status_code=HttpStatusCodes.OK, payload=None, url=None)
+
+    handler({}, None)
+    handler({}, None)
+
+    assert loops[0] is loops[1] is get_event_loop()
+    assert not loops[0].is_closed()
+
+
+def test_async_errors_are_mapped():
+    @lambda_proxy_response_wrapper()
+    async def not_found(event, context):
+        raise NotFoundError("Item not found")
+
+    @lambda_proxy_response_wrapper()
+    async def unhandled(event, context):
+        await asyncio.sleep(0)
+        return 1 / 0
+
+    resp = not_found({}, None)
+    assert resp['statusCode'] == HttpStatusCodes.NOT_FOUND
+    assert json.loads(resp['body'])['errorType'] == 'Not Found Error'
+
+    resp = unhandled({}, None)
+    assert resp['statusCode'] == HttpStatusCodes.INTERNAL_SERVER_ERROR
@@ -0,0 +1,104 @@
+import json
+import asyncio
+import threading
+
+from lambda_proxy_helpers_pkg.constants import HttpStatusCodes
+from lambda_proxy_helpers_pkg.batch_wrapper import lambda_batch_wrapper
+from lambda_proxy_helpers_pkg.event_parser import EventParser
+from lambda_proxy_helpers_pkg.lambda_errors import ValidationError
+from lambda_proxy_helpers_pkg.lambda_proxy_response_wrapper import FunctionResponse
+from lambda_proxy_helpers_pkg.test_proxy_event import get_test_proxy_event
+
+
+def make_sqs_event(bodies):
+    return {
+        "Records": [{"messageId": f"msg-{i}",
+                     "eventSource": "aws:sqs",
+                     "body": json.dumps(get_test_proxy_event(http_method='POST', resource='/items', body=body))}
+                    for i, body in enumerate(bodies)]
+    }
+
+
+def process(event, context):
+    value = EventParser(event).get_body_prop('value')
+
+    if value == 'invalid':
+        raise ValidationError("Invalid value")
+
+    if value == 'boom':
+        raise RuntimeError("Unexpected failure")
+
+    return FunctionResponse(status_code=HttpStatusCodes.OK, payload={"value": value}, url=None)
+
+
+def test_sqs_batch_partial_failures():
+    handler = lambda_batch_wrapper(max_workers=4)(process)
+
+    resp = handler(make_sqs_event([{"value": "a"}, {"value": "invalid"}, {"value": "boom"}, {"value": "b"}]), None)
+
+    assert resp['batchItemFailures'] == [{"itemIdentifier": "msg-2"}]
+    assert [r['itemIdentifier'] for r in resp['results']] == ['msg-0', 'msg-1', 'msg-2', 'msg-3']
+    assert [r['statusCode'] for r in resp['results']] == [200, 400, 500, 200]
+    assert json.loads(resp['results'][3]['body']) == {"value": "b"}
+
+
+def test_malformed_sqs_bodies_fail_only_their_item():
+    event = make_sqs_event([{"value": "a"}, {"value": "b"}])
+    event['Records'].insert(1, {"messageId": "msg-bad", "eventSource": "aws:sqs", "body": "not json"})
+
+    for max_workers in (1, 4):
+        handler = lambda_batch_wrapper(max_workers=max_workers, failure_status=HttpStatusCodes.BAD_REQUEST)(process)
+        resp = handler(event, None)
+
+        assert resp['batchItemFailures'] == [{"itemIdentifier": "msg-bad"}]
+        assert [r['statusCode'] for r in resp['results']] == [200, 400, 200]
+        assert json.loads(resp['results'][1]['body'])['errorType'] == 'Invalid Function Request Error'
+
+    # client errors aren't retried by default
+    assert lambda_batch_wrapper()(process)(event, None)['batchItemFailures'] == []
+
+
+def test_malformed_sqs_bodies_async():
+    @lambda_batch_wrapper(failure_status=HttpStatusCodes.BAD_REQUEST)
+    async def handler(event, context):
+        return process(event, context)
+
+    event = make_sqs_event([{"value": "a"}])
+    event['Records'].append({"messageId": "msg-bad", "eventSource": "aws:sqs", "body": "{\"value\": "})
+
+    resp = handler(event, None)
+
+    assert resp['batchItemFailures'] == [{"itemIdentifier": "msg-bad"}]
+    assert [r['statusCode'] for r in resp['results']] == [200, 400]
+
+
+def test_items_run_concurrently():
+    barrier = threading.Barrier(3, timeout=5)
+
+    @lambda_batch_wrapper(max_workers=3)
+    def handler(event, context):
+        barrier.wait()
+        return FunctionResponse(status_code=HttpStatusCodes.OK, payload=None, url=None)
+
+    resp = handler([{}, {}, {}], None)
+
+    assert resp['batchItemFailures'] == []
+    assert [r['itemIdentifier'] for r in resp['results']] == ['0', '1', '2']
+
+
+def test_async_batch():
+    in_flight = []
+    peak = []
+
+    @lambda_batch_wrapper(max_workers=2, failure_status=HttpStatusCodes.BAD_REQUEST)
+    async def handler(event, context):
+        in_flight.append(1)
+        peak.append(len(in_flight))
+        await asyncio.sleep(0.01)
+        in_flight.pop()
+        return process(event, context)
+
+    resp = handler(make_sqs_event([{"value": "a"}, {"value": "invalid"}, {"value": "c"}, {"value": "d"}]), None)
+
+    assert max(peak) == 2
+    assert resp['batchItemFailures'] == [{"itemIdentifier": "msg-1"}]
@@ -0,0 +1,59 @@
+import io
+import json
+import base64
+
+import pytest
+
+from lambda_proxy_helpers_pkg.event_parser import EventParser
+from lambda_proxy_helpers_pkg.lambda_proxy_response import LambdaProxyResponse
+from lambda_proxy_helpers_pkg.lambda_proxy_response_wrapper import lambda_proxy_response_wrapper, FunctionResponse
+from lambda_proxy_helpers_pkg.test_proxy_event import get_test_proxy_event
+
+PNG_BYTES = b'\x89PNG\r\n\x1a\n' + bytes(range(256))
+
+
+@pytest.mark.parametrize('payload', [PNG_BYTES,
+                                     bytearray(PNG_BYTES),
+                                     memoryview(PNG_BYTES),
+                                     io.BytesIO(PNG_BYTES)])
+def test_binary_payload(payload):
+    resp = LambdaProxyResponse(status=200, payload=payload, content_type='image/png').make_response()
+
+    assert resp['isBase64Encoded']
+    assert resp['headers']['Content-Type'] == 'image/png'
+    assert base64.b64decode(resp['body']) == PNG_BYTES
+
+
+def test_file_payload(tmp_path):
+    path = tmp_path / 'test.pdf'
+    path.write_bytes(PNG_BYTES)
+
+    with open(path, 'rb') as f:
+        resp = LambdaProxyResponse(status=200, payload=f).make_response()
+
+    assert resp['headers']['Content-Type'] == 'application/octet-stream'
+    assert base64.b64decode(resp['body']) == PNG_BYTES
+
+
+def test_wrapper_binary_response():
+    @lambda_proxy_response_wrapper()
+    def handler(event, context):
+        return FunctionResponse(status_code=200, payload=PNG_BYTES, url=None, content_type='image/png')
+
+    resp = handler({}, None)
+
+    assert resp['isBase64Encoded']
+    assert resp['headers']['Content-Type'] == 'image/png'
+    assert base64.b64decode(resp['body']) == PNG_BYTES
+
+
+def test_base64_request_body():
+    event = get_test_proxy_event(http_method='POST', resource='/test', path='/test')
+    event['body'] = base64.b64encode(json.dumps({"foo": "bar"}).encode('utf-8')).decode('ascii')
+    event['isBase64Encoded'] = True
+
+    event_parser = EventParser(event)
+
+    assert event_parser.get_body_props('foo') == {"foo": "bar"}
+    assert event_parser.get_body_prop('foo') == 'bar'
+    assert event_parser.raw_body == b'{"foo": "bar"}'
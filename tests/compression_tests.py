@@ -0,0 +1,80 @@
+import gzip
+import json
+import zlib
+import base64
+
+from lambda_proxy_helpers_pkg.compression import CompressionPolicy, parse_accept_encoding
+from lambda_proxy_helpers_pkg.event_parser import EventParser
+from lambda_proxy_helpers_pkg.lambda_proxy_response import LambdaProxyResponse
+from lambda_proxy_helpers_pkg.lambda_proxy_response_wrapper import lambda_proxy_response_wrapper, FunctionResponse
+from lambda_proxy_helpers_pkg.test_proxy_event import get_test_proxy_event
+
+LARGE_PAYLOAD = {"items": [{"id": i, "name": f"item {i}"} for i in range(200)]}
+
+
+def test_parse_accept_encoding():
+    assert parse_accept_encoding("gzip, br;q=0.9, *;q=0") == {"gzip": 1.0, "br": 0.9, "*": 0.0}
+    assert parse_accept_encoding(None) == {}
+
+
+def test_event_parser_accepted_encodings():
+    event = get_test_proxy_event(http_method='GET', resource='/test', path='/test')
+
+    assert EventParser(event).accepted_encodings == {"gzip": 1.0, "deflate": 1.0, "br": 1.0}
+
+
+def test_choose_encoding():
+    policy = CompressionPolicy(encodings=('gzip', 'deflate'))
+
+    assert policy.choose_encoding("deflate, gzip") == 'gzip'
+    assert policy.choose_encoding("deflate, gzip;q=0.5") == 'deflate'
+    assert policy.choose_encoding("gzip;q=0, deflate;q=0") is None
+    assert policy.choose_encoding("*") == 'gzip'
+    assert policy.choose_encoding("identity") is None
+
+
+def test_gzip_response():
+    resp = LambdaProxyResponse(status=200,
+                               payload=LARGE_PAYLOAD,
+                               compression=CompressionPolicy(encodings=('gzip',)),
+                               accept_encoding='gzip').make_response()
+
+    assert resp['isBase64Encoded']
+    assert resp['headers']['Content-Encoding'] == 'gzip'
+    assert resp['headers']['Vary'] == 'Accept-Encoding'
+    assert json.loads(gzip.decompress(base64.b64decode(resp['body']))) == LARGE_PAYLOAD
+
+
+def test_deflate_response():
+    resp = LambdaProxyResponse(status=200,
+                               payload=LARGE_PAYLOAD,
+                               compression=CompressionPolicy(encodings=('deflate',), level=1),
+                               accept_encoding='deflate').make_response()
+
+    assert resp['headers']['Content-Encoding'] == 'deflate'
+    assert json.loads(zlib.decompress(base64.b64decode(resp['body']))) == LARGE_PAYLOAD
+
+
+def test_small_body_not_compressed():
+    resp = LambdaProxyResponse(status=200,
+                               payload={"foo": "bar"},
+                               compression=CompressionPolicy(min_size=1024),
+                               accept_encoding='gzip').make_response()
+
+    assert 'Content-Encoding' not in resp['headers']
+    assert resp['headers']['Vary'] == 'Accept-Encoding'
+    assert json.loads(resp['body']) == {"foo": "bar"}
+
+
+def test_wrapper_compression():
+    event = get_test_proxy_event(http_method='GET', resource='/test', path='/test')
+    event['headers']['Accept-Encoding'] = 'gzip'
+
+    @lambda_proxy_response_wrapper(compression=CompressionPolicy())
+    def handler(event, context):
+        return FunctionResponse(status_code=200, payload=LARGE_PAYLOAD, url=None)
+
+    resp = handler(event, None)
+
+    assert resp['headers']['Content-Encoding'] == 'gzip'
+    assert json.loads(gzip.decompress(base64.b64decode(resp['body']))) == LARGE_PAYLOAD
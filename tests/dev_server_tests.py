@@ -0,0 +1,234 @@
+import json
+import time
+import asyncio
+import http.client
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from lambda_proxy_helpers_pkg.constants import HttpMethods, HttpStatusCodes
+from lambda_proxy_helpers_pkg.dev_server import DevServer, ResourceMatcher, response_to_http
+from lambda_proxy_helpers_pkg.event_formats import HTTP_API, ALB
+from lambda_proxy_helpers_pkg.event_parser import EventParser
+from lambda_proxy_helpers_pkg.lambda_proxy_response_wrapper import lambda_proxy_response_wrapper, FunctionResponse
+from lambda_proxy_helpers_pkg.router import Router
+from lambda_proxy_helpers_pkg.test_proxy_event import CognitoDetail
+
+router = Router()
+
+
+@router.route(HttpMethods.GET, '/items/{itemId}')
+def get_item(event, context):
+    ep = EventParser(event)
+    ep.validate_event_auth()
+    return FunctionResponse(status_code=HttpStatusCodes.OK,
+                            payload={"id": ep.get_path_param('itemId'), "user": ep.user_id,
+                                     "tags": ep.get_query_param_values('tag'), "requestId": context.aws_request_id},
+                            url=None)
+
+
+@router.route(HttpMethods.POST, '/items')
+def create_item(event, context):
+    ep = EventParser(event)
+    return FunctionResponse(status_code=HttpStatusCodes.CREATED, payload=ep.event_body, url='/items/1',
+                            cookies=['session=abc', 'theme=dark'])
+
+
+@router.route(HttpMethods.GET, '/items/{itemId}/image')
+def get_image(event, context):
+    return FunctionResponse(status_code=HttpStatusCodes.OK, payload=b'\x89PNG\x00\xff', url=None,
+                            content_type='image/png')
+
+
+@lambda_proxy_response_wrapper()
+def echo_handler(event, context):
+    ep = EventParser(event)
+    return FunctionResponse(status_code=HttpStatusCodes.OK,
+                            payload={"path": ep.path, "resource": ep.resource_path, "format": ep.event_format.name,
+                                     "size": len(ep.raw_body or b'')},
+                            url=None)
+
+
+@lambda_proxy_response_wrapper()
+async def async_handler(event, context):
+    await asyncio.sleep(0.05)
+    return FunctionResponse(status_code=HttpStatusCodes.OK, payload={"path": EventParser(event).path}, url=None)
+
+
+def request(server, method, path, body=None, headers=None):
+    host, port = server.server_address
+    connection = http.client.HTTPConnection(host, port, timeout=10)
+
+    try:
+        connection.request(method, path, body=body, headers=headers or {})
+        response = connection.getresponse()
+        return response.status, response.getheaders(), response.read()
+    finally:
+        connection.close()
+
+
+@pytest.fixture()
+def server():
+    def claims(headers):
+        user = headers.get('X-User')
+        return {"sub": user, "custom:account_id": "account-1"} if user else None
+
+    with DevServer(router, port=0, claims=claims, workers=4) as server:
+        yield server
+
+
+def test_resource_matcher():
+    matcher = ResourceMatcher(['/items', '/items/{itemId}', '/items/{itemId}/image', '/files/{proxy+}'])
+
+    assert matcher.match('/items') == ('/items', None)
+    assert matcher.match('/items/') == ('/items', None)
+    assert matcher.match('/items/abc') == ('/items/{itemId}', {"itemId": "abc"})
+    assert matcher.match('/items/abc/image') == ('/items/{itemId}/image', {"itemId": "abc"})
+    assert matcher.match('/files/a/b.txt') == ('/files/{proxy+}', {"proxy": "a/b.txt"})
+    assert matcher.match('/nothing') == ('/nothing', None)
+
+
+def test_get_with_claims_and_query(server):
+    status, headers, body = request(server, 'GET', '/items/abc?tag=a&tag=b', headers={'X-User': 'user-1'})
+
+    assert status == HttpStatusCodes.OK
+    body = json.loads(body)
+    assert body['id'] == 'abc' and body['user'] == 'user-1' and body['tags'] == ['a', 'b']
+    assert body['requestId'].startswith('local-')
+
+
+def test_wrapper_errors_are_mapped(server):
+    status, _, _ = request(server, 'GET', '/items/abc')
+
+    assert status == HttpStatusCodes.BAD_REQUEST
+
+    status, headers, _ = request(server, 'DELETE', '/items/abc')
+
+    assert status == HttpStatusCodes.METHOD_NOT_ALLOWED
+    assert dict(headers)['Allow'] == 'GET, HEAD, OPTIONS'
+
+    status, _, _ = request(server, 'GET', '/unknown')
+
+    assert status == HttpStatusCodes.NOT_FOUND
+
+
+def test_post_with_cookies(server):
+    status, headers, body = request(server, 'POST', '/items', body=json.dumps({"name": "thing"}),
+                                    headers={'Content-Type': 'application/json'})
+
+    assert status == HttpStatusCodes.CREATED
+    assert json.loads(body) == {"name": "thing"}
+    assert [value for name, value in headers if name == 'Set-Cookie'] == ['session=abc', 'theme=dark']
+    assert dict(headers)['Location'] == '/items/1'
+
+
+def test_binary_response(server):
+    status, headers, body = request(server, 'GET', '/items/abc/image', headers={'X-User': 'user-1'})
+
+    assert status == HttpStatusCodes.OK
+    assert body == b'\x89PNG\x00\xff'
+    assert dict(headers)['Content-Type'] == 'image/png'
+
+
+def test_head(server):
+    status, headers, body = request(server, 'HEAD', '/items/abc', headers={'X-User': 'user-1'})
+
+    assert status == HttpStatusCodes.OK
+    assert body == b''
+
+
+@pytest.mark.parametrize('event_format', [HTTP_API, ALB])
+def test_event_formats(event_format):
+    with DevServer(echo_handler, port=0, event_format=event_format, resources=['/things/{thingId}']) as server:
+        status, _, body = request(server, 'POST', '/things/1', body=b'\x00\xff binary')
+
+    assert status == HttpStatusCodes.OK
+    assert json.loads(body) == {"path": "/things/1",
+                                "resource": '/things/{thingId}' if event_format == HTTP_API else '/things/1',
+                                "format": event_format, "size": 9}
+
+
+def test_cognito_detail_claims():
+    detail = CognitoDetail('user-2', 'me@example.com', 'account-2', True)
+
+    with DevServer(router, port=0, claims=detail) as server:
+        _, _, body = request(server, 'GET', '/items/abc')
+
+    assert json.loads(body)['user'] == 'user-2'
+
+
+def test_unwrapped_handler_errors():
+    def broken(event, context):
+        raise RuntimeError('not wrapped')
+
+    with DevServer(broken, port=0) as server:
+        status, _, _ = request(server, 'GET', '/')
+
+    assert status == 502
+
+
+def test_response_to_http():
+    status, headers, body = response_to_http({"statusCode": 200, "headers": {"X-A": "1"}, "cookies": ["a=1"],
+                                              "multiValueHeaders": {"X-B": ["2", "3"]},
+                                              "body": "aGk=", "isBase64Encoded": True})
+
+    assert status == 200
+    assert headers == [("X-A", "1"), ("X-B", "2"), ("X-B", "3"), ("Set-Cookie", "a=1")]
+    assert body == b'hi'
+
+
+def test_handler_in_processes():
+    with DevServer('dev_server_tests:echo_handler', port=0, processes=2) as server:
+        status, _, body = request(server, 'GET', '/anything')
+
+    assert status == HttpStatusCodes.OK
+    assert json.loads(body)['path'] == '/anything'
+
+
+def test_concurrent_async_handlers():
+    with DevServer(async_handler, port=0, workers=4) as server:
+        with ThreadPoolExecutor(max_workers=4) as clients:
+            results = list(clients.map(lambda i: request(server, 'GET', f'/things/{i}'), range(8)))
+
+    assert [status for status, _, _ in results] == [HttpStatusCodes.OK] * 8
+    assert [json.loads(body)['path'] for _, _, body in results] == [f'/things/{i}' for i in range(8)]
+
+
+def test_idle_connections_are_closed():
+    with DevServer(echo_handler, port=0, workers=2, keep_alive_timeout=0.2) as server:
+        host, port = server.server_address
+        idle = [http.client.HTTPConnection(host, port, timeout=10) for _ in range(2)]
+
+        try:
+            # two keep-alive connections take both workers, the third request is served once they're closed
+            for connection in idle:
+                connection.request('GET', '/idle')
+                connection.getresponse().read()
+
+            started = time.monotonic()
+            status, _, _ = request(server, 'GET', '/third')
+
+            assert status == HttpStatusCodes.OK
+            assert time.monotonic() - started < 5
+        finally:
+            for connection in idle:
+                connection.close()
+
+
+def test_shutdown_closes_open_connections():
+    server = DevServer(echo_handler, port=0, workers=1, keep_alive_timeout=60)
+    server.start()
+    host, port = server.server_address
+    connection = http.client.HTTPConnection(host, port, timeout=10)
+
+    try:
+        connection.request('GET', '/open')
+        connection.getresponse().read()
+
+        server.shutdown()
+        started = time.monotonic()
+        server.executor.shutdown(wait=True)
+
+        assert time.monotonic() - started < 5
+    finally:
+        connection.close()
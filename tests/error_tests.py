@@ -1,5 +1,11 @@
+import json
+
 from lambda_proxy_helpers_pkg.lambda_proxy_response_wrapper import handle_exception
-from lambda_proxy_helpers_pkg.lambda_errors import (NotFoundError,
+from lambda_proxy_helpers_pkg.lambda_proxy_response import LambdaProxyResponse
+from lambda_proxy_helpers_pkg.lambda_errors import (LambdaProxyError,
+                                                    register_error,
+                                                    unregister_error,
+                                                    NotFoundError,
                                                     MissingParameterError,
                                                     InvalidParameterError,
                                                     InvalidFunctionRequestError,
@@ -99,3 +105,56 @@ def test_general_error():
 
     assert status == HttpStatusCodes.INTERNAL_SERVER_ERROR
     assert message == error_message
+
+
+def test_error_subclass_is_matched():
+    class ItemNotFoundError(NotFoundError):
+        pass
+
+    status, message, error_type = handle_exception(ItemNotFoundError("Item 123 not found"))
+
+    assert status == HttpStatusCodes.NOT_FOUND
+    assert message == "Item 123 not found"
+    assert error_type == 'Not Found Error'
+
+
+def test_custom_error_class():
+    class ConflictError(LambdaProxyError):
+        status_code = 409
+        error_type = 'Conflict Error'
+        default_message = 'The resource was modified by another request'
+
+    status, message, error_type = handle_exception(ConflictError())
+
+    assert status == 409
+    assert message == 'The resource was modified by another request'
+    assert error_type == 'Conflict Error'
+
+
+def test_register_error():
+    class ThirdPartyTimeout(Exception):
+        pass
+
+    assert handle_exception(ThirdPartyTimeout("timed out"))[0] == HttpStatusCodes.INTERNAL_SERVER_ERROR
+
+    register_error(ThirdPartyTimeout, 504, 'Gateway Timeout')
+
+    try:
+        assert handle_exception(ThirdPartyTimeout("timed out")) == (504, "timed out", 'Gateway Timeout')
+    finally:
+        unregister_error(ThirdPartyTimeout)
+
+
+def test_unhandled_error():
+    status, message, error_type = handle_exception(KeyError('foo'))
+
+    assert status == HttpStatusCodes.INTERNAL_SERVER_ERROR
+    assert 'unhandled exception' in message
+
+
+def test_error_body_is_reused():
+    first = LambdaProxyResponse(status=400, error='Invalid', error_type='Validation Error').make_response()
+    second = LambdaProxyResponse(status=400, error='Invalid', error_type='Validation Error').make_response()
+
+    assert first['body'] is second['body']
+    assert json.loads(first['body']) == {"error": "Invalid", "errorType": "Validation Error"}
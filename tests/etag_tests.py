@@ -0,0 +1,142 @@
+import json
+
+from lambda_proxy_helpers_pkg.compression import CompressionPolicy
+from lambda_proxy_helpers_pkg.constants import HttpStatusCodes
+from lambda_proxy_helpers_pkg.etag import make_etag, format_etag, parse_if_none_match, etag_matches
+from lambda_proxy_helpers_pkg.event_parser import EventParser
+from lambda_proxy_helpers_pkg.lambda_proxy_response import LambdaProxyResponse
+from lambda_proxy_helpers_pkg.lambda_proxy_response_wrapper import lambda_proxy_response_wrapper, FunctionResponse
+from lambda_proxy_helpers_pkg.response_cache import ResponseCache
+from lambda_proxy_helpers_pkg.test_proxy_event import get_test_proxy_event
+
+PAYLOAD = {"items": [{"id": i} for i in range(3)]}
+
+
+def make_event(method='GET', if_none_match=None):
+    event = get_test_proxy_event(http_method=method, resource='/items', path='/items')
+
+    if if_none_match:
+        event['headers']['if-none-match'] = if_none_match
+
+    return event
+
+
+def test_make_etag():
+    body = json.dumps(PAYLOAD)
+
+    assert make_etag(body) == make_etag(body.encode('utf-8'))
+    assert make_etag(body) != make_etag(body + ' ')
+    assert make_etag(body).startswith('"') and len(make_etag(body)) == 34
+
+
+def test_format_etag():
+    assert format_etag(42) == '"42"'
+    assert format_etag('"abc"') == '"abc"'
+    assert format_etag('W/"abc"') == 'W/"abc"'
+
+
+def test_if_none_match():
+    assert parse_if_none_match(None) == frozenset()
+    assert parse_if_none_match('"a", W/"b",  "c-gzip"') == {'a', 'b', 'c'}
+
+    assert etag_matches('"a", "b"', '"b"')
+    assert etag_matches('W/"b"', '"b"')
+    assert etag_matches('*', '"b"')
+    assert not etag_matches('"a"', '"b"')
+    assert not etag_matches(None, '"b"')
+
+    assert EventParser(make_event(if_none_match='"a", "b"')).if_none_match == {'a', 'b'}
+    assert EventParser(make_event()).if_none_match == frozenset()
+
+
+def test_generated_etag():
+    resp = LambdaProxyResponse(payload=PAYLOAD, generate_etag=True).make_response()
+    etag = resp['headers']['ETag']
+
+    assert etag == make_etag(resp['body'])
+
+    resp = LambdaProxyResponse(payload=PAYLOAD, generate_etag=True, if_none_match=etag).make_response()
+
+    assert resp['statusCode'] == HttpStatusCodes.NOT_MODIFIED
+    assert resp['headers']['ETag'] == etag
+    assert 'body' not in resp
+
+
+def test_no_etag_for_errors_or_by_default():
+    resp = LambdaProxyResponse(status=404, error='Not found', error_type='Not Found Error',
+                               generate_etag=True).make_response()
+
+    assert 'ETag' not in resp['headers']
+    assert 'ETag' not in LambdaProxyResponse(payload=PAYLOAD).make_response()['headers']
+
+
+def test_compressed_etag():
+    compression = CompressionPolicy(min_size=0)
+    resp = LambdaProxyResponse(payload=PAYLOAD, generate_etag=True, compression=compression,
+                               accept_encoding='gzip').make_response()
+    etag = resp['headers']['ETag']
+
+    assert resp['headers']['Content-Encoding'] == 'gzip'
+    assert etag.endswith('-gzip"')
+
+    resp = LambdaProxyResponse(payload=PAYLOAD, generate_etag=True, compression=compression,
+                               accept_encoding='gzip', if_none_match=etag).make_response()
+
+    assert resp['statusCode'] == HttpStatusCodes.NOT_MODIFIED
+    assert 'Content-Encoding' not in resp['headers']
+
+
+def test_wrapper_generated_etag():
+    @lambda_proxy_response_wrapper(etag=True)
+    def handler(event, context):
+        return FunctionResponse(status_code=HttpStatusCodes.OK, payload=PAYLOAD, url=None)
+
+    resp = handler(make_event(), None)
+    etag = resp['headers']['ETag']
+
+    assert resp['statusCode'] == HttpStatusCodes.OK
+    assert handler(make_event(if_none_match=etag), None)['statusCode'] == HttpStatusCodes.NOT_MODIFIED
+    assert handler(make_event(if_none_match='"other"'), None)['statusCode'] == HttpStatusCodes.OK
+
+    # conditional requests only apply to GET and HEAD
+    assert handler(make_event(method='PUT', if_none_match=etag), None)['statusCode'] == HttpStatusCodes.OK
+
+
+def test_wrapper_precomputed_etag_skips_building_the_payload():
+    built = []
+
+    def build_payload():
+        built.append(1)
+        return PAYLOAD
+
+    @lambda_proxy_response_wrapper()
+    def handler(event, context):
+        return FunctionResponse(status_code=HttpStatusCodes.OK, payload=build_payload, url=None, etag=7)
+
+    resp = handler(make_event(if_none_match='"7"'), None)
+
+    assert resp['statusCode'] == HttpStatusCodes.NOT_MODIFIED
+    assert resp['headers']['ETag'] == '"7"'
+    assert not built
+
+    resp = handler(make_event(if_none_match='"6"'), None)
+
+    assert resp['statusCode'] == HttpStatusCodes.OK
+    assert resp['headers']['ETag'] == '"7"'
+    assert json.loads(resp['body']) == PAYLOAD
+    assert built == [1]
+
+
+def test_wrapper_cached_response_not_modified():
+    calls = []
+
+    @lambda_proxy_response_wrapper(etag=True, cache=ResponseCache())
+    def handler(event, context):
+        calls.append(1)
+        return FunctionResponse(status_code=HttpStatusCodes.OK, payload=PAYLOAD, url=None)
+
+    etag = handler(make_event(), None)['headers']['ETag']
+    resp = handler(make_event(if_none_match=etag), None)
+
+    assert resp['statusCode'] == HttpStatusCodes.NOT_MODIFIED
+    assert len(calls) == 1
@@ -0,0 +1,195 @@
+import json
+
+import pytest
+
+from lambda_proxy_helpers_pkg.constants import HttpMethods, HttpStatusCodes
+from lambda_proxy_helpers_pkg.event_formats import detect_format, REST_API, HTTP_API, FUNCTION_URL, ALB
+from lambda_proxy_helpers_pkg.event_parser import EventParser
+from lambda_proxy_helpers_pkg.lambda_proxy_response_wrapper import lambda_proxy_response_wrapper, FunctionResponse
+from lambda_proxy_helpers_pkg.params import Param
+from lambda_proxy_helpers_pkg.router import Router
+from lambda_proxy_helpers_pkg.test_proxy_event import get_test_proxy_event, EventFactory
+
+
+def make_http_api_event(method='GET', route='/items/{itemId}', path='/items/abc', query=None, body=None,
+                        domain='abc123.execute-api.ap-southeast-2.amazonaws.com'):
+    event = {
+        "version": "2.0",
+        "routeKey": f"{method} {route}" if route else "$default",
+        "rawPath": path,
+        "rawQueryString": "",
+        "headers": {"content-type": "application/json", "origin": "https://example.com"},
+        "queryStringParameters": query,
+        "pathParameters": {"itemId": "abc"} if route and '{itemId}' in route else None,
+        "requestContext": {
+            "domainName": domain,
+            "http": {"method": method, "path": path},
+            "authorizer": {"jwt": {"claims": {"sub": "user-1", "custom:account_id": "account-1",
+                                              "custom:account_created": "2026-01-01"}}},
+        },
+        "isBase64Encoded": False,
+    }
+
+    # body is left out of requests without one
+    if body is not None:
+        event["body"] = json.dumps(body)
+
+    return event
+
+
+def make_alb_event(method='GET', path='/items', query=None, multi_value=False):
+    event = {
+        "requestContext": {"elb": {"targetGroupArn": "arn:aws:elasticloadbalancing:target-group"}},
+        "httpMethod": method,
+        "path": path,
+        "body": "",
+        "isBase64Encoded": False,
+    }
+
+    if multi_value:
+        event["multiValueHeaders"] = {"accept": ["application/json"], "x-forwarded-for": ["1.1.1.1", "2.2.2.2"]}
+        event["multiValueQueryStringParameters"] = {name: [value] for name, value in (query or {}).items()}
+    else:
+        event["headers"] = {"accept": "application/json"}
+        event["queryStringParameters"] = query or {}
+
+    return event
+
+
+@pytest.mark.parametrize('event, name', [
+    (get_test_proxy_event(), REST_API),
+    (make_http_api_event(), HTTP_API),
+    (make_http_api_event(domain='abc123.lambda-url.ap-southeast-2.on.aws', route=None), FUNCTION_URL),
+    (make_alb_event(), ALB),
+])
+def test_detect_format(event, name):
+    assert detect_format(event).name == name
+    assert EventParser(event).event_format.name == name
+
+
+def test_http_api_event():
+    ep = EventParser(make_http_api_event(query={"status": "draft,live", "limit": "5"}))
+
+    assert ep.method == HttpMethods.GET
+    assert ep.resource_path == '/items/{itemId}'
+    assert ep.path == '/items/abc'
+    assert ep.get_path_param('itemId') == 'abc'
+    assert ep.get_query_param('limit', Param(int)) == 5
+    assert ep.get_query_param_values('status') == ['draft', 'live']
+    assert ep.get_header('Origin') == 'https://example.com'
+
+    ep.validate_event_auth(requires_account_id=True)
+
+    assert (ep.user_id, ep.account_id) == ('user-1', 'account-1')
+
+
+@pytest.mark.parametrize('event_format', [HTTP_API, FUNCTION_URL])
+def test_v2_get_without_body(event_format):
+    event = EventFactory(event_format).make(http_method='GET', resource='/items', path='/items')
+
+    assert 'body' not in event
+
+    ep = EventParser(event)
+
+    assert ep.event_body is None
+    assert ep.get_body_prop('name') is None
+    assert ep.get_body_props('name', 'size') == {"name": None, "size": None}
+
+    @lambda_proxy_response_wrapper()
+    def handler(event, context):
+        return FunctionResponse(status_code=HttpStatusCodes.OK, payload={"body": EventParser(event).event_body},
+                                url=None)
+
+    resp = handler(event, None)
+
+    assert resp['statusCode'] == HttpStatusCodes.OK
+    assert json.loads(resp['body']) == {"body": None}
+
+
+def test_http_api_default_route_uses_path():
+    assert EventParser(make_http_api_event(route=None, path='/anything')).resource_path == '/anything'
+
+
+def test_alb_event():
+    ep = EventParser(make_alb_event(path='/items', query={"q": "red%20shoes", "tag": "a+b"}))
+
+    assert ep.resource_path == '/items'
+    assert ep.path_params is None
+    assert ep.get_query_param('q') == 'red shoes'
+    assert ep.get_query_param('tag') == 'a b'
+
+
+def test_alb_multi_value_event():
+    ep = EventParser(make_alb_event(query={"q": "red%20shoes"}, multi_value=True))
+
+    assert ep.get_header('X-Forwarded-For') == '2.2.2.2'
+    assert ep.get_query_param('q') == 'red shoes'
+    assert ep.get_query_param_values('q') == ['red shoes']
+
+
+@lambda_proxy_response_wrapper()
+def cookie_handler(event, context):
+    return FunctionResponse(status_code=HttpStatusCodes.OK, payload={"ok": True}, url=None,
+                            cookies=['session=abc; HttpOnly', 'theme=dark'])
+
+
+def test_rest_api_response_cookies():
+    resp = cookie_handler(get_test_proxy_event(http_method='GET'), None)
+
+    assert resp['multiValueHeaders'] == {'Set-Cookie': ['session=abc; HttpOnly', 'theme=dark']}
+
+
+def test_http_api_response():
+    resp = cookie_handler(make_http_api_event(), None)
+
+    assert resp['cookies'] == ['session=abc; HttpOnly', 'theme=dark']
+    assert 'multiValueHeaders' not in resp
+    assert json.loads(resp['body']) == {"ok": True}
+
+
+def test_alb_response():
+    resp = cookie_handler(make_alb_event(), None)
+
+    assert resp['statusDescription'] == '200 OK'
+    assert resp['isBase64Encoded'] is False
+    assert resp['headers']['Set-Cookie'] == 'session=abc; HttpOnly'
+    assert all(isinstance(value, str) for value in resp['headers'].values())
+
+    resp = cookie_handler(make_alb_event(multi_value=True), None)
+
+    assert 'headers' not in resp
+    assert resp['multiValueHeaders']['Set-Cookie'] == ['session=abc; HttpOnly', 'theme=dark']
+    assert resp['multiValueHeaders']['Content-Type'] == ['application/json']
+    assert all(isinstance(value, str) for values in resp['multiValueHeaders'].values() for value in values)
+
+
+def test_router_with_http_api_events():
+    router = Router()
+
+    @router.route(HttpMethods.GET, '/items/{itemId}')
+    def get_item(event, context):
+        item_id = EventParser(event).get_path_param('itemId')
+        return FunctionResponse(status_code=HttpStatusCodes.OK, payload={"id": item_id}, url=None)
+
+    resp = router(make_http_api_event(), None)
+
+    assert json.loads(resp['body']) == {"id": "abc"}
+
+    resp = router(make_http_api_event(method='DELETE'), None)
+
+    assert resp['statusCode'] == HttpStatusCodes.METHOD_NOT_ALLOWED
+    assert resp['headers']['Allow'] == 'GET, HEAD, OPTIONS'
+
+
+def test_router_with_alb_events():
+    router = Router()
+
+    @router.route(HttpMethods.GET, '/items')
+    def list_items(event, context):
+        return FunctionResponse(status_code=HttpStatusCodes.OK, payload=[], url=None)
+
+    resp = router(make_alb_event(method='POST', multi_value=True), None)
+
+    assert resp['statusCode'] == HttpStatusCodes.METHOD_NOT_ALLOWED
+    assert resp['statusDescription'] == '405 Method Not Allowed'
+    assert resp['multiValueHeaders']['Allow'] == ['GET, HEAD, OPTIONS']
@@ -1,6 +1,8 @@
+import json
+
 import pytest
 
-from lambda_proxy_helpers_pkg.lambda_errors import InvalidUserError, MissingParameterError
+from lambda_proxy_helpers_pkg.lambda_errors import InvalidUserError, MissingParameterError, PayloadTooLargeError
 from lambda_proxy_helpers_pkg.test_proxy_event import get_test_proxy_event, CognitoDetail
 from lambda_proxy_helpers_pkg.event_parser import EventParser
 
@@ -168,3 +170,84 @@ def test_get_path_param_missing():
         event_parser.get_path_param('testId')
 
     assert 'testId not found' in e.value.message
+
+
+def test_body_is_decoded_lazily():
+    test_event = get_test_proxy_event(http_method='POST',
+                                      resource='/test',
+                                      body={"foo": "bar"},
+                                      path='/test')
+    test_event['body'] = '{"foo": "bar", invalid json'
+
+    event_parser = EventParser(event=test_event)
+    assert event_parser.method == 'POST'
+
+    with pytest.raises(ValueError):
+        event_parser.get_body_prop('foo')
+
+
+def test_body_exceeds_max_size():
+    test_event = get_test_proxy_event(http_method='POST',
+                                      resource='/test',
+                                      body={"foo": "x" * 100},
+                                      path='/test')
+
+    event_parser = EventParser(event=test_event, max_body_size=50)
+
+    with pytest.raises(PayloadTooLargeError) as e:
+        event_parser.get_body_prop('foo')
+
+    assert e.value.status_code == 413
+
+
+def test_get_body_props():
+    body = {
+        "skipped": {"nested": ["a", {"b": "}]{["}, 1.5e3, None, True], "s": "quote \" inside"},
+        "foo": "bar",
+        "other": [1, 2, 3],
+        "count": 12
+    }
+    test_event = get_test_proxy_event(http_method='POST',
+                                      resource='/test',
+                                      body=body,
+                                      path='/test')
+
+    event_parser = EventParser(event=test_event)
+    assert event_parser.get_body_props('foo', 'count', 'missing') == {"foo": "bar", "count": 12, "missing": None}
+
+
+def make_raw_body_event(raw_body):
+    test_event = get_test_proxy_event(http_method='POST', resource='/test', path='/test')
+    test_event['body'] = raw_body
+    return test_event
+
+
+@pytest.mark.parametrize('raw_body', ['{"role": "user", "role": "admin"}',
+                                      '{"role": "user", "a": {"b": 1}, "role": "admin", "c": 2}',
+                                      '{"role": "user", "other": [1, "]"], "c": 2, "role": "admin"}'])
+def test_get_body_props_duplicate_keys(raw_body):
+    # the last one wins, the same as json.loads, whichever accessor is used
+    assert EventParser(make_raw_body_event(raw_body)).get_body_props('role') == {"role": "admin"}
+    assert EventParser(make_raw_body_event(raw_body)).get_body_props('role', 'c')['role'] == 'admin'
+    assert EventParser(make_raw_body_event(raw_body)).get_body_prop('role') == 'admin'
+
+
+@pytest.mark.parametrize('raw_body', ['{"a": 1, "b": [1, 2, }',
+                                      '{"b": [1, 2}, "a": 1}',
+                                      '{"b": tru, "a": 1}',
+                                      '{"b": "unterminated, "a": 1}',
+                                      '{"a": 1, "b": 2,}',
+                                      '{"a": 1} trailing'])
+def test_get_body_props_malformed(raw_body):
+    with pytest.raises(json.JSONDecodeError):
+        EventParser(make_raw_body_event(raw_body)).get_body_props('a')
+
+
+def test_get_body_props_not_an_object():
+    test_event = get_test_proxy_event(http_method='POST',
+                                      resource='/test',
+                                      body=[1, 2, 3],
+                                      path='/test')
+
+    event_parser = EventParser(event=test_event)
+    assert event_parser.get_body_props('foo') == {"foo": None}
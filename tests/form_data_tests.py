@@ -0,0 +1,149 @@
+import gzip
+import json
+import zlib
+import base64
+
+import pytest
+
+from lambda_proxy_helpers_pkg.event_parser import EventParser
+from lambda_proxy_helpers_pkg.form_data import parse_header_params, iter_multipart
+from lambda_proxy_helpers_pkg.lambda_errors import ValidationError, PayloadTooLargeError
+from lambda_proxy_helpers_pkg.test_proxy_event import get_test_proxy_event
+
+BOUNDARY = '----WebKitFormBoundary7MA4YWxkTrZu0gW'
+FILE_DATA = bytes(range(256)) * 4
+
+
+def make_event(body, content_type=None, content_encoding=None, base64_encode=True):
+    event = get_test_proxy_event()
+
+    if isinstance(body, str):
+        body = body.encode('utf-8')
+
+    event['body'] = base64.b64encode(body).decode('ascii') if base64_encode else body.decode('utf-8')
+    event['isBase64Encoded'] = base64_encode
+
+    if content_type:
+        event['headers']['content-type'] = content_type
+
+    if content_encoding:
+        event['headers']['Content-Encoding'] = content_encoding
+
+    return event
+
+
+def multipart_body():
+    return (f'--{BOUNDARY}\r\n'
+            f'Content-Disposition: form-data; name="title"\r\n\r\n'
+            f'Holiday été\r\n'
+            f'--{BOUNDARY}\r\n'
+            f'Content-Disposition: form-data; name="tag"\r\n\r\n'
+            f'a\r\n'
+            f'--{BOUNDARY}\r\n'
+            f'Content-Disposition: form-data; name="tag"\r\n\r\n'
+            f'b\r\n'
+            f'--{BOUNDARY}\r\n'
+            f'Content-Disposition: form-data; name="photo"; filename="photo.jpg"\r\n'
+            f'Content-Type: image/jpeg\r\n\r\n').encode('utf-8') + FILE_DATA + f'\r\n--{BOUNDARY}--\r\n'.encode()
+
+
+def test_header_index_is_case_insensitive():
+    event = get_test_proxy_event()
+    event['headers']['X-Custom-HEADER'] = 'value'
+    ep = EventParser(event)
+
+    assert ep.get_header('x-custom-header') == 'value'
+    assert ep.get_header('USER-AGENT') == 'Custom User Agent'
+    assert ep.get_header('missing') is None
+
+    event['headers'] = None
+
+    assert EventParser(event).get_header('Host') is None
+
+
+def test_slots():
+    ep = EventParser(get_test_proxy_event())
+
+    assert not hasattr(ep, '__dict__')
+
+    with pytest.raises(AttributeError):
+        ep.something = 1
+
+
+def test_parse_header_params():
+    assert parse_header_params('multipart/form-data; boundary="abc def"') == ('multipart/form-data',
+                                                                               {'boundary': 'abc def'})
+    assert parse_header_params('Form-Data; name=field; filename="a \\"b\\".txt"') == \
+        ('form-data', {'name': 'field', 'filename': 'a "b".txt'})
+    assert parse_header_params(None) == ('', {})
+
+
+def test_form_urlencoded():
+    for base64_encode in (True, False):
+        event = make_event('name=Widget+One&tag=a&tag=b&empty=&note=caf%C3%A9',
+                           'application/x-www-form-urlencoded; charset=utf-8', base64_encode=base64_encode)
+        ep = EventParser(event)
+
+        assert ep.content_type == 'application/x-www-form-urlencoded'
+        assert ep.form == {"name": "Widget One", "tag": ["a", "b"], "empty": "", "note": "café"}
+
+
+def test_multipart():
+    ep = EventParser(make_event(multipart_body(), f'multipart/form-data; boundary={BOUNDARY}'))
+    form = ep.form
+
+    assert form['title'] == 'Holiday été'
+    assert form['tag'] == ['a', 'b']
+    assert form['photo'].filename == 'photo.jpg'
+    assert form['photo'].content_type == 'image/jpeg'
+    assert form['photo'].data == FILE_DATA
+
+    # the file data is a view over the decoded body, not a copy
+    assert isinstance(form['photo'].data, memoryview)
+    assert form['photo'].data.obj is ep.raw_body
+
+
+def test_iter_multipart():
+    ep = EventParser(make_event(multipart_body(), f'multipart/form-data; boundary="{BOUNDARY}"'))
+
+    assert [part.name for part in ep.iter_multipart()] == ['title', 'tag', 'tag', 'photo']
+
+
+@pytest.mark.parametrize('body', [
+    b'no boundary here',
+    f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="a"\r\n\r\nunterminated'.encode(),
+    f'--{BOUNDARY}garbage'.encode(),
+])
+def test_malformed_multipart(body):
+    with pytest.raises(ValidationError):
+        list(iter_multipart(body, BOUNDARY))
+
+
+def test_form_requires_form_content_type():
+    with pytest.raises(ValidationError):
+        EventParser(make_event('{"a": 1}', 'application/json')).form
+
+    with pytest.raises(ValidationError):
+        EventParser(make_event('{"a": 1}', 'application/json')).iter_multipart()
+
+
+@pytest.mark.parametrize('encoding, compress', [
+    ('gzip', gzip.compress),
+    ('deflate', zlib.compress),
+])
+def test_compressed_request_body(encoding, compress):
+    body = {"items": list(range(100))}
+    ep = EventParser(make_event(compress(json.dumps(body).encode()), 'application/json', encoding))
+
+    assert ep.event_body == body
+    assert ep.get_body_props('items') == body
+
+
+def test_compressed_request_body_limits():
+    compressed = gzip.compress(b' ' * 100000)
+
+    with pytest.raises(PayloadTooLargeError):
+        EventParser(make_event(compressed, content_encoding='gzip'), max_body_size=10000).raw_body
+
+    with pytest.raises(ValidationError):
+        EventParser(make_event(b'not gzip', content_encoding='gzip')).raw_body
@@ -0,0 +1,70 @@
+from lambda_proxy_helpers_pkg.header_policy import HeaderPolicy, DEFAULT_HEADER_POLICY
+from lambda_proxy_helpers_pkg.lambda_proxy_response import LambdaProxyResponse
+from lambda_proxy_helpers_pkg.lambda_proxy_response_wrapper import lambda_proxy_response_wrapper, FunctionResponse
+from lambda_proxy_helpers_pkg.test_proxy_event import get_test_proxy_event
+
+
+def test_default_policy_headers():
+    resp = LambdaProxyResponse(status=200, payload={"foo": "bar"}).make_response()
+
+    assert resp['headers'] == {
+        "Content-Type": 'application/json',
+        "Access-Control-Allow-Origin": '*',
+        'Access-Control-Allow-Methods': '*',
+        'Access-Control-Allow-Headers': '*',
+        "Access-Control-Allow-Credentials": True
+    }
+
+
+def test_response_headers_are_copies():
+    resp = LambdaProxyResponse(status=201, location='http://localhost/new').make_response()
+
+    assert resp['headers']['Location'] == 'http://localhost/new'
+    assert 'Location' not in DEFAULT_HEADER_POLICY.headers
+
+
+def test_configured_policy():
+    policy = HeaderPolicy(allowed_origins=['https://app.example.com'],
+                          allowed_methods=['GET', 'POST'],
+                          allowed_headers=['Authorization', 'Content-Type'],
+                          allow_credentials=False,
+                          max_age=600,
+                          cache_control='no-store',
+                          extra_headers={'Strict-Transport-Security': 'max-age=63072000'})
+
+    headers = policy.build_headers('https://app.example.com')
+
+    assert headers['Access-Control-Allow-Origin'] == 'https://app.example.com'
+    assert headers['Access-Control-Allow-Methods'] == 'GET, POST'
+    assert headers['Access-Control-Allow-Headers'] == 'Authorization, Content-Type'
+    assert headers['Access-Control-Max-Age'] == '600'
+    assert headers['Cache-Control'] == 'no-store'
+    assert headers['Strict-Transport-Security'] == 'max-age=63072000'
+    assert headers['Vary'] == 'Origin'
+    assert 'Access-Control-Allow-Credentials' not in headers
+
+    assert 'Access-Control-Allow-Origin' not in policy.build_headers('https://evil.example.com')
+
+
+def test_single_values():
+    policy = HeaderPolicy(allowed_origins='https://app.example.com', allowed_methods='GET', allowed_headers='Accept')
+    headers = policy.build_headers('https://app.example.com')
+
+    assert policy.allowed_origins == frozenset(['https://app.example.com'])
+    assert headers['Access-Control-Allow-Origin'] == 'https://app.example.com'
+    assert headers['Access-Control-Allow-Methods'] == 'GET'
+    assert headers['Access-Control-Allow-Headers'] == 'Accept'
+    assert 'Access-Control-Allow-Origin' not in policy.build_headers('h')
+
+
+def test_wrapper_echoes_origin():
+    policy = HeaderPolicy(allowed_origins=['https://app.example.com'])
+    event = get_test_proxy_event(http_method='GET', resource='/test', path='/test')
+    event['headers']['origin'] = 'https://app.example.com'
+
+    @lambda_proxy_response_wrapper(header_policy=policy)
+    def handler(event, context):
+        return FunctionResponse(status_code=200, payload={"foo": "bar"}, url=None)
+
+    resp = handler(event, None)
+    assert resp['headers']['Access-Control-Allow-Origin'] == 'https://app.example.com'
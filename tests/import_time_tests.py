@@ -0,0 +1,75 @@
+import os
+import sys
+import subprocess
+
+import lambda_proxy_helpers_pkg
+
+# total import time (microseconds) allowed for the hot path modules, override with IMPORT_TIME_BUDGET_US
+IMPORT_TIME_BUDGET_US = int(os.environ.get('IMPORT_TIME_BUDGET_US', 50000))
+
+PACKAGE = 'lambda_proxy_helpers_pkg'
+HOT_PATH_IMPORT = (f"from {PACKAGE} import EventParser, LambdaProxyResponse, FunctionResponse;"
+                   f"from {PACKAGE}.lambda_proxy_response_wrapper import lambda_proxy_response_wrapper")
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_python(code, *flags):
+    return subprocess.run([sys.executable, *flags, '-c', code],
+                          cwd=PROJECT_ROOT, capture_output=True, text=True, check=True)
+
+
+def measure_import_time_us(code) -> int:
+    """
+    Sums the cumulative -X importtime figures of the top level imports made by code (i.e. everything
+    the import pulled in that the interpreter hadn't already loaded at startup).
+    """
+    output = run_python(code, '-X', 'importtime').stderr
+    total = 0
+    started = False
+
+    for line in output.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+
+        _, cumulative, name = line.split('|')
+
+        if name.strip().startswith(PACKAGE):
+            started = True
+
+        if started and not name[1:].startswith(' ') and cumulative.strip().isdigit():
+            total += int(cumulative)
+
+    return total
+
+
+def test_import_time_budget():
+    # best of three to smooth out noise from the machine running the tests
+    import_time = min(measure_import_time_us(HOT_PATH_IMPORT) for _ in range(3))
+
+    assert import_time <= IMPORT_TIME_BUDGET_US, \
+        f"Importing the hot path took {import_time}us, the budget is {IMPORT_TIME_BUDGET_US}us"
+
+
+def test_package_import_is_lazy():
+    code = (f"import sys, {PACKAGE};"
+            f"print(sorted(m for m in sys.modules if m.startswith('{PACKAGE}.')))")
+
+    assert run_python(code).stdout.strip() == '[]'
+
+
+def test_hot_path_avoids_heavy_modules():
+    code = f"import sys;{HOT_PATH_IMPORT};print(' '.join(sorted(sys.modules)))"
+    loaded = set(run_python(code).stdout.split())
+
+    for module in ('traceback', 'inspect', 'asyncio', 'uuid', 'decimal', 'concurrent.futures',
+                   f'{PACKAGE}.test_proxy_event'):
+        assert module not in loaded, f"{module} is imported on the hot path"
+
+
+def test_flat_api():
+    from lambda_proxy_helpers_pkg.event_parser import EventParser
+    from lambda_proxy_helpers_pkg.lambda_errors import NotFoundError
+
+    assert lambda_proxy_helpers_pkg.EventParser is EventParser
+    assert lambda_proxy_helpers_pkg.NotFoundError is NotFoundError
+    assert 'Router' in dir(lambda_proxy_helpers_pkg)
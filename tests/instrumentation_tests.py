@@ -0,0 +1,86 @@
+import io
+import json
+
+from lambda_proxy_helpers_pkg.event_parser import EventParser
+from lambda_proxy_helpers_pkg.instrumentation import Tracer, InMemoryExporter, EmfExporter, span
+from lambda_proxy_helpers_pkg.lambda_errors import NotFoundError
+from lambda_proxy_helpers_pkg.lambda_proxy_response_wrapper import lambda_proxy_response_wrapper, FunctionResponse
+from lambda_proxy_helpers_pkg.test_proxy_event import get_test_proxy_event, CognitoDetail
+
+
+def make_event():
+    return get_test_proxy_event(http_method='POST',
+                                resource='/items',
+                                path='/items',
+                                body={"name": "test"},
+                                cognito_detail=CognitoDetail(user_id='abc', email=None, account_id='123',
+                                                             account_created=True))
+
+
+def test_phase_spans():
+    exporter = InMemoryExporter()
+
+    @lambda_proxy_response_wrapper(tracer=Tracer(exporter))
+    def handler(event, context):
+        event_parser = EventParser(event)
+        event_parser.validate_event_auth()
+
+        with span('db'):
+            name = event_parser.get_body_prop('name')
+
+        return FunctionResponse(status_code=201, payload={"name": name}, url=None)
+
+    handler(make_event(), None)
+
+    spans, tags = exporter.invocations[0]
+
+    assert [s.name for s in spans] == ['auth', 'parse', 'db', 'handler', 'serialize', 'convert']
+    assert all(s.duration_ms >= 0 for s in spans)
+    assert tags == {"Method": "POST", "Resource": "/items", "StatusCode": 201}
+
+
+def test_error_status_tag():
+    exporter = InMemoryExporter()
+
+    @lambda_proxy_response_wrapper(tracer=Tracer(exporter))
+    def handler(event, context):
+        raise NotFoundError("Not here")
+
+    handler(make_event(), None)
+
+    assert exporter.invocations[0][1]['StatusCode'] == 404
+
+
+def test_sampling_disabled():
+    exporter = InMemoryExporter()
+
+    @lambda_proxy_response_wrapper(tracer=Tracer(exporter, sample_rate=0))
+    def handler(event, context):
+        with span('db'):
+            pass
+
+        return FunctionResponse(status_code=200, payload=None, url=None)
+
+    handler(make_event(), None)
+
+    assert exporter.invocations == []
+
+
+def test_emf_exporter():
+    stream = io.StringIO()
+
+    @lambda_proxy_response_wrapper(tracer=Tracer(EmfExporter(namespace='Test', stream=stream)))
+    def handler(event, context):
+        EventParser(event).event_body
+        return FunctionResponse(status_code=200, payload={"foo": "bar"}, url=None)
+
+    handler(make_event(), None)
+
+    record = json.loads(stream.getvalue())
+    metrics = record['_aws']['CloudWatchMetrics'][0]
+
+    assert metrics['Namespace'] == 'Test'
+    assert metrics['Dimensions'] == [['Method', 'Resource', 'StatusCode']]
+    assert {m['Name'] for m in metrics['Metrics']} == {'parse', 'handler', 'serialize', 'convert'}
+    assert record['Method'] == 'POST' and record['StatusCode'] == '200'
+    assert isinstance(record['handler'], float)
@@ -0,0 +1,109 @@
+import json
+from uuid import UUID
+from decimal import Decimal
+from datetime import datetime, date, timezone
+
+import pytest
+
+from lambda_proxy_helpers_pkg import json_backend
+from lambda_proxy_helpers_pkg.event_parser import EventParser
+from lambda_proxy_helpers_pkg.lambda_proxy_response import LambdaProxyResponse
+from lambda_proxy_helpers_pkg.test_proxy_event import get_test_proxy_event
+
+PAYLOAD = {
+    "int_decimal": Decimal('10'),
+    "big_int_decimal": Decimal('12345678901234567890123'),
+    "big_int": 2 ** 70,
+    "float_decimal": Decimal('3.14159265359'),
+    "negative_decimal": Decimal('-0.5'),
+    "naive_datetime": datetime(2020, 11, 6, 22, 21, 39),
+    "micro_datetime": datetime(2020, 11, 6, 22, 21, 39, 123456),
+    "aware_datetime": datetime(2020, 11, 6, 22, 21, 39, tzinfo=timezone.utc),
+    "date": date(2020, 11, 6),
+    "uuid": UUID('d0550a66-2c2d-11eb-8a9f-6b193de7ce54'),
+    "nested": [{"a": Decimal('1')}, (Decimal('2.5'), "é/x")],
+    "unicode": "café"
+}
+
+
+@pytest.fixture(params=['json', 'orjson', 'ujson'])
+def backend(request):
+    pytest.importorskip(request.param)
+    selected = json_backend.set_json_backend(request.param)
+    assert selected.name == request.param
+
+    yield selected
+
+    json_backend.set_json_backend('json')
+
+
+@pytest.fixture()
+def reference():
+    return json.loads(json_backend.get_backend('json').dumps(PAYLOAD))
+
+
+def test_encode_conformance(backend, reference):
+    result = json.loads(backend.dumps(PAYLOAD))
+
+    assert result == reference
+    assert isinstance(result['int_decimal'], int)
+    assert result['big_int_decimal'] == 12345678901234567890123
+    assert result['big_int'] == 2 ** 70
+    assert result['naive_datetime'] == '2020-11-06T22:21:39'
+    assert result['micro_datetime'] == '2020-11-06T22:21:39.123456'
+    assert result['aware_datetime'] == '2020-11-06T22:21:39+00:00'
+
+
+def test_decode_conformance(backend):
+    body = {"foo": "bar", "num": 1.5, "list": [1, None, True], "unicode": "café"}
+    event = get_test_proxy_event(http_method='POST', resource='/test', body=body, path='/test')
+
+    assert EventParser(event).event_body == body
+
+
+def test_make_response_uses_backend(backend, reference):
+    resp = LambdaProxyResponse(status=200, payload=PAYLOAD).make_response()
+
+    assert json.loads(resp['body']) == reference
+
+
+def test_missing_library_falls_back(monkeypatch):
+    def unavailable():
+        raise ImportError()
+
+    monkeypatch.setitem(json_backend.JSON_BACKENDS, 'orjson', unavailable)
+
+    assert json_backend.get_backend('orjson').name == 'json'
+
+
+def test_environment_selection(monkeypatch):
+    pytest.importorskip('orjson')
+    monkeypatch.setenv(json_backend.JSON_BACKEND_ENV, 'orjson')
+
+    try:
+        assert json_backend.set_json_backend().name == 'orjson'
+    finally:
+        monkeypatch.delenv(json_backend.JSON_BACKEND_ENV)
+        json_backend.set_json_backend()
+
+
+def test_custom_callables():
+    calls = []
+
+    def dumps(obj):
+        calls.append(obj)
+        return json.dumps(obj, default=str)
+
+    try:
+        json_backend.set_json_backend(dumps=dumps)
+        resp = LambdaProxyResponse(status=200, payload={"foo": "bar"}).make_response()
+    finally:
+        json_backend.set_json_backend('json')
+
+    assert calls == [{"foo": "bar"}]
+    assert json.loads(resp['body']) == {"foo": "bar"}
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        json_backend.get_backend('simplejsonish')
@@ -0,0 +1,88 @@
+import json
+from uuid import UUID
+from decimal import Decimal
+from datetime import datetime, date
+
+import pytest
+
+from lambda_proxy_helpers_pkg import json_encoder
+from lambda_proxy_helpers_pkg.lambda_proxy_response import LambdaProxyResponse
+
+
+def test_encodes_known_types():
+    payload = {
+        "int_decimal": Decimal('10'),
+        "float_decimal": Decimal('3.5'),
+        "datetime": datetime(2020, 11, 6, 22, 21, 39),
+        "date": date(2020, 11, 6),
+        "set": {1},
+        "tuple": (1, 2),
+        "bytes": b'hello',
+        "uuid": UUID('d0550a66-2c2d-11eb-8a9f-6b193de7ce54')
+    }
+
+    result = json.loads(json_encoder.dumps(payload))
+
+    assert result["int_decimal"] == 10 and isinstance(result["int_decimal"], int)
+    assert result["float_decimal"] == 3.5
+    assert result["datetime"] == '2020-11-06T22:21:39'
+    assert result["date"] == '2020-11-06'
+    assert result["set"] == [1]
+    assert result["tuple"] == [1, 2]
+    assert result["bytes"] == 'aGVsbG8='
+    assert result["uuid"] == 'd0550a66-2c2d-11eb-8a9f-6b193de7ce54'
+
+
+def test_payload_is_not_modified():
+    payload = {"items": [{"price": Decimal('1.25'), "created": datetime(2020, 1, 1)}]}
+
+    resp = LambdaProxyResponse(status=200, payload=payload).make_response()
+
+    assert json.loads(resp['body'])['items'][0]['price'] == 1.25
+    assert isinstance(payload['items'][0]['price'], Decimal)
+    assert isinstance(payload['items'][0]['created'], datetime)
+
+
+@pytest.mark.parametrize('payload, expected', [(({"a": 1},), [{"a": 1}]),
+                                               ({Decimal('2')}, [2]),
+                                               (frozenset(['x']), ['x'])])
+def test_tuple_and_set_payloads(payload, expected):
+    resp = LambdaProxyResponse(status=200, payload=payload).make_response()
+
+    assert json.loads(resp['body']) == expected
+
+
+class Money:
+    def __init__(self, cents):
+        self.cents = cents
+
+
+class Refund(Money):
+    pass
+
+
+@pytest.fixture()
+def money_encoder():
+    json_encoder.register_json_encoder(Money, lambda m: m.cents / 100)
+    yield
+    json_encoder.unregister_json_encoder(Money)
+
+
+def test_register_json_encoder(money_encoder):
+    assert json.loads(json_encoder.dumps([Money(150), Refund(25)])) == [1.5, 0.25]
+
+
+def test_unregister_json_encoder(money_encoder):
+    json_encoder.dumps(Refund(25))
+    json_encoder.unregister_json_encoder(Money)
+
+    assert Money not in json_encoder.JSON_TYPE_ENCODERS
+    assert Refund not in json_encoder._encoder_cache
+
+    with pytest.raises(TypeError):
+        json_encoder.dumps(Refund(25))
+
+
+def test_unknown_type_raises():
+    with pytest.raises(TypeError):
+        json_encoder.dumps({"obj": object()})
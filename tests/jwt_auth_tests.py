@@ -0,0 +1,190 @@
+import json
+import time
+import hmac
+import hashlib
+import secrets
+import binascii
+
+import pytest
+
+from lambda_proxy_helpers_pkg.event_parser import EventParser
+from lambda_proxy_helpers_pkg.jwt_auth import JwtVerifier, get_bearer_token
+from lambda_proxy_helpers_pkg.lambda_errors import InvalidUserError
+from lambda_proxy_helpers_pkg.test_proxy_event import get_test_proxy_event
+
+ISSUER = 'https://cognito-idp.us-west-2.amazonaws.com/us-west-2_abcdef'
+AUDIENCE = '1g31q8lvpfs0uqkqpravprhth5'
+SHA256_DIGEST_INFO = bytes.fromhex('3031300d060960864801650304020105000420')
+
+
+def b64url(data: bytes) -> str:
+    return binascii.b2a_base64(data, newline=False).decode('ascii').replace('+', '-').replace('/', '_').rstrip('=')
+
+
+def int_b64url(value: int) -> str:
+    return b64url(value.to_bytes((value.bit_length() + 7) // 8, 'big'))
+
+
+def is_probable_prime(n, rounds=20):
+    if n < 4:
+        return n in (2, 3)
+
+    d, r = n - 1, 0
+
+    while d % 2 == 0:
+        d, r = d // 2, r + 1
+
+    for _ in range(rounds):
+        x = pow(secrets.randbelow(n - 3) + 2, d, n)
+
+        if x in (1, n - 1):
+            continue
+
+        for _ in range(r - 1):
+            x = pow(x, 2, n)
+
+            if x == n - 1:
+                break
+        else:
+            return False
+
+    return True
+
+
+def generate_prime(bits):
+    while True:
+        candidate = secrets.randbits(bits) | (1 << (bits - 1)) | 1
+
+        if is_probable_prime(candidate):
+            return candidate
+
+
+@pytest.fixture(scope='module')
+def rsa_key():
+    e = 65537
+
+    while True:
+        p, q = generate_prime(512), generate_prime(512)
+        phi = (p - 1) * (q - 1)
+
+        if p != q and phi % e:
+            return p * q, e, pow(e, -1, phi)
+
+
+def sign_rs256(rsa_key, claims, kid='key-1'):
+    n, e, d = rsa_key
+    header = b64url(json.dumps({"alg": "RS256", "kid": kid, "typ": "JWT"}).encode())
+    payload = b64url(json.dumps(claims).encode())
+    signing_input = f"{header}.{payload}".encode('ascii')
+
+    key_length = (n.bit_length() + 7) // 8
+    digest_info = SHA256_DIGEST_INFO + hashlib.sha256(signing_input).digest()
+    encoded = b'\x00\x01' + b'\xff' * (key_length - len(digest_info) - 3) + b'\x00' + digest_info
+    signature = pow(int.from_bytes(encoded, 'big'), d, n).to_bytes(key_length, 'big')
+
+    return f"{header}.{payload}.{b64url(signature)}"
+
+
+def make_claims(**overrides):
+    claims = {
+        "sub": "user-123",
+        "aud": AUDIENCE,
+        "iss": ISSUER,
+        "token_use": "id",
+        "exp": int(time.time()) + 3600,
+        "custom:account_id": "account-456",
+        "custom:account_created": "Y"
+    }
+    claims.update(overrides)
+    return claims
+
+
+@pytest.fixture()
+def verifier(rsa_key, tmp_path):
+    n, e, _ = rsa_key
+    jwks_path = tmp_path / 'jwks.json'
+    jwks_path.write_text(json.dumps({"keys": [{"kty": "RSA", "kid": "key-1", "alg": "RS256", "use": "sig",
+                                               "n": int_b64url(n), "e": int_b64url(e)}]}))
+
+    return JwtVerifier(jwks_path=str(jwks_path), issuer=ISSUER, audience=AUDIENCE)
+
+
+def make_event(token):
+    event = get_test_proxy_event(http_method='GET', resource='/test', path='/test')
+    event['headers']['Authorization'] = f"Bearer {token}"
+    return event
+
+
+def test_validate_event_auth_with_verifier(rsa_key, verifier):
+    event_parser = EventParser(make_event(sign_rs256(rsa_key, make_claims())))
+    event_parser.validate_event_auth(requires_account_id=True, verifier=verifier)
+
+    assert event_parser.user_id == 'user-123'
+    assert event_parser.account_id == 'account-456'
+    assert event_parser.account_created == 'Y'
+
+
+def test_claims_are_cached(rsa_key, verifier):
+    token = sign_rs256(rsa_key, make_claims())
+
+    assert verifier.verify(token) is verifier.verify(token)
+
+
+def test_invalid_signature(rsa_key, verifier):
+    header, payload, signature = sign_rs256(rsa_key, make_claims()).split('.')
+    tampered = f"{header}.{b64url(json.dumps(make_claims(sub='admin')).encode())}.{signature}"
+
+    with pytest.raises(InvalidUserError) as e:
+        verifier.verify(tampered)
+
+    assert 'signature' in e.value.message
+
+
+@pytest.mark.parametrize('claims, reason', [(make_claims(exp=int(time.time()) - 10), 'expired'),
+                                            (make_claims(iss='https://evil.example.com'), 'issuer'),
+                                            (make_claims(aud='other-client'), 'audience')])
+def test_invalid_claims(rsa_key, verifier, claims, reason):
+    with pytest.raises(InvalidUserError) as e:
+        verifier.verify(sign_rs256(rsa_key, claims))
+
+    assert reason in e.value.message
+
+
+def test_unknown_kid(rsa_key, verifier):
+    with pytest.raises(InvalidUserError):
+        verifier.verify(sign_rs256(rsa_key, make_claims(), kid='rotated-key'))
+
+
+def test_missing_token(verifier):
+    event = get_test_proxy_event(http_method='GET', resource='/test', path='/test')
+    del event['headers']['Authorization']
+
+    with pytest.raises(InvalidUserError):
+        EventParser(event).validate_event_auth(verifier=verifier)
+
+
+def test_hs256():
+    secret = secrets.token_bytes(32)
+    header = b64url(json.dumps({"alg": "HS256", "kid": "shared"}).encode())
+    payload = b64url(json.dumps(make_claims()).encode())
+    signature = hmac.new(secret, f"{header}.{payload}".encode(), hashlib.sha256).digest()
+
+    verifier = JwtVerifier(jwks={"keys": [{"kty": "oct", "kid": "shared", "k": b64url(secret)}]},
+                           algorithms=('HS256',), audience=AUDIENCE)
+
+    assert verifier.verify(f"{header}.{payload}.{b64url(signature)}")['sub'] == 'user-123'
+
+
+def test_algorithm_not_allowed(rsa_key, verifier):
+    header = b64url(json.dumps({"alg": "none", "kid": "key-1"}).encode())
+    payload = b64url(json.dumps(make_claims()).encode())
+
+    with pytest.raises(InvalidUserError):
+        verifier.verify(f"{header}.{payload}.")
+
+
+def test_get_bearer_token():
+    assert get_bearer_token('Bearer abc.def.ghi') == 'abc.def.ghi'
+    assert get_bearer_token('abc.def.ghi') == 'abc.def.ghi'
+    assert get_bearer_token('Basic dXNlcjpwYXNz') is None
+    assert get_bearer_token(None) is None
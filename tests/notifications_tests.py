@@ -0,0 +1,260 @@
+import json
+import time
+import threading
+
+import pytest
+
+from lambda_proxy_helpers_pkg import notifications
+from lambda_proxy_helpers_pkg.constants import HttpStatusCodes
+from lambda_proxy_helpers_pkg.lambda_errors import NotFoundError
+from lambda_proxy_helpers_pkg.lambda_proxy_response_wrapper import lambda_proxy_response_wrapper
+from lambda_proxy_helpers_pkg.notifications import ErrorNotifier, MemorySink, FileSink, SnsSink, \
+    exception_signature, format_notifications
+from lambda_proxy_helpers_pkg.test_proxy_event import get_test_proxy_event
+
+
+def raise_key_error():
+    return {}['missing']
+
+
+def raise_value_error():
+    raise ValueError('bad value')
+
+
+def catch(func):
+    try:
+        func()
+    except Exception as e:
+        return e
+
+
+class SlowSink(MemorySink):
+    def __init__(self, delay):
+        super().__init__()
+        self.delay = delay
+
+    def send(self, notifications):
+        time.sleep(self.delay)
+        super().send(notifications)
+
+
+class FakeSnsClient:
+    def __init__(self):
+        self.published = []
+
+    def publish(self, **kwargs):
+        self.published.append(kwargs)
+
+
+@pytest.fixture()
+def sink():
+    sink = MemorySink()
+    notifications.set_notifier(ErrorNotifier(sink, batch_interval=60))
+    yield sink
+    notifications.set_notifier(None)
+
+
+def test_signature():
+    first, second = catch(raise_key_error), catch(raise_key_error)
+
+    assert exception_signature(first) == exception_signature(second)
+    assert exception_signature(first).startswith('KeyError@notifications_tests.py:raise_key_error:')
+    assert exception_signature(first) != exception_signature(catch(raise_value_error))
+    assert exception_signature(ValueError('never raised')) == 'ValueError'
+
+
+def test_batches_and_dedupes():
+    sink = MemorySink()
+    notifier = ErrorNotifier(sink, batch_interval=60)
+
+    for _ in range(5):
+        notifier.notify(catch(raise_key_error))
+
+    notifier.notify(catch(raise_value_error))
+
+    assert notifier.flush(5)
+    assert len(sink.batches) == 1
+    assert [(n.error_type, n.count) for n in sink.notifications] == [('KeyError', 5), ('ValueError', 1)]
+    assert 'raise_key_error' in sink.notifications[0].traceback
+
+    # repeats within the window are only counted and reported with the next notification after it
+    notifier.notify(catch(raise_key_error))
+    notifier.notify(catch(raise_key_error))
+
+    assert notifier.pending == 0
+
+    notifier.dedupe_window = 0
+    notifier.notify(catch(raise_key_error))
+
+    assert notifier.flush(5)
+    assert sink.notifications[-1].count == 3
+
+
+def test_full_batch_is_sent_without_a_flush():
+    sink = MemorySink()
+    notifier = ErrorNotifier(sink, batch_size=2, batch_interval=60)
+
+    notifier.notify(catch(raise_key_error))
+    notifier.notify(catch(raise_value_error))
+
+    deadline = time.monotonic() + 5
+
+    while not sink.batches and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert len(sink.notifications) == 2
+
+
+def test_notify_does_not_block_and_flush_is_bounded():
+    notifier = ErrorNotifier(SlowSink(0.5), batch_interval=0)
+
+    started = time.perf_counter()
+    notifier.notify(catch(raise_key_error))
+
+    assert time.perf_counter() - started < 0.1
+
+    started = time.perf_counter()
+
+    assert not notifier.flush(0.05)
+    assert time.perf_counter() - started < 0.3
+    assert notifier.flush(5)
+
+
+def test_queue_limit():
+    notifier = ErrorNotifier(MemorySink(), max_queue=1, batch_interval=60)
+
+    notifier.notify(catch(raise_key_error))
+    notifier.notify(catch(raise_value_error))
+
+    assert notifier.dropped == 1
+
+
+def test_sink_errors_are_counted():
+    class BrokenSink:
+        def send(self, notifications):
+            raise RuntimeError('unreachable')
+
+    notifier = ErrorNotifier(BrokenSink())
+    notifier.notify(catch(raise_key_error))
+
+    assert notifier.flush(5)
+    assert notifier.failed == 1
+
+
+def test_unprintable_exceptions_are_still_sent():
+    class UnprintableError(Exception):
+        def __str__(self):
+            raise RuntimeError('no str for you')
+
+    def raise_unprintable():
+        raise UnprintableError()
+
+    sink = MemorySink()
+    notifier = ErrorNotifier(sink)
+    notifier.notify(catch(raise_unprintable))
+
+    assert notifier.flush(5)
+    assert sink.notifications[0].error_type == 'UnprintableError'
+    assert sink.notifications[0].message == 'UnprintableError()'
+
+    # the worker is still going
+    notifier.notify(catch(raise_value_error))
+
+    assert notifier.flush(5)
+    assert notifier.pending == 0
+    assert sink.notifications[1].message == 'bad value'
+
+
+def test_traceback_is_capped():
+    sink = MemorySink()
+    notifier = ErrorNotifier(sink, max_traceback=50)
+    notifier.notify(catch(raise_key_error))
+    notifier.flush(5)
+
+    assert len(sink.notifications[0].traceback) <= 55
+
+
+def test_file_sink(tmp_path):
+    path = str(tmp_path / 'errors.jsonl')
+    notifier = ErrorNotifier(FileSink(path))
+    notifier.notify(catch(raise_value_error))
+    notifier.flush(5)
+
+    with open(path) as file:
+        record = json.loads(file.readline())
+
+    assert record['error_type'] == 'ValueError' and record['message'] == 'bad value'
+
+
+def test_sns_sink(monkeypatch):
+    monkeypatch.setenv(notifications.ERROR_TOPIC_ARN_ENV, 'arn:aws:sns:us-east-1:123456789:errors')
+    client = FakeSnsClient()
+    notifier = ErrorNotifier(SnsSink(client=client))
+    notifier.source = 'my-function'
+    notifier.notify(catch(raise_value_error))
+    notifier.flush(5)
+
+    published = client.published[0]
+
+    assert published['TopicArn'] == 'arn:aws:sns:us-east-1:123456789:errors'
+    assert published['Subject'] == 'Unhandled errors: my-function'
+    assert 'ValueError: bad value' in published['Message']
+
+
+def test_sns_sink_requires_topic(monkeypatch):
+    monkeypatch.delenv(notifications.ERROR_TOPIC_ARN_ENV, raising=False)
+
+    with pytest.raises(ValueError):
+        SnsSink()
+
+
+def test_format_notifications():
+    notification = notifications.Notification('sig', 'KeyError', "'x'", 'Traceback...', 3, 0.0, 60.0, 'fn')
+    text = format_notifications([notification])
+
+    assert text.startswith('1 unhandled error(s) in fn')
+    assert 'Occurrences: 3 between 1970-01-01T00:00:00+00:00 and 1970-01-01T00:01:00+00:00' in text
+
+
+def test_wrapper_notifies_unhandled_errors_only(sink):
+    @lambda_proxy_response_wrapper()
+    def handler(event, context):
+        if event['path'] == '/missing':
+            raise NotFoundError('Not here')
+
+        raise_key_error()
+
+    assert handler(get_test_proxy_event(path='/missing'), None)['statusCode'] == HttpStatusCodes.NOT_FOUND
+    assert notifications.get_notifier().pending == 0
+
+    # the wrapper flushes before returning the 500, even though the batch interval hasn't passed
+    assert handler(get_test_proxy_event(path='/error'), None)['statusCode'] == HttpStatusCodes.INTERNAL_SERVER_ERROR
+    assert [n.error_type for n in sink.notifications] == ['KeyError']
+
+
+def test_notifier_from_environment(monkeypatch):
+    monkeypatch.setenv(notifications.ERROR_TOPIC_ARN_ENV, 'arn:aws:sns:us-east-1:123456789:errors')
+    monkeypatch.setattr(notifications, '_notifier', notifications._UNSET)
+
+    try:
+        notifier = notifications.get_notifier()
+        assert isinstance(notifier.sink, SnsSink)
+        assert notifications.get_notifier() is notifier
+    finally:
+        notifications.set_notifier(None)
+
+
+def test_concurrent_notify():
+    sink = MemorySink()
+    notifier = ErrorNotifier(sink, batch_interval=60)
+    errors = [catch(raise_key_error) for _ in range(100)]
+    threads = [threading.Thread(target=lambda: [notifier.notify(e) for e in errors]) for _ in range(4)]
+
+    for thread in threads:
+        thread.start()
+
+    for thread in threads:
+        thread.join()
+
+    assert notifier.flush(5)
+    assert sum(n.count for n in sink.notifications) == 400
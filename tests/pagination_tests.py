@@ -0,0 +1,144 @@
+import json
+from decimal import Decimal
+
+import pytest
+
+from lambda_proxy_helpers_pkg.constants import HttpStatusCodes
+from lambda_proxy_helpers_pkg.event_parser import EventParser
+from lambda_proxy_helpers_pkg.lambda_errors import InvalidParameterError, NotFoundError
+from lambda_proxy_helpers_pkg.lambda_proxy_response_wrapper import lambda_proxy_response_wrapper, FunctionResponse
+from lambda_proxy_helpers_pkg.pagination import Pagination, Paginated, encode_cursor, decode_cursor
+from lambda_proxy_helpers_pkg.test_proxy_event import get_test_proxy_event
+
+ITEMS = [{"id": i, "price": Decimal('1.5')} for i in range(10)]
+
+
+def make_event(cursor=None):
+    return get_test_proxy_event(http_method='GET', resource='/items', path='/items',
+                                query_string_params={"cursor": cursor} if cursor else None)
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor(1234)
+
+    assert '=' not in cursor
+    assert decode_cursor(cursor) == 1234
+    assert EventParser(make_event(cursor)).cursor_offset == 1234
+    assert EventParser(make_event()).cursor_offset == 0
+
+
+@pytest.mark.parametrize('cursor', ['not a cursor', encode_cursor(-1), 'eyJ4IjoxfQ'])
+def test_invalid_cursor(cursor):
+    with pytest.raises(InvalidParameterError):
+        decode_cursor(cursor)
+
+
+def test_max_items():
+    body, cursor = Pagination(max_items=4).paginate(ITEMS)
+
+    assert json.loads(body) == {"items": [{"id": i, "price": 1.5} for i in range(4)], "nextCursor": cursor}
+    assert decode_cursor(cursor) == 4
+
+    body, cursor = Pagination(max_items=4).paginate(ITEMS, 8)
+
+    assert [item['id'] for item in json.loads(body)['items']] == [8, 9]
+    assert cursor is None
+
+
+def test_exact_page_has_no_cursor():
+    _, cursor = Pagination(max_items=10).paginate(ITEMS)
+
+    assert cursor is None
+
+
+def test_max_bytes():
+    item_size = len(json.dumps(ITEMS[0], default=float, separators=(',', ':'))) + 1
+    pagination = Pagination(max_bytes=Pagination()._overhead + item_size * 3)
+    body, cursor = pagination.paginate(ITEMS)
+
+    assert len(json.loads(body)['items']) == 3
+    assert decode_cursor(cursor) == 3
+
+
+def test_oversized_item_is_sent_alone():
+    body, cursor = Pagination(max_bytes=1).paginate(ITEMS)
+
+    assert len(json.loads(body)['items']) == 1
+    assert decode_cursor(cursor) == 1
+
+
+def test_generator_is_only_consumed_up_to_the_page():
+    consumed = []
+
+    def generate():
+        for item in ITEMS:
+            consumed.append(item['id'])
+            yield item
+
+    body, cursor = Pagination(max_items=3).paginate(generate(), 2)
+
+    assert [item['id'] for item in json.loads(body)['items']] == [2, 3, 4]
+    assert consumed == [0, 1, 2, 3, 4, 5]
+
+
+def test_paginated_payload_is_not_skipped_again():
+    body, cursor = Pagination(max_items=2).paginate(Paginated(ITEMS[6:], 6), 6)
+
+    assert [item['id'] for item in json.loads(body)['items']] == [6, 7]
+    assert decode_cursor(cursor) == 8
+
+
+def test_cursor_in_header():
+    @lambda_proxy_response_wrapper(pagination=Pagination(max_items=5, cursor_in_header=True))
+    def handler(event, context):
+        return FunctionResponse(status_code=HttpStatusCodes.OK, payload=ITEMS, url=None)
+
+    resp = handler(make_event(), None)
+
+    assert [item['id'] for item in json.loads(resp['body'])] == [0, 1, 2, 3, 4]
+    assert decode_cursor(resp['headers']['X-Next-Cursor']) == 5
+
+    resp = handler(make_event(resp['headers']['X-Next-Cursor']), None)
+
+    assert [item['id'] for item in json.loads(resp['body'])] == [5, 6, 7, 8, 9]
+    assert 'X-Next-Cursor' not in resp['headers']
+
+
+def test_wrapper_pages_through_generator():
+    @lambda_proxy_response_wrapper(pagination=Pagination(max_items=4))
+    def handler(event, context):
+        return FunctionResponse(status_code=HttpStatusCodes.OK, payload=(item for item in ITEMS), url=None)
+
+    ids = []
+    cursor = None
+
+    while True:
+        body = json.loads(handler(make_event(cursor), None)['body'])
+        ids.extend(item['id'] for item in body['items'])
+        cursor = body['nextCursor']
+
+        if cursor is None:
+            break
+
+    assert ids == list(range(10))
+
+
+def test_wrapper_errors():
+    @lambda_proxy_response_wrapper(pagination=Pagination(max_items=4))
+    def handler(event, context):
+        def generate():
+            yield ITEMS[0]
+            raise NotFoundError('Gone')
+
+        return FunctionResponse(status_code=HttpStatusCodes.OK, payload=generate(), url=None)
+
+    assert handler(make_event('bad'), None)['statusCode'] == HttpStatusCodes.BAD_REQUEST
+    assert handler(make_event(), None)['statusCode'] == HttpStatusCodes.NOT_FOUND
+
+
+def test_dict_payloads_are_not_paginated():
+    @lambda_proxy_response_wrapper(pagination=Pagination(max_items=1))
+    def handler(event, context):
+        return FunctionResponse(status_code=HttpStatusCodes.OK, payload={"a": 1, "b": 2}, url=None)
+
+    assert json.loads(handler(make_event(), None)['body']) == {"a": 1, "b": 2}
@@ -0,0 +1,135 @@
+from enum import Enum
+from uuid import UUID
+from datetime import date, datetime
+
+import pytest
+
+from lambda_proxy_helpers_pkg.event_parser import EventParser
+from lambda_proxy_helpers_pkg.lambda_errors import InvalidParameterError, MissingParameterError
+from lambda_proxy_helpers_pkg.params import Param, compile_param, compile_params, PATH
+from lambda_proxy_helpers_pkg.test_proxy_event import get_test_proxy_event
+
+ITEM_ID = '8f2b7c1e-5d4a-4b6e-9a3f-2c1d0e9b8a7f'
+
+
+class Status(Enum):
+    DRAFT = 'draft'
+    LIVE = 'live'
+
+
+class Level(Enum):
+    LOW = 1
+    HIGH = 2
+
+
+def make_parser(query=None, multi_value=None, path=None):
+    event = get_test_proxy_event(http_method='GET', path_params=path or {"itemId": ITEM_ID},
+                                 query_string_params=query)
+    event['multiValueQueryStringParameters'] = multi_value
+    return EventParser(event)
+
+
+@pytest.mark.parametrize('spec, raw, expected', [
+    (Param(int), '42', 42),
+    (Param(float), '1.5', 1.5),
+    (Param(bool), 'TRUE', True),
+    (Param(bool), '0', False),
+    (Param(UUID), ITEM_ID, UUID(ITEM_ID)),
+    (Param(date), '2026-01-31', date(2026, 1, 31)),
+    (Param(datetime), '2026-01-31T10:30:00', datetime(2026, 1, 31, 10, 30)),
+    (Param(Status), 'live', Status.LIVE),
+    (Param(Level), '1', Level.LOW),
+    (Param(Level), '02', Level.HIGH),
+    (Param(choices=('asc', 'desc')), 'desc', 'desc'),
+    (Param(), 'raw', 'raw'),
+])
+def test_conversion(spec, raw, expected):
+    assert make_parser({"value": raw}).get_query_param('value', spec) == expected
+
+
+@pytest.mark.parametrize('spec, raw, message', [
+    (Param(int), '4x', 'value must be an integer'),
+    (Param(bool), 'maybe', 'value must be true or false'),
+    (Param(UUID), 'nope', 'value must be a UUID'),
+    (Param(date), '31/01/2026', 'value must be an ISO 8601 date (YYYY-MM-DD)'),
+    (Param(Status), 'gone', 'value must be one of draft, live'),
+    (Param(Level), '3', 'value must be one of 1, 2'),
+    (Param(Level), 'LOW', 'value must be one of 1, 2'),
+    (Param(choices=('asc', 'desc')), 'up', 'value must be one of asc, desc'),
+])
+def test_invalid_values(spec, raw, message):
+    with pytest.raises(InvalidParameterError) as e:
+        make_parser({"value": raw}).get_query_param('value', spec)
+
+    assert e.value.message == message
+
+
+def test_missing_values():
+    ep = make_parser({"empty": ""})
+
+    assert ep.get_query_param('limit', Param(int, default=20)) == 20
+    assert ep.get_query_param('empty', Param(int)) is None
+
+    with pytest.raises(MissingParameterError) as e:
+        ep.get_query_param('limit', Param(int, required=True))
+
+    assert e.value.message == 'limit not found in query string parameters or value is empty'
+
+
+def test_path_params():
+    ep = make_parser()
+
+    assert ep.get_path_param('itemId') == ITEM_ID
+    assert ep.get_path_param('itemId', Param(UUID)) == UUID(ITEM_ID)
+
+    with pytest.raises(MissingParameterError):
+        ep.get_path_param('other', Param(int, required=True))
+
+
+def test_lists():
+    ep = make_parser(query={"ids": "1,2", "status": "live"},
+                     multi_value={"ids": ["1,2"], "status": ["live", "draft"]})
+
+    assert ep.get_query_param('ids', Param(int, many=True)) == [1, 2]
+    assert ep.get_query_param('status', Param(Status, many=True)) == [Status.LIVE, Status.DRAFT]
+    assert ep.get_query_param('tags', Param(many=True, default=())) == ()
+    assert ep.get_query_param_values('status') == ['live', 'draft']
+
+    # without multi value parameters (e.g. a hand built event) the single value is split
+    ep = make_parser(query={"ids": "1,2,,3"})
+
+    assert ep.get_query_param('ids', Param(int, many=True)) == [1, 2, 3]
+    assert ep.get_query_param('ids', Param(many=True, separator=None)) == ['1,2,,3']
+    assert ep.get_query_param_values('ids') == ['1,2,,3']
+
+    with pytest.raises(InvalidParameterError):
+        make_parser(query={"ids": "1,x"}).get_query_param('ids', Param(int, many=True))
+
+
+def test_compile_params():
+    params = compile_params(path={'itemId': Param(UUID, required=True)},
+                            query={'limit': Param(int, default=20), 'since': Param(date)})
+    ep = make_parser({"since": "2026-02-01"})
+
+    values = ep.get_params(params)
+
+    assert values == {"itemId": UUID(ITEM_ID), "limit": 20, "since": date(2026, 2, 1)}
+    assert ep.get_params(params) is values
+
+
+def test_converters_are_compiled_once_and_cached_per_parser():
+    assert compile_param('limit', Param(int)) is compile_param('limit', Param(int))
+    assert compile_param('limit', Param(int), PATH) is not compile_param('limit', Param(int))
+
+    ep = make_parser({"limit": "5"})
+
+    assert ep.get_query_param('limit', Param(int)) == 5
+
+    ep.event['queryStringParameters']['limit'] = '6'
+
+    assert ep.get_query_param('limit', Param(int)) == 5
+
+
+def test_unsupported_type():
+    with pytest.raises(TypeError):
+        compile_param('value', Param(dict))
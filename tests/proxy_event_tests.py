@@ -2,8 +2,11 @@ import json
 from decimal import Decimal
 import pytest
 
-from lambda_proxy_helpers_pkg.test_proxy_event import get_test_proxy_event, CognitoDetail
+from lambda_proxy_helpers_pkg.test_proxy_event import get_test_proxy_event, CognitoDetail, EventFactory, Route, \
+    EventRecorder, cognito_claims, generate_events, anonymize_event, replay_events
 from lambda_proxy_helpers_pkg.lambda_proxy_response import LambdaProxyResponse
+from lambda_proxy_helpers_pkg.event_formats import REST_API, HTTP_API, FUNCTION_URL, ALB
+from lambda_proxy_helpers_pkg.event_parser import EventParser
 
 
 @pytest.fixture()
@@ -47,3 +50,97 @@ def test_proxy_response_body():
     assert resp_body['payload']['test_decimal'] == 3.14159265359
     assert resp_body['payload']['test_bool']
     assert resp_body['payload']['test_int'] == 12345
+
+
+def test_events_do_not_share_mutable_parts():
+    first = get_test_proxy_event(http_method='GET')
+    first['headers']['Origin'] = 'https://example.com'
+    first['requestContext']['authorizer'] = {}
+
+    second = get_test_proxy_event(http_method='GET')
+
+    assert 'Origin' not in second['headers']
+    assert 'authorizer' not in second['requestContext']
+    assert second['requestContext']['identity'] is first['requestContext']['identity']
+
+
+@pytest.mark.parametrize('event_format', [REST_API, HTTP_API, FUNCTION_URL, ALB])
+def test_factory_formats(event_format):
+    # ALB target groups only pass repeated query params on with multi value headers enabled
+    factory = EventFactory(event_format, multi_value_headers=event_format == ALB)
+    claims = None if event_format == ALB else cognito_claims(CognitoDetail('user-1', 'a@b.com', 'account-1', True))
+    event = factory.make('POST', '/items/{itemId}', body={"name": "thing"}, path_params={"itemId": "abc"},
+                         query_string_params={"status": ["draft", "live"], "q": "red shoes"}, claims=claims)
+    ep = EventParser(event)
+
+    assert ep.event_format.name == event_format
+    assert ep.method == 'POST'
+    assert ep.path == '/items/abc'
+    assert ep.get_query_param('q') == 'red shoes'
+    assert ep.get_query_param_values('status') == ['draft', 'live']
+    assert ep.get_body_prop('name') == 'thing'
+
+    if claims is not None:
+        ep.validate_event_auth(requires_account_id=True)
+        assert (ep.user_id, ep.account_id) == ('user-1', 'account-1')
+
+
+def test_alb_factory_claims_are_rejected():
+    with pytest.raises(ValueError):
+        EventFactory(ALB).make(claims={"sub": "user-1"})
+
+
+def test_generate_events():
+    routes = [Route('GET', '/items/{itemId}'), Route('POST', '/items', bodies=[{"name": "a"}, {"name": "b"}])]
+    events = list(generate_events(routes, count=200, users=20, ids=5, seed=1))
+
+    assert len(events) == 200
+    assert events == list(generate_events(routes, count=200, users=20, ids=5, seed=1))
+    assert {event['httpMethod'] for event in events} == {'GET', 'POST'}
+    assert len({event['requestContext']['authorizer']['claims']['sub'] for event in events}) > 1
+
+    for event in events:
+        ep = EventParser(event)
+        ep.validate_event_auth(requires_account_id=True)
+
+        if ep.method == 'GET':
+            assert event['path'] == f"/items/{ep.get_path_param('itemId')}"
+        else:
+            assert ep.get_body_prop('name') in ('a', 'b')
+
+
+def test_anonymize_event():
+    event = get_test_proxy_event(http_method='GET', cognito_detail=CognitoDetail('user-1', 'a@b.com', 'acc-1', True))
+    anonymized = anonymize_event(event, salt='secret')
+    claims = anonymized['requestContext']['authorizer']['claims']
+
+    assert anonymized['headers']['Authorization'].startswith('Bearer anon-')
+    assert anonymized['headers']['X-Forwarded-For'].startswith('10.')
+    assert anonymized['requestContext']['identity']['sourceIp'].startswith('10.')
+    assert claims['sub'].startswith('anon-') and claims['email'].endswith('@example.com')
+    assert claims['sub'] == claims['cognito:username']
+    assert claims['token_use'] == 'id'
+    assert anonymize_event(event, salt='secret') == anonymized
+    assert anonymize_event(event, salt='other') != anonymized
+    # the original is left alone
+    assert event['requestContext']['authorizer']['claims']['sub'] == 'user-1'
+    assert event['headers']['Authorization'] == 'Bearer <TOKEN>'
+
+
+def test_record_and_replay(tmp_path):
+    path = str(tmp_path / 'events.jsonl')
+
+    with EventRecorder(path, salt='secret') as recorder:
+        handler = recorder(lambda event, context: event['path'])
+
+        assert handler(get_test_proxy_event(path='/one', body={"a": 1}), None) == '/one'
+        assert handler(get_test_proxy_event(path='/two'), None) == '/two'
+
+    replayed = list(replay_events(path, repeat=2))
+
+    assert [event['path'] for event in replayed] == ['/one', '/two', '/one', '/two']
+    assert json.loads(replayed[0]['body']) == {"a": 1}
+    assert replayed[0]['headers']['Authorization'].startswith('Bearer anon-')
+
+    replayed[0]['headers']['X-Test'] = 'modified'
+    assert 'X-Test' not in replayed[2]['headers']
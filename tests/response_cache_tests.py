@@ -0,0 +1,221 @@
+import json
+import hmac
+import time
+import hashlib
+import secrets
+import binascii
+
+import pytest
+
+from lambda_proxy_helpers_pkg.constants import HttpStatusCodes
+from lambda_proxy_helpers_pkg.event_parser import EventParser
+from lambda_proxy_helpers_pkg.jwt_auth import JwtVerifier
+from lambda_proxy_helpers_pkg.lambda_errors import NotFoundError, InvalidUserError
+from lambda_proxy_helpers_pkg.lambda_proxy_response_wrapper import lambda_proxy_response_wrapper, FunctionResponse
+from lambda_proxy_helpers_pkg.response_cache import ResponseCache, VARY_ON_USER_ID
+from lambda_proxy_helpers_pkg.test_proxy_event import get_test_proxy_event, CognitoDetail
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_event(method='GET', item_id='1', query=None, user_id=None):
+    cognito_detail = CognitoDetail(user_id, 'test@test.com', 'acc', False) if user_id else None
+    return get_test_proxy_event(http_method=method, resource='/items/{itemId}', path=f'/items/{item_id}',
+                                path_params={"itemId": item_id}, query_string_params=query,
+                                cognito_detail=cognito_detail)
+
+
+def make_handler(cache, calls):
+    @lambda_proxy_response_wrapper(cache=cache)
+    def handler(event, context):
+        calls.append(event)
+        ep = EventParser(event)
+
+        if ep.get_path_param('itemId') == 'missing':
+            raise NotFoundError('Item not found')
+
+        return FunctionResponse(status_code=HttpStatusCodes.OK,
+                                payload={"id": ep.get_path_param('itemId'), "calls": len(calls)}, url=None)
+
+    return handler
+
+
+def test_repeat_get_is_served_from_cache():
+    calls = []
+    handler = make_handler(ResponseCache(), calls)
+
+    first = handler(make_event(), None)
+    second = handler(make_event(), None)
+
+    assert len(calls) == 1
+    assert first == second
+    assert json.loads(second['body']) == {"id": "1", "calls": 1}
+
+
+def test_key_includes_path_and_query_params():
+    calls = []
+    handler = make_handler(ResponseCache(), calls)
+
+    handler(make_event(item_id='1'), None)
+    handler(make_event(item_id='2'), None)
+    handler(make_event(item_id='1', query={"page": "2"}), None)
+    handler(make_event(item_id='1', query={"page": "2"}), None)
+
+    assert len(calls) == 3
+
+
+def test_only_get_200_responses_are_cached():
+    calls = []
+    handler = make_handler(ResponseCache(), calls)
+
+    handler(make_event(method='POST'), None)
+    handler(make_event(method='POST'), None)
+    handler(make_event(item_id='missing'), None)
+    resp = handler(make_event(item_id='missing'), None)
+
+    assert len(calls) == 4
+    assert resp['statusCode'] == HttpStatusCodes.NOT_FOUND
+
+
+def test_returned_responses_are_copies():
+    calls = []
+    handler = make_handler(ResponseCache(), calls)
+
+    handler(make_event(), None)['headers']['X-Test'] = 'modified'
+    handler(make_event(), None).pop('body')
+
+    resp = handler(make_event(), None)
+
+    assert 'X-Test' not in resp['headers']
+    assert 'body' in resp
+
+
+def test_ttl():
+    calls = []
+    clock = FakeClock()
+    handler = make_handler(ResponseCache(ttl=10, clock=clock), calls)
+
+    handler(make_event(), None)
+    clock.now = 9
+    handler(make_event(), None)
+    clock.now = 10
+    handler(make_event(), None)
+
+    assert len(calls) == 2
+
+
+def test_lru_eviction():
+    cache = ResponseCache(max_entries=2)
+    calls = []
+    handler = make_handler(cache, calls)
+
+    handler(make_event(item_id='1'), None)
+    handler(make_event(item_id='2'), None)
+    handler(make_event(item_id='1'), None)
+    handler(make_event(item_id='3'), None)
+
+    assert len(cache) == 2
+    assert len(calls) == 3
+
+    # 2 was the least recently used so it's gone, 1 is still cached
+    handler(make_event(item_id='1'), None)
+    handler(make_event(item_id='2'), None)
+
+    assert len(calls) == 4
+
+
+def test_memory_cap():
+    cache = ResponseCache(max_bytes=1500)
+    handler = make_handler(cache, [])
+
+    for item_id in '123':
+        handler(make_event(item_id=item_id), None)
+
+    assert len(cache) == 2
+    assert cache.size <= 1500
+
+
+def test_vary_on_user():
+    calls = []
+    handler = make_handler(ResponseCache(vary_on=VARY_ON_USER_ID), calls)
+
+    handler(make_event(user_id='user-1'), None)
+    handler(make_event(user_id='user-1'), None)
+    handler(make_event(user_id='user-2'), None)
+
+    assert len(calls) == 2
+
+    # no user, not cached, the handler decides what to do with it
+    handler(make_event(), None)
+    handler(make_event(), None)
+
+    assert len(calls) == 4
+
+
+def b64url(data: bytes) -> str:
+    return binascii.b2a_base64(data, newline=False).decode('ascii').replace('+', '-').replace('/', '_').rstrip('=')
+
+
+def test_verifier_authenticates_before_cache_hits():
+    secret = secrets.token_bytes(32)
+    verifier = JwtVerifier(jwks={"keys": [{"kty": "oct", "kid": "shared", "k": b64url(secret)}]},
+                           algorithms=('HS256',))
+    header = b64url(json.dumps({"alg": "HS256", "kid": "shared"}).encode())
+    payload = b64url(json.dumps({"sub": "user-1", "exp": int(time.time()) + 3600}).encode())
+    signature = hmac.new(secret, f"{header}.{payload}".encode(), hashlib.sha256).digest()
+    calls = []
+
+    # the handler does its own auth, the cache is shared between users
+    @lambda_proxy_response_wrapper(cache=ResponseCache(verifier=verifier))
+    def handler(event, context):
+        calls.append(event)
+        EventParser(event).validate_event_auth(verifier=verifier)
+        return FunctionResponse(status_code=HttpStatusCodes.OK, payload={"secret": "data"}, url=None)
+
+    authenticated = make_event()
+    authenticated['headers']['Authorization'] = f"Bearer {header}.{payload}.{b64url(signature)}"
+
+    assert handler(authenticated, None)['statusCode'] == HttpStatusCodes.OK
+    assert handler(authenticated, None)['statusCode'] == HttpStatusCodes.OK
+    assert len(calls) == 1
+
+    anonymous = make_event()
+    del anonymous['headers']['Authorization']
+
+    response = handler(anonymous, None)
+
+    assert response['statusCode'] == InvalidUserError.status_code
+    assert 'secret' not in response['body']
+    assert len(calls) == 2
+
+
+def test_invalidate():
+    cache = ResponseCache()
+    calls = []
+    handler = make_handler(cache, calls)
+
+    handler(make_event(item_id='1'), None)
+    handler(make_event(item_id='2'), None)
+
+    assert cache.invalidate('/items/{itemId}', {"itemId": "1"}) == 1
+    assert cache.invalidate('/other') == 0
+
+    handler(make_event(item_id='1'), None)
+    handler(make_event(item_id='2'), None)
+
+    assert len(calls) == 3
+
+    assert cache.invalidate() == 2
+    assert len(cache) == 0
+    assert cache.size == 0
+
+
+def test_invalid_vary_on():
+    with pytest.raises(ValueError):
+        ResponseCache(vary_on='email')
@@ -0,0 +1,99 @@
+import json
+
+import pytest
+
+from lambda_proxy_helpers_pkg.constants import HttpMethods, HttpStatusCodes
+from lambda_proxy_helpers_pkg.event_parser import EventParser
+from lambda_proxy_helpers_pkg.lambda_errors import NotFoundError
+from lambda_proxy_helpers_pkg.lambda_proxy_response_wrapper import FunctionResponse
+from lambda_proxy_helpers_pkg.router import Router
+from lambda_proxy_helpers_pkg.test_proxy_event import get_test_proxy_event
+
+
+@pytest.fixture()
+def router():
+    router = Router()
+
+    @router.route(HttpMethods.GET, '/items/{itemId}')
+    def get_item(event, context):
+        item_id = EventParser(event).get_path_param('itemId')
+        return FunctionResponse(status_code=HttpStatusCodes.OK, payload={"id": item_id}, url=None)
+
+    @router.route(HttpMethods.DELETE, '/items/{itemId}')
+    def delete_item(event, context):
+        raise NotFoundError("Item not found")
+
+    @router.route(HttpMethods.POST, '/items')
+    def create_item(event, context):
+        return FunctionResponse(status_code=HttpStatusCodes.CREATED, payload=None, url='/items/1')
+
+    return router
+
+
+def make_event(method, resource, path_params=None):
+    return get_test_proxy_event(http_method=method, resource=resource, path=resource, path_params=path_params)
+
+
+def test_dispatch(router):
+    resp = router(make_event('GET', '/items/{itemId}', {"itemId": "123"}), None)
+
+    assert resp['statusCode'] == HttpStatusCodes.OK
+    assert json.loads(resp['body']) == {"id": "123"}
+
+    resp = router(make_event('POST', '/items'), None)
+
+    assert resp['statusCode'] == HttpStatusCodes.CREATED
+    assert resp['headers']['Location'] == '/items/1'
+
+
+def test_handler_errors_are_mapped(router):
+    resp = router(make_event('DELETE', '/items/{itemId}', {"itemId": "123"}), None)
+
+    assert resp['statusCode'] == HttpStatusCodes.NOT_FOUND
+
+
+def test_unknown_resource(router):
+    resp = router(make_event('GET', '/unknown'), None)
+
+    assert resp['statusCode'] == HttpStatusCodes.NOT_FOUND
+    assert 'Allow' not in resp['headers']
+
+
+def test_method_not_allowed(router):
+    resp = router(make_event('PUT', '/items/{itemId}', {"itemId": "123"}), None)
+
+    assert resp['statusCode'] == HttpStatusCodes.METHOD_NOT_ALLOWED
+    assert resp['headers']['Allow'] == 'DELETE, GET, HEAD, OPTIONS'
+    assert json.loads(resp['body'])['errorType'] == 'Method Not Allowed Error'
+
+
+def test_head(router):
+    resp = router(make_event('HEAD', '/items/{itemId}', {"itemId": "123"}), None)
+
+    assert resp['statusCode'] == HttpStatusCodes.OK
+    assert 'body' not in resp
+
+    resp = router(make_event('HEAD', '/items'), None)
+    assert resp['statusCode'] == HttpStatusCodes.METHOD_NOT_ALLOWED
+
+
+def test_options(router):
+    resp = router(make_event('OPTIONS', '/items'), None)
+
+    assert resp['statusCode'] == HttpStatusCodes.NO_CONTENT
+    assert resp['headers']['Allow'] == 'OPTIONS, POST'
+
+
+def test_duplicate_route(router):
+    with pytest.raises(ValueError):
+        router.add_route(HttpMethods.POST, '/items', lambda event, context: None)
+
+
+def test_async_route(router):
+    @router.route(HttpMethods.GET, '/async')
+    async def get_async(event, context):
+        return FunctionResponse(status_code=HttpStatusCodes.OK, payload={"async": True}, url=None)
+
+    resp = router(make_event('GET', '/async'), None)
+
+    assert json.loads(resp['body']) == {"async": True}
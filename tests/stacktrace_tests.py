@@ -0,0 +1,126 @@
+import io
+import json
+
+import pytest
+
+from lambda_proxy_helpers_pkg import stacktrace
+from lambda_proxy_helpers_pkg.constants import HttpStatusCodes
+from lambda_proxy_helpers_pkg.lambda_errors import NotFoundError
+from lambda_proxy_helpers_pkg.lambda_proxy_response import LambdaProxyResponse
+from lambda_proxy_helpers_pkg.lambda_proxy_response_wrapper import lambda_proxy_response_wrapper
+from lambda_proxy_helpers_pkg.stacktrace import StacktracePolicy, CapturedTrace, exception_signature, format_trace
+from lambda_proxy_helpers_pkg.test_proxy_event import get_test_proxy_event
+
+
+def recurse(depth):
+    if depth == 0:
+        raise KeyError('deep')
+
+    recurse(depth - 1)
+
+
+def catch(func, *args):
+    try:
+        func(*args)
+    except Exception as e:
+        return e
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_signature_uses_innermost_frames():
+    signature = exception_signature(catch(recurse, 5), frames=2)
+
+    assert signature.startswith('KeyError@stacktrace_tests.py:recurse:')
+    assert signature.count('<') == 1
+
+
+def test_format_trace_is_capped():
+    e = catch(recurse, 100)
+    trace = format_trace(e, max_size=100000, max_frames=2)
+
+    assert trace.count('in recurse') == 2
+    assert 'in catch' not in trace
+    assert trace.rstrip().endswith("KeyError: 'deep'")
+
+    trace = format_trace(e, max_size=200)
+
+    assert trace.startswith('...\n') and len(trace) <= 204
+
+
+def test_unsampled_errors_only_get_a_signature():
+    stream = io.StringIO()
+    captured = StacktracePolicy(sample_rate=0.0, debug=False, stream=stream).capture(catch(recurse, 1))
+
+    assert captured.trace is None
+    assert captured.signature == exception_signature(catch(recurse, 1))
+    assert json.loads(stream.getvalue()) == {"level": "ERROR", "errorType": "KeyError",
+                                             "signature": captured.signature}
+
+
+def test_sampled_errors_get_the_full_trace():
+    stream = io.StringIO()
+    captured = StacktracePolicy(sample_rate=1.0, debug=False, stream=stream).capture(catch(recurse, 1))
+
+    assert 'Traceback' in captured.trace
+    assert json.loads(stream.getvalue())['stackTrace'] == captured.trace
+
+
+def test_full_traces_are_budgeted():
+    clock = Clock()
+    policy = StacktracePolicy(sample_rate=1.0, debug=False, max_per_minute=2, log=False, clock=clock)
+    e = catch(recurse, 1)
+
+    assert [policy.capture(e).trace is not None for _ in range(3)] == [True, True, False]
+
+    clock.now = 61
+
+    assert policy.capture(e).trace is not None
+
+
+def test_debug_mode(monkeypatch):
+    monkeypatch.setenv(stacktrace.DEBUG_ENV, 'true')
+    policy = StacktracePolicy(sample_rate=0.0, max_per_minute=0, log=False)
+
+    assert policy.debug and policy.in_response
+    assert policy.capture(catch(recurse, 1)).trace is not None
+
+
+def test_include_stacktrace():
+    resp = LambdaProxyResponse(status=500, error='Boom', error_type='KeyError',
+                               stacktrace=CapturedTrace('KeyError', 'KeyError@a.py:f:1', None))
+
+    assert json.loads(resp.make_response()['body']) == {"error": "Boom", "errorType": "KeyError"}
+    assert json.loads(resp.make_response(include_stacktrace=True)['body'])['stackTrace'] == 'KeyError@a.py:f:1'
+
+
+@pytest.mark.parametrize('in_response', [True, False])
+def test_wrapper(in_response):
+    stream = io.StringIO()
+    policy = StacktracePolicy(sample_rate=1.0, debug=False, in_response=in_response, stream=stream)
+
+    @lambda_proxy_response_wrapper(stacktrace=policy)
+    def handler(event, context):
+        if event['path'] == '/missing':
+            raise NotFoundError('Not here')
+
+        recurse(2)
+
+    resp = handler(get_test_proxy_event(path='/missing'), None)
+
+    assert resp['statusCode'] == HttpStatusCodes.NOT_FOUND
+    assert 'stackTrace' not in json.loads(resp['body'])
+    assert stream.getvalue() == ''
+
+    resp = handler(get_test_proxy_event(path='/error'), None)
+    body = json.loads(resp['body'])
+
+    assert resp['statusCode'] == HttpStatusCodes.INTERNAL_SERVER_ERROR
+    assert 'in recurse' in json.loads(stream.getvalue())['stackTrace']
+    assert ('stackTrace' in body) == in_response
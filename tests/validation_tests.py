@@ -0,0 +1,100 @@
+import pytest
+
+from lambda_proxy_helpers_pkg.event_parser import EventParser
+from lambda_proxy_helpers_pkg.lambda_errors import ValidationError
+from lambda_proxy_helpers_pkg.lambda_proxy_response_wrapper import lambda_proxy_response_wrapper, FunctionResponse
+from lambda_proxy_helpers_pkg.test_proxy_event import get_test_proxy_event
+from lambda_proxy_helpers_pkg.validation import compile_schema, Field
+
+ITEM_SCHEMA = compile_schema({
+    'name': Field(str, min_length=1, max_length=10),
+    'price': Field(float, minimum=0, maximum=100),
+    'quantity': Field(int, required=False),
+    'status': Field(str, choices=('draft', 'live')),
+    'tags': Field(list, required=False, max_length=3, items=Field(str, max_length=5)),
+    'dimensions': Field(dict, required=False, schema={'width': Field(int), 'height': Field(int)}),
+    'active': Field(bool, required=False),
+})
+
+VALID_ITEM = {"name": "Widget", "price": 9.5, "status": "live", "tags": ["a", "b"],
+              "dimensions": {"width": 1, "height": 2}, "active": True}
+
+
+def get_errors(validator, body):
+    with pytest.raises(ValidationError) as e:
+        validator(body)
+
+    return e.value.errors
+
+
+def test_valid_body_is_returned():
+    assert ITEM_SCHEMA(VALID_ITEM) is VALID_ITEM
+    assert ITEM_SCHEMA({"name": "Widget", "price": 1, "status": "draft"})
+
+
+def test_every_failure_is_listed():
+    body = {"name": "", "price": -1, "quantity": True, "status": "gone", "tags": ["a", "toolong", 1, None, "b"],
+            "dimensions": {"width": "1"}, "active": 1}
+
+    assert get_errors(ITEM_SCHEMA, body) == [
+        'name: must have a length of at least 1',
+        'price: must be at least 0',
+        'quantity: must be an integer',
+        'status: must be one of draft, live',
+        'tags: must have a length of at most 3',
+        'tags[1]: must have a length of at most 5',
+        'tags[2]: must be a string',
+        'tags[3]: is required',
+        'dimensions.width: must be an integer',
+        'dimensions.height: is required',
+        'active: must be a boolean',
+    ]
+
+
+def test_required_fields():
+    assert get_errors(ITEM_SCHEMA, {"price": None}) == ['name: is required', 'price: is required',
+                                                        'status: is required']
+
+
+def test_body_must_be_an_object():
+    assert get_errors(ITEM_SCHEMA, ["not", "an", "object"]) == ['body: must be an object']
+    assert get_errors(ITEM_SCHEMA, None) == ['body: must be an object']
+
+
+def test_extra_properties():
+    validator = compile_schema({'a': Field(int), 'b': Field(dict, schema={'c': Field(int)})}, allow_extra=False)
+
+    assert get_errors(validator, {"a": 1, "b": {"c": 1, "d": 2}, "e": 3}) == ['b.d: is not allowed',
+                                                                             'e: is not allowed']
+    assert ITEM_SCHEMA(dict(VALID_ITEM, extra=1))
+
+
+def test_lists_of_objects():
+    validator = compile_schema({'lines': Field(list, items=Field(dict, schema={'qty': Field(int, minimum=1)}))})
+
+    assert get_errors(validator, {"lines": [{"qty": 1}, {"qty": 0}, {}]}) == ['lines[1].qty: must be at least 1',
+                                                                             'lines[2].qty: is required']
+
+
+def test_invalid_schema():
+    with pytest.raises(TypeError):
+        compile_schema({'a': int})
+
+    with pytest.raises(TypeError):
+        compile_schema({'a': Field(set)})
+
+
+def test_validate_body():
+    @lambda_proxy_response_wrapper()
+    def handler(event, context):
+        body = EventParser(event).validate_body(ITEM_SCHEMA)
+        return FunctionResponse(status_code=201, payload=None, url=f"/items/{body['name']}")
+
+    resp = handler(get_test_proxy_event(body=VALID_ITEM), None)
+
+    assert resp['statusCode'] == 201
+
+    resp = handler(get_test_proxy_event(body={"name": "Widget"}), None)
+
+    assert resp['statusCode'] == 400
+    assert 'price: is required; status: is required' in resp['body']